@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+"""
+Merge output files of raw2l1 along the time dimension without reading the
+raw data again
+"""
+
+import argparse
+import sys
+
+from raw2l1 import __version__
+from tools import arg_parser as ag
+from tools import conf, log, merge
+from tools.check_conf import check_conf
+
+NAME = "raw2l1_merge"
+
+
+def get_input_args(argv):
+    """
+    return input arguments into a dictionnary
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Merge output files of raw2l1 created with the same "
+        "configuration along the time dimension"
+    )
+    parser.add_argument(
+        "conf_file",
+        type=argparse.FileType("r"),
+        help="Name of the INI configuration file used to create the files",
+    )
+    parser.add_argument(
+        "input_file",
+        nargs="+",
+        help="Name or pattern of the files to merge. For time steps found in "
+        "several files, the data of the first file are kept",
+    )
+    parser.add_argument(
+        "output_file",
+        type=ag.check_output_dir,
+        help="Name of the merged file",
+    )
+    parser.add_argument(
+        "-block_size",
+        type=int,
+        default=None,
+        help="Number of time steps copied at once. Default is the chunk size of "
+        f"the time dimension or {merge.DEFAULT_BLOCK_SIZE}",
+    )
+    parser.add_argument(
+        "-log",
+        default="logs/raw2l1_merge.log",
+        help="File where logs will be saved",
+    )
+    parser.add_argument(
+        "-log_level",
+        choices=ag.LOG_LEVEL,
+        default="info",
+        help="Level of logs store in the log file",
+    )
+    parser.add_argument(
+        "-v",
+        choices=ag.LOG_LEVEL,
+        default="info",
+        help="Level of verbose in the terminal",
+    )
+
+    parse_args = parser.parse_args(argv)
+
+    try:
+        list_input = ag.find_input_files(parse_args.input_file, 0)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(f"argument input_file: {exc}")
+
+    input_args = {}
+    input_args["conf"] = parse_args.conf_file
+    input_args["input"] = list_input
+    input_args["output"] = parse_args.output_file
+    input_args["block_size"] = parse_args.block_size
+    input_args["log"] = parse_args.log
+    input_args["log_level"] = parse_args.log_level
+    input_args["verbose"] = parse_args.v
+
+    return input_args
+
+
+def merge_l1(argv):
+    """
+    Main module of the merge of raw2l1 files
+    """
+
+    input_args = get_input_args(argv)
+
+    logger = log.init(input_args, NAME)
+    logger.info("logs are saved in {!s}".format(input_args["log"]))
+
+    setting = conf.init(input_args, __version__, logger)
+    setting = check_conf(setting, logger)
+
+    n_time = merge.merge_files(
+        setting,
+        input_args["input"],
+        input_args["output"],
+        logger,
+        input_args["block_size"],
+    )
+    if n_time == 0:
+        logger.critical("102 No Usable data in any file. Quitting raw2l1 merge")
+        sys.exit(1)
+
+    logger.info("end of processing")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    merge_l1(sys.argv[1:])
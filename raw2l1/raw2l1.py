@@ -3,19 +3,60 @@
 # Compatibility with python 3
 
 
+import contextlib
+import datetime as dt
+import logging
+import os
 import sys
 
+import netCDF4 as nc
+import xarray as xr
+
 from tools import arg_parser as ag
-from tools import conf, log
+from tools import conf, file_io, log, output_stream, watch
 from tools import create_netcdf as cnc
 from tools import lidar_reader as lr
-from tools.check_conf import check_conf
+from tools.check_conf import check_conf, check_same_reader
 
 __author__ = "Marc-Antoine Drouin"
 __version__ = "3.2.4"
 
 NAME = "raw2l1"
 
+# name of the netCDF files created in memory by the library functions
+MEMORY_OUTPUT = "raw2l1_memory.nc"
+
+
+class Raw2l1Error(Exception):
+    """
+    Error raised by the library functions when the processing is stopped. The
+    message is made of the critical messages logged
+    """
+
+
+class ErrorHandler(logging.Handler):
+    """
+    logging handler keeping the error messages
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.critical = []
+        self.last_error = None
+
+    def emit(self, record):
+        if record.levelno >= logging.CRITICAL:
+            self.critical.append(record.getMessage())
+        else:
+            self.last_error = record.getMessage()
+
+    def message(self):
+        """message of the error which stopped the processing"""
+        if self.critical:
+            return " - ".join(self.critical)
+
+        return self.last_error
+
 
 def welcome_msg():
     """
@@ -38,22 +79,11 @@ def welcome_msg():
     return None
 
 
-def raw2l1(argv):
+def process(input_args, logger):
     """
-    Main module of raw2l1
+    Read the input files and write the output file of one product
     """
 
-    welcome_msg()
-
-    # Read imput arguments
-    # -------------------------------------------------------------------------
-    input_args = ag.get_input_args(argv)
-
-    # Start logger
-    # -------------------------------------------------------------------------
-    logger = log.init(input_args, "raw2l1")
-    logger.info("logs are saved in {!s}".format(input_args["log"]))
-
     # reading configuration file
     # -------------------------------------------------------------------------
     logger.debug("reading configuration file " + input_args["conf"].name)
@@ -64,6 +94,17 @@ def raw2l1(argv):
     logger.debug("checking configuration file")
     setting = check_conf(setting, logger)
 
+    # configurations of the additional output files created from the same data
+    # -------------------------------------------------------------------------
+    output_settings = []
+    for output in input_args["outputs"]:
+        logger.debug("reading configuration file " + output["conf"].name)
+        output_setting = conf.init(
+            {**input_args, **output, "outputs": []}, __version__, logger
+        )
+        output_setting = check_conf(output_setting, logger)
+        output_settings.append(check_same_reader(setting, output_setting, logger))
+
     # Add directory containing reader to path
     # -------------------------------------------------------------------------
     logger.debug("adding " + setting.get("conf", "reader_dir") + " to path")
@@ -72,7 +113,7 @@ def raw2l1(argv):
     # Reading lidar data using user defined reader
     # -------------------------------------------------------------------------
     logger.info("reading lidar data")
-    lidar_data = lr.RawDataReader(setting, logger)
+    lidar_data = lr.RawDataReader(setting, logger, output_settings)
     lidar_data.read_data()
     logger.info("reading data successed")
 
@@ -88,7 +129,335 @@ def raw2l1(argv):
     # write netCDF file
     # -------------------------------------------------------------------------
     logger.info("writing output file")
-    cnc.create_netcdf(setting, lidar_data.data, logger)
+    write_output(setting, lidar_data.data, logger)
+
+    # the data read are shared by the additional output files. They are written
+    # one after the other as the netCDF library is not thread safe
+    for output_setting in output_settings:
+        logger.info("writing output file %s", output_setting.get("conf", "output"))
+        write_output(output_setting, lidar_data.data, logger)
+
+    return None
+
+
+def write_output(setting, data, logger):
+    """
+    Create the output file, or the output files of each period if the output
+    is split
+    """
+
+    output = setting.get("conf", "output")
+    split_minutes = setting.has_option("conf", "split_minutes") and setting.get(
+        "conf", "split_minutes"
+    )
+    if not split_minutes:
+        write_file(setting, data, logger)
+        return None
+
+    if output_stream.is_stream(output):
+        logger.warning("107 outputs sent to %s are not split", output)
+        write_file(setting, data, logger)
+        return None
+
+    # files are written one after the other as the netCDF library is not
+    # thread safe
+    for start, part in cnc.split_data(setting, data, split_minutes, logger):
+        setting.set("conf", "output", cnc.get_split_filename(output, start))
+        try:
+            write_file(setting, part, logger)
+        finally:
+            setting.set("conf", "output", output)
+
+    return None
+
+
+def write_file(setting, data, logger):
+    """
+    Create one output file. In watch mode, the data are appended to the
+    output file if it already exists. Outputs sent to stdout or to a socket
+    are created in memory
+    """
+
+    output = setting.get("conf", "output")
+    append = setting.has_option("conf", "watch") and setting.get("conf", "watch")
+    if output_stream.is_stream(output):
+        content = cnc.create_netcdf_memory(setting, data, logger)
+        output_stream.send(content, output, logger)
+    elif append and os.path.exists(output):
+        cnc.append_netcdf(setting, data, logger)
+    else:
+        cnc.create_netcdf(setting, data, logger)
+
+    return None
+
+
+def watch_input(input_args, logger):
+    """
+    Process the input files of the day as they arrive (watch mode)
+    """
+
+    end = input_args["date"] + dt.timedelta(days=1) + input_args["watch_grace"]
+    watcher = watch.FileWatcher(
+        input_args["input_patterns"],
+        min_size=input_args["input_min_size"],
+        settle_time=input_args["watch_settle_time"],
+        interval=input_args["watch_interval"],
+        date_filter=input_args["input_date_filter"],
+    )
+
+    logger.info("watching input files until %s UTC", end)
+    try:
+        while True:
+            # a last scan is done once the day is over
+            now = dt.datetime.now(dt.UTC).replace(tzinfo=None)
+            finished = now > end
+
+            list_files = watcher.scan()
+            if list_files:
+                logger.info("%d new input files to process", len(list_files))
+                try:
+                    process({**input_args, "input": list_files}, logger)
+                except SystemExit as exc:
+                    # errors are already logged: wait for the next files
+                    if exc.code:
+                        logger.error("109 unable to process files %s", list_files)
+                finally:
+                    # files growing until the next scan are read again
+                    file_io.clear_caches()
+
+            if finished:
+                break
+            watcher.wait()
+    except KeyboardInterrupt:
+        logger.info("watch mode interrupted")
+    finally:
+        watcher.close()
+
+    return None
+
+
+@contextlib.contextmanager
+def raise_errors(logger):
+    """
+    Convert the exits of the processing into Raw2l1Error exceptions
+    """
+
+    handler = ErrorHandler()
+    logger.addHandler(handler)
+    try:
+        yield
+    except SystemExit as exc:
+        msg = handler.message() or f"processing stopped with status {exc.code}"
+        raise Raw2l1Error(msg) from None
+    finally:
+        logger.removeHandler(handler)
+        # archives are opened and files read again by the next call
+        file_io.clear_caches()
+
+
+def load_setting(conf_file, list_files, date, ancillary, filter_day, logger):
+    """
+    Create the configuration used by the library functions
+    """
+
+    if not isinstance(conf_file, dict) and not os.path.isfile(conf_file):
+        raise Raw2l1Error(f"107 configuration file '{conf_file}' does not exist")
+    if not isinstance(date, dt.datetime):
+        date = dt.datetime.combine(date, dt.time())
+
+    input_args = {
+        "date": date,
+        "conf": conf_file,
+        "input": [os.fspath(f) for f in list_files],
+        "output": MEMORY_OUTPUT,
+        "ancillary": [list(files) for files in ancillary or []],
+        "filter_day": filter_day,
+    }
+    if len(input_args["input"]) == 0:
+        raise Raw2l1Error("102 No Usable data in any file")
+
+    setting = conf.init(input_args, __version__, logger)
+    setting = check_conf(setting, logger)
+
+    reader_dir = setting.get("conf", "reader_dir")
+    if reader_dir not in sys.path:
+        sys.path.append(reader_dir)
+
+    return setting
+
+
+def read(conf_file, list_files, date, ancillary=None, filter_day=False, logger=None):
+    """
+    Read raw data files as raw2l1 does before writing the output file.
+
+    Unlike the command line, the function does not configure the logging and
+    does not quit the program: errors raise a `Raw2l1Error`.
+
+    Parameters
+    ----------
+    conf_file : str or dict
+        Configuration file or its sections as dictionnaries of options.
+    list_files : list of str
+        Input files.
+    date : datetime.date or datetime.datetime
+        Day to process.
+    ancillary : list of list of str, optional
+        Ancillary files (same as the -anc option).
+    filter_day : bool, optional
+        Keep only the data of the day to process (when the dataset is created).
+    logger : logging.Logger, optional
+        Logger used for the messages. Default is the "raw2l1" logger.
+
+    Returns
+    -------
+    dict
+        The data read by the reader.
+
+    Raises
+    ------
+    Raw2l1Error
+        If the processing fails.
+
+    """
+
+    logger = logger or logging.getLogger(NAME)
+    with raise_errors(logger):
+        setting = load_setting(
+            conf_file, list_files, date, ancillary, filter_day, logger
+        )
+        lidar_data = lr.RawDataReader(setting, logger)
+        lidar_data.read_data()
+
+    return lidar_data.data
+
+
+def to_bytes(
+    conf_file,
+    list_files,
+    date,
+    ancillary=None,
+    filter_day=False,
+    logger=None,
+    output=None,
+):
+    """
+    Create the output netCDF file of raw2l1 in memory.
+
+    Parameters
+    ----------
+    conf_file, list_files, date, ancillary, filter_day, logger
+        See `read`.
+    output : str or callable, optional
+        Also deliver the file to stdout (``-``), to a Unix socket
+        (``unix:PATH``) or to a function called with the content of the file.
+
+    Returns
+    -------
+    bytes
+        Content of the netCDF file.
+
+    Raises
+    ------
+    Raw2l1Error
+        If the processing fails.
+
+    """
+
+    logger = logger or logging.getLogger(NAME)
+    with raise_errors(logger):
+        setting = load_setting(
+            conf_file, list_files, date, ancillary, filter_day, logger
+        )
+        lidar_data = lr.RawDataReader(setting, logger)
+        lidar_data.read_data()
+        content = cnc.create_netcdf_memory(setting, lidar_data.data, logger)
+        if output is not None:
+            output_stream.send(content, output, logger)
+
+    return content
+
+
+def to_dataset(
+    conf_file,
+    list_files,
+    date,
+    ancillary=None,
+    filter_day=False,
+    logger=None,
+    engine="xarray",
+):
+    """
+    Create the output dataset of raw2l1 in memory.
+
+    The dataset is created from the same configuration as the output file of
+    the command line but nothing is written on disk.
+
+    Parameters
+    ----------
+    conf_file, list_files, date, ancillary, filter_day, logger
+        See `read`.
+    engine : {"xarray", "netcdf4"}, optional
+        Return a loaded `xarray.Dataset` or a read-only `netCDF4.Dataset`
+        (to close by the caller).
+
+    Returns
+    -------
+    xarray.Dataset or netCDF4.Dataset
+
+    Raises
+    ------
+    Raw2l1Error
+        If the processing fails.
+
+    """
+
+    if engine not in ("xarray", "netcdf4"):
+        raise ValueError(f"unknown engine {engine!r}")
+
+    content = to_bytes(conf_file, list_files, date, ancillary, filter_day, logger)
+
+    nc_id = nc.Dataset(MEMORY_OUTPUT, memory=content)
+    if engine == "netcdf4":
+        return nc_id
+
+    with xr.open_dataset(xr.backends.NetCDF4DataStore(nc_id)) as dataset:
+        return dataset.load()
+
+
+def raw2l1(argv):
+    """
+    Main module of raw2l1
+    """
+
+    # the output file is written on stdout: the messages are printed on stderr
+    if output_stream.STDOUT in argv:
+        sys.stdout = sys.stderr
+
+    welcome_msg()
+
+    # Read imput arguments
+    # -------------------------------------------------------------------------
+    input_args = ag.get_input_args(argv)
+
+    # Start logger
+    # -------------------------------------------------------------------------
+    logger = log.init(input_args, "raw2l1")
+    logger.info("logs are saved in {!s}".format(input_args["log"]))
+
+    if input_args["watch"]:
+        watch_input(input_args, logger)
+        logger.info("end of processing")
+        sys.exit(0)
+
+    process(input_args, logger)
+
+    # additional products. Files already read by the readers sharing a cache
+    # (HATPRO) are not read again
+    # -------------------------------------------------------------------------
+    for product in input_args["products"]:
+        logger.info("processing additional product %s", product["output"])
+        process({**input_args, **product, "products": [], "outputs": []}, logger)
+    file_io.clear_caches()
 
     # end of the program
     # -------------------------------------------------------------------------
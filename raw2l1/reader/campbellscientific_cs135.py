@@ -5,6 +5,7 @@ import sys
 
 import numpy as np
 
+from tools import column_buffer, file_io, time_window
 from tools.utils import chomp
 
 # brand and model of the LIDAR
@@ -66,48 +67,26 @@ def get_file_lines(filename, conf, logger):
     """
 
     try:
-        with open(filename, encoding=conf["file_encoding"]) as f_id:
+        with file_io.open_file(filename, encoding=conf["file_encoding"]) as f_id:
             logger.debug("reading %s", filename)
             lines = chomp(f_id.readlines())
-    except OSError:
+    except file_io.READ_ERRORS:
         logger.error("109 Impossible to open file %s", filename)
         return None
 
     return lines
 
 
-def count_msg_to_read(list_files, date_fmt, conf, logger):
+def init_data(conf, logger):
     """
-    count the number of data message in all files to read
-    """
-
-    n_data_msg = 0
-
-    # loop over filenames to read to count the number of messages
-    # data message start with a date which format is define in the conf file
-    for ifile in list_files:
-        lines = get_file_lines(ifile, conf, logger)
-        for line in lines:
-            try:
-                dt.datetime.strptime(line, date_fmt)
-                n_data_msg += 1
-            except ValueError:
-                continue
-
-    logger.info("%d data messages to read", n_data_msg)
-
-    return n_data_msg
-
-
-def init_data(time_dim, conf, logger):
-    """
-    Initialize the arraies in data dict where data are read
+    Initialize the arraies in data dict where data are read. Time dependant
+    arrays grow while messages are read
     """
 
     missing_int = conf["missing_int"]
     missing_float = conf["missing_float"]
 
-    data = {}
+    data = column_buffer.ColumnBuffer()
 
     # scalar variables
     data["instrument_id"] = ""
@@ -115,36 +94,36 @@ def init_data(time_dim, conf, logger):
     data["msg_type"] = -1
     data["range_resol"] = -1
     data["range_dim"] = -1
+    data["tilt_angle"] = missing_int
 
     # dimension
-    data["time"] = np.ones((time_dim), dtype=np.dtype(dt.datetime))
+    data.add_column("time", np.dtype(dt.datetime), 1)
     data["range"] = RANGE_RESOL * np.arange(1, RANGE_DIM + 1)
     data["cbh_layer"] = np.arange(CBH_DIM)
     data["clh_layer"] = np.arange(CLH_DIM)
     data["mlh_layer"] = np.arange(MLH_DIM)
 
     # 1dim variables
-    data["scale"] = np.ones((time_dim,), dtype=int) * missing_int
-    data["laser_energy"] = np.ones((time_dim,), dtype=int) * missing_int
-    data["laser_temp"] = np.ones((time_dim,), dtype=float) * missing_float
-    data["tilt_angle"] = np.ones((time_dim,), dtype=int) * missing_int
-    data["bckgrd_rcs_0"] = np.ones((time_dim,), dtype=float) * missing_float
-    data["laser_pulse"] = np.ones((time_dim,), dtype=float) * missing_float
-    data["sample_rate"] = np.ones((time_dim,), dtype=int) * missing_int
-    data["integrated_rcs_0"] = np.ones((time_dim,), dtype=float) * missing_float
-    data["window_transmission"] = np.ones((time_dim,), dtype=int) * missing_int
-    data["vertical_visibility"] = np.ones((time_dim,), dtype=int) * missing_int
-    data["highest_signal_received"] = np.ones((time_dim,), dtype=int) * missing_int
-    data["alarm"] = np.ndarray((time_dim,), dtype="S1")
-    data["info_flags"] = np.ndarray((time_dim,), dtype="S12")
+    data.add_column("scale", int, missing_int)
+    data.add_column("laser_energy", int, missing_int)
+    data.add_column("laser_temp", float, missing_float)
+    data.add_column("bckgrd_rcs_0", float, missing_float)
+    data.add_column("laser_pulse", float, missing_float)
+    data.add_column("sample_rate", int, missing_int)
+    data.add_column("integrated_rcs_0", float, missing_float)
+    data.add_column("window_transmission", int, missing_int)
+    data.add_column("vertical_visibility", int, missing_int)
+    data.add_column("highest_signal_received", int, missing_int)
+    data.add_column("alarm", "S1", b"")
+    data.add_column("info_flags", "S12", b"")
 
     # 2dim variables
-    data["cbh"] = np.ones((time_dim, CBH_DIM), dtype=int) * missing_int
-    data["clh"] = np.ones((time_dim, CLH_DIM), dtype=int) * missing_int
-    data["cloud_amount"] = np.ones((time_dim, CLH_DIM), dtype=int) * missing_int
-    data["mlh"] = np.ones((time_dim, MLH_DIM), dtype=int) * missing_int
-    data["mlh_qf"] = np.ones((time_dim, MLH_DIM), dtype=int) * missing_int
-    data["rcs_0"] = np.ones((time_dim, RANGE_DIM), dtype=float) * missing_float
+    data.add_column("cbh", int, missing_int, (CBH_DIM,))
+    data.add_column("clh", int, missing_int, (CLH_DIM,))
+    data.add_column("cloud_amount", int, missing_int, (CLH_DIM,))
+    data.add_column("mlh", int, missing_int, (MLH_DIM,))
+    data.add_column("mlh_qf", int, missing_int, (MLH_DIM,))
+    data.add_column("rcs_0", float, missing_float, (RANGE_DIM,))
 
     return data
 
@@ -279,13 +258,12 @@ def read_mlh(line, data, ind, logger):
 
     elts = line.split()
 
-    data["mlh_qf"] = elts[1::2]
-
-    for i, mlh in enumerate(elts[0::2]):
-        try:
-            data["mlh"][ind, i] = mlh
-        except ValueError:
-            pass
+    for var, values in [("mlh", elts[0::2]), ("mlh_qf", elts[1::2])]:
+        for i, value in enumerate(values):
+            try:
+                data[var][ind, i] = value
+            except ValueError:
+                pass
 
     return data
 
@@ -321,7 +299,6 @@ def get_msg_type(list_files, date_fmt, conf, logger):
     """
 
     tmp = {}
-    msg_type_found = False
     for f in list_files:
         lines = get_file_lines(f, conf, logger)
 
@@ -334,17 +311,12 @@ def get_msg_type(list_files, date_fmt, conf, logger):
             msg_found, tmp = read_header(lines[i + 1], tmp, logger)
             msg_type = tmp["msg_type"]
 
+            # the other files are not read
             if msg_found and is_msg_type_ok(msg_type, f, logger):
-                msg_type_found = True
-                break
+                return msg_type
 
-    if msg_type_found:
-        return msg_type
-    else:
-        logger.critical(
-            "106 impossible to determine data messages type in any input file"
-        )
-        sys.exit(2)
+    logger.critical("106 impossible to determine data messages type in any input file")
+    sys.exit(2)
 
 
 def read_msg_001(msg, data, ind, logger):
@@ -386,13 +358,9 @@ def read_msg_004(msg, data, ind, logger):
     """
 
     data = read_cbh(msg[1], data, ind, logger)
-    logger.debug("cbh read")
     data = read_sky_condition(msg[2], data, ind, logger)
-    logger.debug("sky condition read")
     data = read_laser(msg[3], data, ind, logger)
-    logger.debug("laser read")
     data = read_profile(msg[4], data, ind, logger)
-    logger.debug("profile read")
 
     return data
 
@@ -445,9 +413,6 @@ def read_data(list_files, conf, logger):
         logger.info("No encoding defined for using %s", DEFAULT_ENCODING)
         conf["file_encoding"] = DEFAULT_ENCODING
 
-    logger.info("counting number of data messages to read")
-    time_dim = count_msg_to_read(list_files, t_stamp_fmt, conf, logger)
-
     msg_type = get_msg_type(list_files, t_stamp_fmt, conf, logger)
     logger.debug("message type : %d", msg_type)
     msg_len = MSG_TYPE_LINES[msg_type]
@@ -455,36 +420,48 @@ def read_data(list_files, conf, logger):
 
     # initialize dict containing data
     logger.debug("initializing data arrays")
-    data = init_data(time_dim, conf, logger)
+    data = init_data(conf, logger)
 
     # loop over the list of files
     time_ind = 0
-    for file_nb, filename in enumerate(list_files):
+    window = conf.get(time_window.TIME_WINDOW_KEY)
+    # next file is read while the current one is decoded
+    files_lines = file_io.iter_prefetched(
+        list_files,
+        lambda f: get_file_lines(f, conf, logger),
+        file_io.get_prefetch_depth(conf),
+    )
+    for file_nb, (filename, lines) in enumerate(files_lines):
         logger.debug("reading file %02d", file_nb + 1)
-        lines = get_file_lines(filename, conf, logger)
         logger.debug("number of lines : %d", len(lines))
 
+        first_ind = time_ind
         i_line = 0
         while i_line < len(lines):
-            logger.debug("i_line : %d", i_line)
-
             try:
                 timestamp = dt.datetime.strptime(lines[i_line], t_stamp_fmt)
             except ValueError:
                 i_line += 1
                 continue
 
-            logger.debug("reading timestep: %s", repr(timestamp))
-            logger.debug("reading message: %d", time_ind)
+            # skip decoding of messages outside of the time window
+            if not time_window.is_in_window(timestamp, window):
+                i_line += msg_len + 1
+                continue
 
             # reading one data message
+            data.reserve(time_ind + 1)
             data["time"][time_ind] = timestamp
             msg = lines[i_line + 1 : i_line + msg_len + 1]
             data = MSG_TYPE_READER[msg_type](msg, data, time_ind, logger)
-            logger.debug("message read")
 
             # incrementing line number and timestep
             i_line += MSG_TYPE_LINES[msg_type] + 1
             time_ind += 1
 
-    return data
+        # one summary per file instead of messages for each data message
+        logger.debug("%d data messages read in %s", time_ind - first_ind, filename)
+
+    logger.info("%d data messages read", time_ind)
+
+    return data.finalize(time_ind)
@@ -9,6 +9,8 @@ import sys
 
 import numpy as np
 
+from tools import file_io
+
 # brand and model of the LIDAR
 BRAND = "leosphere"
 MODEL = "WLS70 10 min"
@@ -159,7 +161,7 @@ def read_file(file_, conf, logger):
     """read one file and return a list without newline character"""
 
     logger.debug(f"reading {os.path.basename(file_)}")
-    with open(file_, encoding=conf["file_encoding"]) as f_id:
+    with file_io.open_file(file_, encoding=conf["file_encoding"]) as f_id:
         raw_lines = f_id.readlines()
 
     # remove end of line character
@@ -235,7 +237,7 @@ def read_header_data(file_, conf, data, logger):
 def read_columns(file_, data, conf, logger):
     """read the data store as columns"""
     # get the number of columns to fix types
-    with open(file_, encoding=conf["file_encoding"]) as f_id:
+    with file_io.open_file(file_, encoding=conf["file_encoding"]) as f_id:
         # get size of header
         try:
             header = int(f_id.readline().strip().split("=")[1])
@@ -253,18 +255,19 @@ def read_columns(file_, data, conf, logger):
     logger.debug(f"available columns {col_names}")
     logger.debug("reading columns")
 
-    columns = np.genfromtxt(
-        file_,
-        encoding=conf["file_encoding"],
-        skip_header=header + 2,
-        delimiter=FILE_SEP,
-        missing_values=RAW_DATA_MISSING,
-        filling_values=conf["missing_float"],
-        names=col_names,
-        dtype=col_dtypes,
-        converters={0: convert_time_str},
-        invalid_raise=False,
-    )
+    with file_io.open_file(file_, encoding=conf["file_encoding"]) as f_id:
+        columns = np.genfromtxt(
+            f_id,
+            encoding=conf["file_encoding"],
+            skip_header=header + 2,
+            delimiter=FILE_SEP,
+            missing_values=RAW_DATA_MISSING,
+            filling_values=conf["missing_float"],
+            names=col_names,
+            dtype=col_dtypes,
+            converters={0: convert_time_str},
+            invalid_raise=False,
+        )
 
     logger.debug(f"columns read : {columns.dtype.names}")
 
@@ -293,7 +296,7 @@ def create_1d_var(raw_data, data, var_names, conf, logger):
 
         # case column was not found
         if name not in data:
-            data[name] = np.ones((raw_data.size,)) * conf["missing_float"]
+            data[name] = np.full((raw_data.size,), conf["missing_float"])
 
     return data
 
@@ -321,9 +324,7 @@ def create_2d_var(raw_data, data, list_vars, conf, logger):
 
         # create array and fill it
         # --------------------------------------------------------------------
-        var_2d = (
-            np.ones((raw_data.size, data["range"].shape[0])) * conf["missing_float"]
-        )
+        var_2d = np.full((raw_data.size, data["range"].shape[0]), conf["missing_float"])
 
         if len(col_2_join) != 0:
             logger.debug(f"corresponding columns found : {col_2_join}")
@@ -413,7 +414,7 @@ def read_data(list_files, conf, logger):
 
     # period of mean
     data["nv"] = 2
-    data["time_bounds"] = np.ones(
+    data["time_bounds"] = np.empty(
         (data["time"].size, data["nv"]), dtype=np.dtype(dt.datetime)
     )
     data["time_bounds"][:, 0] = data["start_time"]
@@ -9,6 +9,8 @@ import sys
 
 import numpy as np
 
+from tools import file_io
+
 # brand and model of the LIDAR
 BRAND = "leosphere"
 MODEL = "WLS7 10 min"
@@ -152,7 +154,7 @@ def read_file(file_, conf, logger):
     """read one file and return a list without newline character"""
 
     logger.debug(f"reading {os.path.basename(file_)}")
-    with open(file_, encoding=conf["file_encoding"]) as f_id:
+    with file_io.open_file(file_, encoding=conf["file_encoding"]) as f_id:
         raw_lines = f_id.readlines()
 
     # remove end of line character
@@ -231,7 +233,7 @@ def read_columns(file_, data, conf, logger):
     header = data["HeaderSize"]
 
     # get the number of columns to fix types
-    with open(file_, encoding=conf["file_encoding"]) as f_id:
+    with file_io.open_file(file_, encoding=conf["file_encoding"]) as f_id:
         count = 0
         while count <= header + 1:
             line = f_id.readline()
@@ -243,18 +245,19 @@ def read_columns(file_, data, conf, logger):
 
     logger.debug("reading columns")
 
-    columns = np.genfromtxt(
-        file_,
-        encoding=conf["file_encoding"],
-        skip_header=header + 2,
-        delimiter=FILE_SEP,
-        missing_values=RAW_DATA_MISSING,
-        filling_values=conf["missing_float"],
-        names=col_names,
-        dtype=col_dtypes,
-        converters={0: convert_time_str},
-        invalid_raise=False,
-    )
+    with file_io.open_file(file_, encoding=conf["file_encoding"]) as f_id:
+        columns = np.genfromtxt(
+            f_id,
+            encoding=conf["file_encoding"],
+            skip_header=header + 2,
+            delimiter=FILE_SEP,
+            missing_values=RAW_DATA_MISSING,
+            filling_values=conf["missing_float"],
+            names=col_names,
+            dtype=col_dtypes,
+            converters={0: convert_time_str},
+            invalid_raise=False,
+        )
 
     return columns
 
@@ -281,7 +284,7 @@ def create_1d_var(raw_data, data, var_names, conf, logger):
 
         # case column was not found
         if name not in data:
-            data[name] = np.ones((raw_data.size,)) * conf["missing_float"]
+            data[name] = np.full((raw_data.size,), conf["missing_float"])
 
     return data
 
@@ -307,9 +310,7 @@ def create_2d_var(raw_data, data, list_vars, conf, logger):
 
         # create array and fill it
         # --------------------------------------------------------------------
-        var_2d = (
-            np.ones((raw_data.size, data["range"].shape[0])) * conf["missing_float"]
-        )
+        var_2d = np.full((raw_data.size, data["range"].shape[0]), conf["missing_float"])
 
         if len(col_2_join) != 0:
             logger.debug(f"corresponding columns found : {col_2_join}")
@@ -390,7 +391,7 @@ def read_data(list_files, conf, logger):
 
     # time bounds
     data["nv"] = 2
-    data["time_bounds"] = np.ones(
+    data["time_bounds"] = np.empty(
         (data["time"].size, data["nv"]), dtype=np.dtype(dt.datetime)
     )
     data["time_bounds"][:, 0] = data["start_time"]
@@ -1,3 +1,19 @@
+import datetime as dt
+import os
+
+import netCDF4 as nc
+
+from tools import cf_time, file_io, time_align
+
+TIME_VAR = "time"
+
+# data of the RPG files already read during the run. The products processed
+# in the same run (-product option) and the ancillary MET and IRT files they
+# share are read only once. Only the last version of each file is kept and
+# the cache is cleared at the end of the run
+FILE_CACHE = {}
+
+
 def correct_time_units(s):
     """correct the wrong format of time units of RPG into a compatible with
     CF convention and num2date and date2num netCDF4 modules
@@ -21,3 +37,93 @@ def correct_time_units(s):
         int(minutes),
         int(seconds),
     )
+
+
+def read_time(nc_id):
+    """read time variable and convert it to datetime64"""
+
+    time = nc_id.variables[TIME_VAR][:]
+    units = correct_time_units(nc_id.variables[TIME_VAR].units)
+
+    return cf_time.num2date(time, units)
+
+
+def get_file_key(filename):
+    """key of a file in the cache. Modified files are read again"""
+
+    stat = os.stat(filename)
+
+    return os.path.abspath(filename), stat.st_mtime_ns, stat.st_size
+
+
+def read_file(filename, var_names, logger):
+    """
+    read the dimensions, the time and some variables of a RPG file
+
+    the file is only opened if some of the variables have not already been
+    read during the run. Returned dict must not be modified.
+    """
+
+    key = get_file_key(filename)
+    rpg_data = FILE_CACHE.get(key, {})
+
+    to_read = [var for var in var_names if var not in rpg_data]
+    if "time" in rpg_data and not to_read:
+        logger.debug("%s already read", filename)
+        return rpg_data
+
+    logger.debug("reading %s", filename)
+    new_data = {}
+    with nc.Dataset(filename, "r") as nc_id:
+        if "time" not in rpg_data:
+            new_data["dims"] = {
+                name: len(dim) for name, dim in nc_id.dimensions.items()
+            }
+            new_data["time"] = read_time(nc_id)
+
+        for var in to_read:
+            new_data[var] = nc_id.variables[var][:]
+
+    # cache only updated once the file is read. The data of the previous
+    # versions of the file are not used anymore
+    for old_key in [k for k in FILE_CACHE if k[0] == key[0] and k != key]:
+        del FILE_CACHE[old_key]
+    rpg_data = FILE_CACHE.setdefault(key, rpg_data)
+    rpg_data.update(new_data)
+
+    return rpg_data
+
+
+def align_ancillary(data, aux_data, aux_name, conf, logger):
+    """
+    find for each time step of data the index of the ancillary data to use
+
+    the time steps are matched exactly unless a tolerance in seconds is set
+    with the `time_sync_tolerance` option of the reader_conf section. In this
+    case, the nearest ancillary time step is used. -1 is returned for time
+    steps without ancillary data
+    """
+
+    tolerance = float(conf.get("time_sync_tolerance", 0.0))
+    if tolerance > 0.0:
+        ind, stats = time_align.align_time(
+            data["time"],
+            aux_data["time"],
+            mode=time_align.MODE_NEAREST,
+            tolerance=dt.timedelta(seconds=tolerance),
+        )
+    else:
+        ind, stats = time_align.align_time(data["time"], aux_data["time"])
+
+    time_align.log_stats(stats, aux_name, logger)
+
+    return ind
+
+
+def clear_cache():
+    """remove the data of all files read"""
+
+    FILE_CACHE.clear()
+
+
+file_io.register_cache(clear_cache)
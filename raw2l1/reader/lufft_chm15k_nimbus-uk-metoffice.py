@@ -4,6 +4,8 @@ import sys
 import netCDF4 as nc
 import numpy as np
 
+from tools import allocation, ancillary_cache, cf_time, file_io
+
 # brand and model of the LIDAR
 BRAND = "jenoptik"
 MODEL = "CHM15K nimbus (UK MetOffice data format)"
@@ -314,13 +316,13 @@ def log_error_msg(data, logger):
             logger.error(msg_format.format(msg, data["list_errors"][msg]["count"]))
 
 
-def read_overlap(overlap_file, missing_float, logger):
-    """read overlap from lufft TUB*.cfg file"""
+def parse_overlap(overlap_file, logger):
+    """parse overlap from lufft TUB*.cfg file (second line of the file)"""
     with open(overlap_file) as f_ovl:
         raw_ovl = f_ovl.readlines()[1]
 
     try:
-        ovl = np.array([float(value) for value in raw_ovl.split()])
+        ovl = np.array(raw_ovl.split(), dtype=np.float64)
     except ValueError:
         logger.error("Problem while reading overlap. overlap data are ignore")
         logger.error("Check your TUB* file")
@@ -329,6 +331,11 @@ def read_overlap(overlap_file, missing_float, logger):
     return ovl
 
 
+def read_overlap(overlap_file, missing_float, logger):
+    """read overlap from lufft TUB*.cfg file. Parsed overlap is cached"""
+    return ancillary_cache.load(overlap_file, parse_overlap, logger)
+
+
 def get_soft_version(str_version):
     """
     function to get the number of acquisition software version as a float
@@ -343,10 +350,10 @@ def get_soft_version(str_version):
 
 def date_to_dt(date_num, date_units):
     """
-    convert date np.array from datenum to datetime.datetime
+    convert date np.array from datenum to datetime64
     """
 
-    return nc.num2date(date_num, units=date_units, calendar="standard")
+    return cf_time.num2date(date_num, date_units)
 
 
 def get_vars_dim(list_files, logger):
@@ -417,6 +424,8 @@ def init_data(vars_dim, conf, logger):
     the output data dictionnary
     """
 
+    alloc = allocation.Allocator()
+
     missing_int = conf["missing_int"]
     missing_float = conf["missing_float"]
 
@@ -436,8 +445,8 @@ def init_data(vars_dim, conf, logger):
 
     # dimensions of the output netCDf file
     # -------------------------------------------------------------------------
-    data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    data["range"] = np.ones((vars_dim["range"],), dtype=np.float32) * missing_float
+    data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    data["range"] = alloc.full((vars_dim["range"],), missing_float, np.float32)
     data["layer"] = np.arange(vars_dim["layer"])
 
     # scalar variables
@@ -451,55 +460,51 @@ def init_data(vars_dim, conf, logger):
 
     # Time dependent variables
     # -------------------------------------------------------------------------
-    data["average_time"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["vor"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["voe"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["tcc"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["stddev"] = np.ones((vars_dim["time"],), dtype=np.float32) * missing_float
-    data["state_optics"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["state_laser"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["state_detector"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["sci"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["nn1"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["nn2"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["nn3"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["mxd"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["life_time"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["error_ext"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["temp_lom"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["temp_int"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["temp_ext"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["temp_det"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["laser_pulses"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["error_ext"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["bcc"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["bckgrd_rcs_0"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["p_calc"] = np.ones((vars_dim["time"],), dtype=np.float32) * missing_int
-    data["overlap"] = np.ones((vars_dim["range"],), dtype=np.float32) * missing_float
+    data["average_time"] = alloc.full((vars_dim["time"],), missing_float, np.float32)
+    data["vor"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["voe"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["tcc"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["stddev"] = alloc.full((vars_dim["time"],), missing_float, np.float32)
+    data["state_optics"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["state_laser"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["state_detector"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["sci"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["nn1"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["nn2"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["nn3"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["mxd"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["life_time"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["error_ext"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["temp_lom"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["temp_int"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["temp_ext"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["temp_det"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["laser_pulses"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["error_ext"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["bcc"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["bckgrd_rcs_0"] = alloc.full((vars_dim["time"],), missing_float, np.float32)
+    data["p_calc"] = alloc.full((vars_dim["time"],), missing_int, np.float32)
+    data["overlap"] = alloc.full((vars_dim["range"],), missing_float, np.float32)
 
     # Time, layer dependent variables
     # -------------------------------------------------------------------------
-    data["pbs"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int8) * missing_int
+    data["pbs"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int8
     )
-    data["pbl"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["pbl"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cdp"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cdp"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cde"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cde"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cbh"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cbh"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cbe"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cbe"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
 
     data["list_errors"] = {}
@@ -508,16 +513,18 @@ def init_data(vars_dim, conf, logger):
     # -------------------------------------------------------------------------
 
     # for MetOffice data
-    data["beta"] = (
-        np.ones((vars_dim["time"], vars_dim["range"]), dtype=np.float32) * missing_float
+    data["beta"] = alloc.full(
+        (vars_dim["time"], vars_dim["range"]), missing_float, np.float32
     )
-    data["beta_raw"] = (
-        np.ones((vars_dim["time"], vars_dim["range"]), dtype=np.float32) * missing_float
+    data["beta_raw"] = alloc.full(
+        (vars_dim["time"], vars_dim["range"]), missing_float, np.float32
     )
-    data["rcs_0"] = (
-        np.ones((vars_dim["time"], vars_dim["range"]), dtype=np.float32) * missing_float
+    data["rcs_0"] = alloc.full(
+        (vars_dim["time"], vars_dim["range"]), missing_float, np.float32
     )
 
+    alloc.log_summary(logger)
+
     return data
 
 
@@ -682,10 +689,14 @@ def read_data(list_files, conf, logger):
     nb_files_read = 0
     time_ind = 0
     # Loop over the list of files
-    for ifile in list_files:
+    # next files are loaded while the current one is decoded
+    files_content = file_io.iter_prefetched(
+        list_files, file_io.load_content, file_io.get_prefetch_depth(conf)
+    )
+    for ifile, content in files_content:
         # Opening file
         try:
-            raw_data = nc.Dataset(ifile, "r")
+            raw_data = file_io.open_netcdf(ifile, content)
             nb_files_read += 1
         except OSError:
             logger.error("109 unable to load " + ifile + " trying next one")
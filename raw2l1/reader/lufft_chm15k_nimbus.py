@@ -4,6 +4,16 @@ import sys
 import netCDF4 as nc
 import numpy as np
 
+from tools import (
+    allocation,
+    ancillary_cache,
+    cf_time,
+    file_io,
+    projection,
+    range_correction,
+    time_window,
+)
+
 # brand and model of the LIDAR
 BRAND = "jenoptik"
 MODEL = "CHM15K nimbus"
@@ -318,19 +328,14 @@ def log_error_msg(data, logger):
             logger.error(msg_format.format(msg, data["list_errors"][msg]["count"]))
 
 
-def read_overlap(overlap_file, missing_float, logger):
-    """read overlap from lufft TUB*.cfg file"""
-    try:
-        with open(overlap_file) as f_ovl:
-            f_ovl.readline()
-            raw_ovl = f_ovl.readline()
-    except OSError as err:
-        logger.error("impossible to read %s", overlap_file)
-        logger.error(err)
-        sys.exit(1)
+def parse_overlap(overlap_file, logger):
+    """parse overlap from lufft TUB*.cfg file (second line of the file)"""
+    with open(overlap_file) as f_ovl:
+        f_ovl.readline()
+        raw_ovl = f_ovl.readline()
 
     try:
-        ovl = np.array([float(value) for value in raw_ovl.split()])
+        ovl = np.array(raw_ovl.split(), dtype=np.float64)
     except ValueError:
         logger.error("Problem while reading overlap. overlap data are ignore")
         logger.error("Check your TUB* file")
@@ -339,6 +344,18 @@ def read_overlap(overlap_file, missing_float, logger):
     return ovl
 
 
+def read_overlap(overlap_file, missing_float, logger):
+    """read overlap from lufft TUB*.cfg file. Parsed overlap is cached"""
+    try:
+        ovl = ancillary_cache.load(overlap_file, parse_overlap, logger)
+    except OSError as err:
+        logger.error("impossible to read %s", overlap_file)
+        logger.error(err)
+        sys.exit(1)
+
+    return ovl
+
+
 def get_soft_version(str_version):
     """
     function to get the number of acquisition software version as a float
@@ -354,25 +371,21 @@ def get_soft_version(str_version):
 
 def date_to_dt(date_num, date_units):
     """
-    convert date np.array from datenum to datetime.datetime
+    convert date np.array from datenum to datetime64
     """
 
-    return nc.num2date(
-        date_num,
-        units=date_units,
-        calendar="standard",
-        only_use_cftime_datetimes=False,
-        only_use_python_datetimes=True,
-    )
+    return cf_time.num2date(date_num, date_units)
 
 
-def get_vars_dim(list_files, logger):
+def get_vars_dim(list_files, logger, window=None):
     """
     analyse the files to be read to determine the size of the final
-    time dimension
+    time dimension. Only the times inside the time window are counted.
+    The files with times inside the window are also returned
     """
 
     data_dim = {}
+    files_to_read = []
     data_dim["time"] = 0
     data_dim["range"] = 0
     data_dim["layer"] = 0
@@ -391,7 +404,12 @@ def get_vars_dim(list_files, logger):
             data_dim["range"] = len(nc_id.variables["range"][:])
             data_dim["layer"] = len(nc_id.variables["layer"][:])
 
-        data_dim["time"] += len(nc_id.variables["time"][:])
+        time_var = nc_id.variables["time"]
+        t_sel = time_window.get_nc_time_selection(time_var, window)
+        time_size = time_window.get_selection_size(t_sel, time_var.size)
+        data_dim["time"] += time_size
+        if window is None or time_size > 0:
+            files_to_read.append(ifile)
 
         nc_id.close()
 
@@ -399,10 +417,14 @@ def get_vars_dim(list_files, logger):
     for key in list(data_dim.keys()):
         logger.debug("%r : %d" % (key, data_dim[key]))
 
-    return data_dim
+    # the first file still provides the dimensions and the scalars
+    if not files_to_read:
+        files_to_read = list_files[:1]
 
+    return data_dim, files_to_read
 
-def get_temp(nc_obj, logger):
+
+def get_temp(nc_obj, logger, t_sel=slice(None)):
     """
     convert temperature to Kelvin taking into account errors in files with
     version lower than 0.7
@@ -417,11 +439,11 @@ def get_temp(nc_obj, logger):
     """
 
     try:
-        tmp = nc_obj[:]
+        tmp = nc_obj[t_sel]
     except TypeError:
         logger.debug("Correcting temperature scale problem")
         nc_obj.set_auto_maskandscale(False)
-        tmp = nc_obj[:] / float(nc_obj.scale_factor)
+        tmp = nc_obj[t_sel] / float(nc_obj.scale_factor)
 
     return tmp
 
@@ -432,6 +454,8 @@ def init_data(vars_dim, conf, logger):
     the output data dictionnary
     """
 
+    alloc = allocation.Allocator()
+
     missing_int = conf["missing_int"]
     missing_float = conf["missing_float"]
 
@@ -451,9 +475,9 @@ def init_data(vars_dim, conf, logger):
 
     # dimensions of the output netCDf file
     # -------------------------------------------------------------------------
-    data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    data["range"] = np.ones((vars_dim["range"],), dtype=np.float32) * missing_float
-    data["layer"] = np.ones((vars_dim["layer"],), dtype=np.int16) * missing_int
+    data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    data["range"] = alloc.full((vars_dim["range"],), missing_float, np.float32)
+    data["layer"] = alloc.full((vars_dim["layer"],), missing_int, np.int16)
 
     # scalar variables
     # -------------------------------------------------------------------------
@@ -461,55 +485,51 @@ def init_data(vars_dim, conf, logger):
 
     # Time dependent variables
     # -------------------------------------------------------------------------
-    data["vor"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["voe"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["tcc"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["stddev"] = np.ones((vars_dim["time"],), dtype=np.float32) * missing_float
-    data["state_optics"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["state_laser"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["state_detector"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["sci"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["nn1"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["nn2"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["nn3"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["mxd"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["life_time"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["error_ext"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["temp_lom"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["temp_int"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["temp_ext"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["temp_det"] = np.ones((vars_dim["time"],), dtype=np.int16) * missing_int
-    data["laser_pulses"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["error_ext"] = np.ones((vars_dim["time"],), dtype=np.int32) * missing_int
-    data["bcc"] = np.ones((vars_dim["time"],), dtype=np.int8) * missing_int
-    data["bckgrd_rcs_0"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["average_time"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["p_calc"] = np.ones((vars_dim["time"],), dtype=np.float32) * missing_int
-    data["overlap"] = np.ones((vars_dim["range"],), dtype=np.float32) * missing_float
+    data["vor"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["voe"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["tcc"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["stddev"] = alloc.full((vars_dim["time"],), missing_float, np.float32)
+    data["state_optics"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["state_laser"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["state_detector"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["sci"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["nn1"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["nn2"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["nn3"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["mxd"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["life_time"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["error_ext"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["temp_lom"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["temp_int"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["temp_ext"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["temp_det"] = alloc.full((vars_dim["time"],), missing_int, np.int16)
+    data["laser_pulses"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["error_ext"] = alloc.full((vars_dim["time"],), missing_int, np.int32)
+    data["bcc"] = alloc.full((vars_dim["time"],), missing_int, np.int8)
+    data["bckgrd_rcs_0"] = alloc.full((vars_dim["time"],), missing_float, np.float32)
+    data["average_time"] = alloc.full((vars_dim["time"],), missing_float, np.float32)
+    data["p_calc"] = alloc.full((vars_dim["time"],), missing_int, np.float32)
+    data["overlap"] = alloc.full((vars_dim["range"],), missing_float, np.float32)
 
     # Time, layer dependent variables
     # -------------------------------------------------------------------------
-    data["pbs"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int8) * missing_int
+    data["pbs"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int8
     )
-    data["pbl"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["pbl"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cdp"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cdp"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cde"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cde"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cbh"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cbh"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
-    data["cbe"] = (
-        np.ones((vars_dim["time"], vars_dim["layer"]), dtype=np.int16) * missing_int
+    data["cbe"] = alloc.full(
+        (vars_dim["time"], vars_dim["layer"]), missing_int, np.int16
     )
 
     data["list_errors"] = {}
@@ -518,26 +538,26 @@ def init_data(vars_dim, conf, logger):
     # -------------------------------------------------------------------------
 
     # for MetOffice data
-    data["beta"] = (
-        np.ones((vars_dim["time"], vars_dim["range"]), dtype=np.float32) * missing_float
+    data["beta"] = alloc.full(
+        (vars_dim["time"], vars_dim["range"]), missing_float, np.float32
     )
-    data["beta_raw"] = (
-        np.ones((vars_dim["time"], vars_dim["range"]), dtype=np.float32) * missing_float
-    )
-    data["rcs_0"] = (
-        np.ones((vars_dim["time"], vars_dim["range"]), dtype=np.float32) * missing_float
+    data["beta_raw"] = alloc.full(
+        (vars_dim["time"], vars_dim["range"]), missing_float, np.float32
     )
+    # rcs_0 is computed from the profiles read (see calc_pr2)
+
+    alloc.log_summary(logger)
 
     return data
 
 
-def read_time_var(data, nc_id, time_ind, logger):
+def read_time_var(data, nc_id, time_ind, logger, t_sel=slice(None)):
     """
     Add data to the time variable dimension
     """
 
     logger.debug("convert time variable into datetime object")
-    tmp = nc_id.variables["time"][:]
+    tmp = nc_id.variables["time"][t_sel]
     time_size = len(tmp)
 
     ind_b = time_ind
@@ -548,18 +568,14 @@ def read_time_var(data, nc_id, time_ind, logger):
     return time_size, data
 
 
-def read_dim_vars(data, nc_id, logger):
+def read_dim_vars(data, nc_id, logger, t_sel=slice(None)):
     """
     read dimension variables of the netCDf file
     """
 
-    # get time variable size
-    tmp = nc_id.variables["time"][:]
-    time_size = len(tmp)
-
     logger.debug("reading time variable")
     # first reading of time variable
-    time_size, data = read_time_var(data, nc_id, 0, logger)
+    time_size, data = read_time_var(data, nc_id, 0, logger, t_sel)
 
     logger.debug("reading range")
     data["range"] = nc_id.variables["range"][:]
@@ -600,7 +616,9 @@ def read_scalar_vars(data, nc_id, soft_vers, logger):
     return data
 
 
-def read_timedep_vars(data, nc_id, soft_vers, time_ind, time_size, logger):
+def read_timedep_vars(
+    data, nc_id, soft_vers, time_ind, time_size, logger, t_sel=slice(None)
+):
     """
     read time depedant variables in the netCDf files
     """
@@ -611,83 +629,85 @@ def read_timedep_vars(data, nc_id, soft_vers, time_ind, time_size, logger):
     # time dependent variables
     # ---------------------------------------------------------------------
     logger.debug("reading vertical optical range (vor)")
-    data["vor"][ind_b:ind_e] = nc_id.variables["vor"][:]
+    data["vor"][ind_b:ind_e] = nc_id.variables["vor"][t_sel]
     logger.debug("reading vertical optical range error (voe)")
-    data["voe"][ind_b:ind_e] = nc_id.variables["voe"][:]
+    data["voe"][ind_b:ind_e] = nc_id.variables["voe"][t_sel]
     logger.debug("reading total cloud cover (tcc)")
-    data["tcc"][ind_b:ind_e] = nc_id.variables["tcc"][:]
+    data["tcc"][ind_b:ind_e] = nc_id.variables["tcc"][t_sel]
     logger.debug("reading state_optics")
-    data["state_optics"][ind_b:ind_e] = nc_id.variables["state_optics"][:]
+    data["state_optics"][ind_b:ind_e] = nc_id.variables["state_optics"][t_sel]
     logger.debug("reading state_laser")
-    data["state_laser"][ind_b:ind_e] = nc_id.variables["state_laser"][:]
+    data["state_laser"][ind_b:ind_e] = nc_id.variables["state_laser"][t_sel]
     logger.debug("reading state_detector")
-    data["state_detector"][ind_b:ind_e] = nc_id.variables["state_detector"][:]
+    data["state_detector"][ind_b:ind_e] = nc_id.variables["state_detector"][t_sel]
     logger.debug("reading sky condition index (sci)")
-    data["sci"][ind_b:ind_e] = nc_id.variables["sci"][:]
+    data["sci"][ind_b:ind_e] = nc_id.variables["sci"][t_sel]
     logger.debug("reading nn1")
-    data["nn1"][ind_b:ind_e] = nc_id.variables["nn1"][:]
+    data["nn1"][ind_b:ind_e] = nc_id.variables["nn1"][t_sel]
     logger.debug("reading average time")
     data["average_time"][ind_b:ind_e] = (
-        nc_id.variables["average_time"][:] / 1000.0
+        nc_id.variables["average_time"][t_sel] / 1000.0
     )  # convert ms to s
 
     logger.debug("reading nn2")
     try:
-        data["nn2"][ind_b:ind_e] = nc_id.variables["nn2"][:]
+        data["nn2"][ind_b:ind_e] = nc_id.variables["nn2"][t_sel]
         data["meta"]["is_nn2"] = True
     except KeyError:
         logger.warning("nn2 variable not available")
 
     logger.debug("reading nn3")
     try:
-        data["nn3"][ind_b:ind_e] = nc_id.variables["nn3"][:]
+        data["nn3"][ind_b:ind_e] = nc_id.variables["nn3"][t_sel]
     except KeyError:
         logger.warning("nn3 variable not available")
 
     logger.debug("reading maximum detection height (mxd)")
-    data["mxd"][ind_b:ind_e] = nc_id.variables["mxd"][:]
+    data["mxd"][ind_b:ind_e] = nc_id.variables["mxd"][t_sel]
     logger.debug("reading life_time")
-    data["life_time"][ind_b:ind_e] = nc_id.variables["life_time"][:]
+    data["life_time"][ind_b:ind_e] = nc_id.variables["life_time"][t_sel]
     logger.debug("reading 31 bit service code (error_ext)")
-    data["error_ext"][ind_b:ind_e] = nc_id.variables["error_ext"][:]
+    data["error_ext"][ind_b:ind_e] = nc_id.variables["error_ext"][t_sel]
     logger.debug("reading base cloud cover (bcc)")
-    data["bcc"][ind_b:ind_e] = nc_id.variables["bcc"][:]
+    data["bcc"][ind_b:ind_e] = nc_id.variables["bcc"][t_sel]
     logger.debug("reading bckgrd_rcs_0 as base")
-    data["bckgrd_rcs_0"][ind_b:ind_e] = nc_id.variables["base"][:]
+    data["bckgrd_rcs_0"][ind_b:ind_e] = nc_id.variables["base"][t_sel]
     logger.debug("reading stddev")
-    data["stddev"][ind_b:ind_e] = nc_id.variables["stddev"][:]
+    data["stddev"][ind_b:ind_e] = nc_id.variables["stddev"][t_sel]
 
     # time dependant temperatures
     logger.debug("reading temp_lom")
     try:
-        data["temp_lom"][ind_b:ind_e] = get_temp(nc_id.variables["temp_lom"], logger)
+        data["temp_lom"][ind_b:ind_e] = get_temp(
+            nc_id.variables["temp_lom"], logger, t_sel
+        )
     except KeyError:
         logger.warning("temp_lom variable is not available")
     logger.debug("reading temp_int")
-    data["temp_int"][ind_b:ind_e] = get_temp(nc_id.variables["temp_int"], logger)
+    data["temp_int"][ind_b:ind_e] = get_temp(nc_id.variables["temp_int"], logger, t_sel)
     logger.debug("reading temp_ext")
-    data["temp_ext"][ind_b:ind_e] = get_temp(nc_id.variables["temp_ext"], logger)
+    data["temp_ext"][ind_b:ind_e] = get_temp(nc_id.variables["temp_ext"], logger, t_sel)
     logger.debug("reading temp_det")
-    data["temp_det"][ind_b:ind_e] = get_temp(nc_id.variables["temp_det"], logger)
+    data["temp_det"][ind_b:ind_e] = get_temp(nc_id.variables["temp_det"], logger, t_sel)
 
     # 2d time dependent variables
     # ---------------------------------------------------------------------
     logger.debug("reading quality score for aerosol layer in PBL")
-    data["pbs"][ind_b:ind_e, :] = nc_id.variables["pbs"][:]
+    data["pbs"][ind_b:ind_e, :] = nc_id.variables["pbs"][t_sel]
     logger.debug("reading aerosol layer in pbl (pbl)")
-    data["pbl"][ind_b:ind_e, :] = nc_id.variables["pbl"][:]
+    data["pbl"][ind_b:ind_e, :] = nc_id.variables["pbl"][t_sel]
     logger.debug("reading cbh")
-    data["cbh"][ind_b:ind_e, :] = nc_id.variables["cbh"][:, :]
+    data["cbh"][ind_b:ind_e, :] = nc_id.variables["cbh"][t_sel]
     logger.debug("reading cloud depth (cdp)")
-    data["cdp"][ind_b:ind_e, :] = nc_id.variables["cdp"][:]
+    data["cdp"][ind_b:ind_e, :] = nc_id.variables["cdp"][t_sel]
     logger.debug("reading cloud depth variation (cde)")
-    data["cbe"][ind_b:ind_e, :] = nc_id.variables["cbe"][:]
+    data["cbe"][ind_b:ind_e, :] = nc_id.variables["cbe"][t_sel]
     logger.debug("reading cloud base height variation (cbe)")
-    data["cde"][ind_b:ind_e, :] = nc_id.variables["cde"][:]
+    data["cde"][ind_b:ind_e, :] = nc_id.variables["cde"][t_sel]
     logger.debug("reading beta_raw")
     # for firmware > 1.05 variable can be changed to beta_att
     try:
-        beta_att = nc_id.variables["beta_att"][:]
+        beta_att = nc_id.variables["beta_att"][t_sel]
         try:
             c_cal = nc_id.variables["c_cal"][:]
         except KeyError:
@@ -702,11 +722,11 @@ def read_timedep_vars(data, nc_id, soft_vers, time_ind, time_size, logger):
             "(undoing firmware pseudo-calibration)"
         )
     except KeyError:
-        data["beta_raw"][ind_b:ind_e, :] = nc_id.variables["beta_raw"][:]
+        data["beta_raw"][ind_b:ind_e, :] = nc_id.variables["beta_raw"][t_sel]
         logger.debug("using beta_raw variable")
     # case of MetOffice
     try:
-        data["beta"][ind_b:ind_e, :] = nc_id.variables["beta"][:]
+        data["beta"][ind_b:ind_e, :] = nc_id.variables["beta"][t_sel]
         data["is_metoffice"] = True
         logger.debug("reading beta (MetOffice data)")
     except KeyError:
@@ -715,14 +735,14 @@ def read_timedep_vars(data, nc_id, soft_vers, time_ind, time_size, logger):
     # Read variables depending on software version
     if 0.235 < soft_vers <= 0.559:
         logger.debug("reading laser_pulses as nn2")
-        data["laser_pulses"][ind_b:ind_e] = nc_id.variables["nn2"][:]
+        data["laser_pulses"][ind_b:ind_e] = nc_id.variables["nn2"][t_sel]
     elif soft_vers > 0.559:
         logger.debug("reading laser_pulses")
-        data["laser_pulses"][ind_b:ind_e] = nc_id.variables["laser_pulses"][:]
+        data["laser_pulses"][ind_b:ind_e] = nc_id.variables["laser_pulses"][t_sel]
 
     logger.debug("reading p_calc")
     try:
-        data["p_calc"][ind_b:ind_e] = nc_id.variables["p_calc"][:]
+        data["p_calc"][ind_b:ind_e] = nc_id.variables["p_calc"][t_sel]
         data["meta"]["is_p_calc"] = True
     except KeyError:
         logger.debug("p_calc variable not available")
@@ -730,7 +750,7 @@ def read_timedep_vars(data, nc_id, soft_vers, time_ind, time_size, logger):
     return data
 
 
-def calc_pr2(data, soft_vers, logger):
+def calc_pr2(data, soft_vers, conf, logger):
     """
     Do the calculation of the Pr² according to the sofware version of the LIDAR
     """
@@ -753,9 +773,13 @@ def calc_pr2(data, soft_vers, logger):
 
         logger.debug("P = (beta_raw*stddev)*p_calc")
         print("0 value P_CALC :", np.any(data["p_calc"] == 0))
-        data["rcs_0"] = (
-            (data["beta_raw"].T * data["stddev"]) / data["p_calc"]
-        ).T * np.square(data["range"])
+        # computed in the output type of rcs_0, range corrected in place
+        dtype = projection.get_dtype(conf, "rcs_0", range_correction.DEFAULT_DTYPE)
+        rcs = np.multiply(data["beta_raw"], data["stddev"][:, np.newaxis], dtype=dtype)
+        rcs /= np.reshape(data["p_calc"], (-1, 1))
+        data["rcs_0"] = range_correction.range_correct(
+            rcs, data["range"], dtype=dtype, out=rcs
+        )
     else:
         # find a way to pass the overlap
         logger.debug(
@@ -786,7 +810,8 @@ def read_data(list_files, conf, logger):
     # analyse the files to read to get the complete size of data
     # ------------------------------------------------------------------------
     logger.info("determining size of var to read")
-    vars_dim = get_vars_dim(list_files, logger)
+    window = conf.get(time_window.TIME_WINDOW_KEY)
+    vars_dim, list_files = get_vars_dim(list_files, logger, window)
     for dim, size in list(vars_dim.items()):
         logger.debug(dim + ": " + str(size))
     logger.info("initializing data output array")
@@ -796,10 +821,17 @@ def read_data(list_files, conf, logger):
     nb_files_read = 0
     time_ind = 0
     # Loop over the list of files
-    for ifile in list_files:
+    # next files are loaded while the current one is decoded if they are
+    # entirely read
+    files_content = file_io.iter_prefetched(
+        list_files,
+        file_io.load_content,
+        file_io.get_prefetch_depth(conf, window is not None),
+    )
+    for ifile, content in files_content:
         # Opening file
         try:
-            raw_data = nc.Dataset(ifile, "r")
+            raw_data = file_io.open_netcdf(ifile, content)
             nb_files_read += 1
         except RuntimeError:
             logger.error("109 unable to load " + ifile + " trying next one")
@@ -807,6 +839,8 @@ def read_data(list_files, conf, logger):
         nb_files += 1
         logger.debug("reading %02d: " % (nb_files) + ifile)
 
+        t_sel = time_window.get_nc_time_selection(raw_data.variables["time"], window)
+
         # Data which only need to be read in one file
         if nb_files_read == 1:
             # get Jenoptik software version to know the method to use
@@ -821,7 +855,7 @@ def read_data(list_files, conf, logger):
             # read dimensions
             # ----------------------------------------------------------------
             logger.info("reading dimension variables")
-            time_size, data = read_dim_vars(data, raw_data, logger)
+            time_size, data = read_dim_vars(data, raw_data, logger, t_sel)
 
             # read scalar
             # ----------------------------------------------------------------
@@ -842,8 +876,10 @@ def read_data(list_files, conf, logger):
         # --------------------------------------------------------------------
         logger.info("reading time dependant variables for file %02d" % nb_files_read)
         if nb_files_read > 1:
-            time_size, data = read_time_var(data, raw_data, time_ind, logger)
-        data = read_timedep_vars(data, raw_data, soft_vers, time_ind, time_size, logger)
+            time_size, data = read_time_var(data, raw_data, time_ind, logger, t_sel)
+        data = read_timedep_vars(
+            data, raw_data, soft_vers, time_ind, time_size, logger, t_sel
+        )
 
         time_ind += time_size
 
@@ -875,7 +911,7 @@ def read_data(list_files, conf, logger):
     # calculate Pr2
     # ------------------------------------------------------------------------
     logger.info("calculating Pr2")
-    data = calc_pr2(data, soft_vers, logger)
+    data = calc_pr2(data, soft_vers, conf, logger)
 
     # print messages status read in the file for each time step
     for err_msg in data["error_ext"][:]:
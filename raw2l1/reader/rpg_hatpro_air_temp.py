@@ -1,19 +1,26 @@
 import datetime as dt
 
-import netCDF4 as nc
 import numpy as np
 
-from .libhatpro import correct_time_units
+from tools import allocation, cf_time
+
+from .libhatpro import read_file
 
 # brand and model of the LIDAR
 BRAND = "RPG"
 MODEL = "HATPRO boundary layer temperature"
 
 TIME_DIM = "time"
-TIME_VAR = "time"
 ALT_DIM = "number_altitude_layers"
 ALT_VAR = "altitude_layers"
 
+# variables read in RPG files
+RPG_VARS = [
+    ALT_VAR,
+    "temperature_profiles",
+    "rain_flag",
+]
+
 FLT_MISSING_VALUE = -999.0
 INT_MISSING_VALUE = -9
 
@@ -25,13 +32,11 @@ def get_data_size(list_files, logger):
     dim["time"] = 0
     dim["alt"] = 0
     for i, f in enumerate(list_files):
-        nc_id = nc.Dataset(f, "r")
+        rpg_data = read_file(f, RPG_VARS, logger)
         if i == 0:
-            dim["alt"] = len(nc_id.dimensions[ALT_DIM])
-
-        dim["time"] += len(nc_id.dimensions[TIME_DIM])
+            dim["alt"] = rpg_data["dims"][ALT_DIM]
 
-        nc_id.close()
+        dim["time"] += rpg_data["dims"][TIME_DIM]
 
     logger.debug("altitudes size = {}".format(dim["alt"]))
     logger.debug("time size = {}".format(dim["time"]))
@@ -42,35 +47,26 @@ def get_data_size(list_files, logger):
 def init_data(vars_dim, logger):
     """initialize data dictionary"""
 
+    alloc = allocation.Allocator()
+
     data = {}
 
-    data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    data["time_bnds"] = np.empty((vars_dim["time"], 2), dtype=np.dtype(dt.datetime))
-    data["height"] = np.ones((vars_dim["alt"],), dtype=np.float32)
-    data["ta"] = (
-        np.ones((vars_dim["time"], vars_dim["alt"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
+    data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    data["time_bnds"] = alloc.empty((vars_dim["time"], 2), np.dtype(dt.datetime))
+    data["height"] = alloc.empty((vars_dim["alt"],), np.float32)
+    data["ta"] = alloc.full(
+        (vars_dim["time"], vars_dim["alt"]), FLT_MISSING_VALUE, np.float32
     )
-    data["ta_offset"] = np.ones((vars_dim["time"], vars_dim["alt"]), dtype=np.float32)
-    data["ta_err"] = (
-        np.ones((vars_dim["alt"], vars_dim["n_ret"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
+    data["ta_offset"] = alloc.full((vars_dim["time"], vars_dim["alt"]), 1, np.float32)
+    data["ta_err"] = alloc.full(
+        (vars_dim["alt"], vars_dim["n_ret"]), FLT_MISSING_VALUE, np.float32
     )
-    data["flag"] = np.zeros((vars_dim["time"],), dtype=np.int16)
-    data["rain_flag"] = np.zeros((vars_dim["time"],), dtype=np.int16)
-
-    return data
+    data["flag"] = alloc.full((vars_dim["time"],), 0, np.int16)
+    data["rain_flag"] = alloc.full((vars_dim["time"],), 0, np.int16)
 
+    alloc.log_summary(logger)
 
-def read_time(nc_id, logger):
-    """read time variable"""
-
-    time = nc_id.variables[TIME_VAR][:]
-    units = correct_time_units(nc_id.variables[TIME_VAR].units)
-
-    time = nc.num2date(time, units=units)
-
-    return len(time), time
+    return data
 
 
 def read_data(list_files, conf, logger):
@@ -90,31 +86,28 @@ def read_data(list_files, conf, logger):
     # read data
     time_ind = 0
     for i, f in enumerate(list_files):
-        nc_id = nc.Dataset(f, "r")
-
-        time_size, time = read_time(nc_id, logger)
+        rpg_data = read_file(f, RPG_VARS, logger)
+        time_size = rpg_data["time"].size
 
         # determining index of data
         ind_s = time_ind
         ind_e = time_ind + time_size
 
         if i == 0:
-            data["height"] = nc_id.variables[ALT_VAR][:]
-
-        data["time"][ind_s:ind_e] = time
-        data["ta"][ind_s:ind_e, :] = nc_id.variables["temperature_profiles"][:]
-        data["rain_flag"][ind_s:ind_e] = nc_id.variables["rain_flag"][:]
+            data["height"] = rpg_data[ALT_VAR]
 
-        nc_id.close()
+        data["time"][ind_s:ind_e] = rpg_data["time"]
+        data["ta"][ind_s:ind_e, :] = rpg_data["temperature_profiles"]
+        data["rain_flag"][ind_s:ind_e] = rpg_data["rain_flag"]
 
         time_ind += time_size
 
     # produce time_bounds variable
     time_units = conf["time_units"]
     integ_time = conf["integration_time"]
-    data["time_bnds"][:, 0] = nc.date2num(data["time"], units=time_units)
+    data["time_bnds"][:, 0] = cf_time.date2num(data["time"], time_units)
     tmp = data["time"] + dt.timedelta(seconds=float(integ_time))
-    data["time_bnds"][:, 1] = nc.date2num(tmp, units=time_units)
+    data["time_bnds"][:, 1] = cf_time.date2num(tmp, time_units)
 
     # quality flags
     rain_filter = data["rain_flag"] == 1
@@ -1,17 +1,21 @@
 import datetime as dt
 
-import netCDF4 as nc
 import numpy as np
 
-from .libhatpro import correct_time_units
+from tools import allocation, cf_time
+
+from .libhatpro import align_ancillary, read_file
 
 # brand and model of the LIDAR
 BRAND = "RPG"
 MODEL = "HATPRO boundary layer temperature"
 
 TIME_DIM = "time"
-TIME_VAR = "time"
 
+# variables read in RPG files
+RPG_VARS = ["elevation_angle", "azimuth_angle", "TBs", "rain_flag", "frequencies"]
+MET_VARS = ["env_temperature", "env_pressure", "env_relative_humidity"]
+IRT_VARS = ["frequencies", "IRR_data", "elevation_angle"]
 
 FLT_MISSING_VALUE = -999.0
 INT_MISSING_VALUE = -9
@@ -19,17 +23,15 @@ INT_MISSING_VALUE = -9
 C2K = 273.15
 
 
-def get_data_size(list_files, logger):
+def get_data_size(list_files, var_names, logger):
     """based on all files to read determine the size of the data"""
 
     dim = {}
     dim["time"] = 0
     for i, f in enumerate(list_files):
-        nc_id = nc.Dataset(f, "r")
-
-        dim["time"] += len(nc_id.dimensions[TIME_DIM])
+        rpg_data = read_file(f, var_names, logger)
 
-        nc_id.close()
+        dim["time"] += rpg_data["dims"][TIME_DIM]
 
     logger.debug("time size = {}".format(dim["time"]))
 
@@ -39,46 +41,40 @@ def get_data_size(list_files, logger):
 def init_data(vars_dim, logger):
     """initialize data dictionary"""
 
+    alloc = allocation.Allocator()
+
     data = {}
 
-    data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    data["time_bnds"] = np.empty((vars_dim["time"], 2), dtype=np.dtype(dt.datetime))
-    data["freq_sb"] = (
-        np.ones((vars_dim["n_freq"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    data["azi"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["ele"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["tb"] = (
-        np.ones((vars_dim["time"], vars_dim["n_freq"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
+    data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    data["time_bnds"] = alloc.empty((vars_dim["time"], 2), np.dtype(dt.datetime))
+    data["freq_sb"] = alloc.full((vars_dim["n_freq"],), FLT_MISSING_VALUE, np.float32)
+    data["azi"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["ele"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["tb"] = alloc.full(
+        (vars_dim["time"], vars_dim["n_freq"]), FLT_MISSING_VALUE, np.float32
     )
-    data["offset_tb"] = (
-        np.ones((vars_dim["time"], vars_dim["n_freq"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
+    data["offset_tb"] = alloc.full(
+        (vars_dim["time"], vars_dim["n_freq"]), FLT_MISSING_VALUE, np.float32
     )
-    data["freq_shift"] = (
-        np.ones((vars_dim["n_freq"],), dtype=np.float32) * FLT_MISSING_VALUE
+    data["freq_shift"] = alloc.full(
+        (vars_dim["n_freq"],), FLT_MISSING_VALUE, np.float32
     )
-    data["tb_bias"] = (
-        np.ones((vars_dim["n_freq"],), dtype=np.float32) * FLT_MISSING_VALUE
+    data["tb_bias"] = alloc.full((vars_dim["n_freq"],), FLT_MISSING_VALUE, np.float32)
+    data["tb_cov"] = alloc.full(
+        (vars_dim["n_freq"], vars_dim["n_freq2"]), FLT_MISSING_VALUE, np.float32
     )
-    data["tb_cov"] = (
-        np.ones((vars_dim["n_freq"], vars_dim["n_freq2"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
+    data["wl_irp"] = alloc.full((vars_dim["n_wl_irp"]), FLT_MISSING_VALUE, np.float32)
+    data["tb_irp"] = alloc.full(
+        (vars_dim["time"], vars_dim["n_wl_irp"]), FLT_MISSING_VALUE, np.float32
     )
-    data["wl_irp"] = (
-        np.ones((vars_dim["n_wl_irp"]), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    data["tb_irp"] = (
-        np.ones((vars_dim["time"], vars_dim["n_wl_irp"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
-    )
-    data["ele_irp"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["ta"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["pa"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["hur"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["flag"] = np.zeros((vars_dim["time"],), dtype=np.int16)
-    data["rain_flag"] = np.zeros((vars_dim["time"],), dtype=np.int16)
+    data["ele_irp"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["ta"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["pa"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["hur"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["flag"] = alloc.full((vars_dim["time"],), 0, np.int16)
+    data["rain_flag"] = alloc.full((vars_dim["time"],), 0, np.int16)
+
+    alloc.log_summary(logger)
 
     return data
 
@@ -86,18 +82,16 @@ def init_data(vars_dim, logger):
 def init_meteo_data(vars_dim, logger):
     """initialize dict of meteo data"""
 
+    alloc = allocation.Allocator()
+
     meteo_data = {}
 
-    meteo_data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    meteo_data["ta"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    meteo_data["pa"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    meteo_data["hur"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
+    meteo_data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    meteo_data["ta"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    meteo_data["pa"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    meteo_data["hur"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+
+    alloc.log_summary(logger)
 
     return meteo_data
 
@@ -105,59 +99,45 @@ def init_meteo_data(vars_dim, logger):
 def init_irt_data(vars_dim, logger):
     """initialize dict of irt data"""
 
+    alloc = allocation.Allocator()
+
     irt_data = {}
 
-    irt_data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    irt_data["wl_irp"] = (
-        np.ones((vars_dim["n_wl_irp"]), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    irt_data["tb_irp"] = (
-        np.ones((vars_dim["time"], vars_dim["n_wl_irp"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
+    irt_data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    irt_data["wl_irp"] = alloc.full(
+        (vars_dim["n_wl_irp"]), FLT_MISSING_VALUE, np.float32
     )
-    irt_data["ele_irp"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
+    irt_data["tb_irp"] = alloc.full(
+        (vars_dim["time"], vars_dim["n_wl_irp"]), FLT_MISSING_VALUE, np.float32
     )
+    irt_data["ele_irp"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
 
-    return irt_data
+    alloc.log_summary(logger)
 
-
-def read_time(nc_id, logger):
-    """read time variable"""
-
-    time = nc_id.variables[TIME_VAR][:]
-    units = correct_time_units(nc_id.variables[TIME_VAR].units)
-
-    time = nc.num2date(time, units=units)
-
-    return len(time), time
+    return irt_data
 
 
-def sync_meteo(data, meteo_data, logger):
+def sync_meteo(data, meteo_data, conf, logger):
     """find in meteo data timestep corresponding to brightness data time"""
 
-    common_time, time_filter, meteo_time_filter = np.intersect1d(
-        data["time"][:], meteo_data["time"][:], return_indices=True
-    )
-
-    logger.debug(f"common timesteps found for meteo : {common_time.size:d}")
+    ind = align_ancillary(data, meteo_data, "meteo", conf, logger)
+    time_filter = ind >= 0
 
-    data["ta"][time_filter] = meteo_data["ta"][meteo_time_filter]
-    data["pa"][time_filter] = meteo_data["pa"][meteo_time_filter]
-    data["hur"][time_filter] = meteo_data["hur"][meteo_time_filter]
+    data["ta"][time_filter] = meteo_data["ta"][ind[time_filter]]
+    data["pa"][time_filter] = meteo_data["pa"][ind[time_filter]]
+    data["hur"][time_filter] = meteo_data["hur"][ind[time_filter]]
 
     return data
 
 
-def sync_irt(data, irt_data, logger):
+def sync_irt(data, irt_data, conf, logger):
     """find in irt data timestep corresponding to brightness data time"""
 
-    common_time, time_filter, irt_time_filter = np.intersect1d(
-        data["time"][:], irt_data["time"][:], return_indices=True
-    )
+    ind = align_ancillary(data, irt_data, "irt", conf, logger)
+    time_filter = ind >= 0
 
-    data["ele_irp"][time_filter] = irt_data["ele_irp"][irt_time_filter]
-    data["tb_irp"][time_filter, :] = irt_data["tb_irp"][irt_time_filter, :]
+    data["ele_irp"][time_filter] = irt_data["ele_irp"][ind[time_filter]]
+    data["tb_irp"][time_filter, :] = irt_data["tb_irp"][ind[time_filter], :]
 
     return data
 
@@ -190,14 +170,14 @@ def read_data(list_files, conf, logger):
         pass
 
     # get variables size
-    vars_dim = get_data_size(list_files, logger)
+    vars_dim = get_data_size(list_files, RPG_VARS, logger)
     vars_dim["n_freq"] = int(conf["n_freq"])
     vars_dim["n_freq2"] = int(conf["n_freq2"])
     vars_dim["n_wl_irp"] = int(conf["n_wl_irp"])
     if meteo_avail:
-        meteo_vars_dim = get_data_size(meteo_files, logger)
+        meteo_vars_dim = get_data_size(meteo_files, MET_VARS, logger)
     if irt_avail:
-        irt_vars_dim = get_data_size(irt_files, logger)
+        irt_vars_dim = get_data_size(irt_files, IRT_VARS, logger)
         irt_vars_dim["n_wl_irp"] = vars_dim["n_wl_irp"]
 
     # Initialize data
@@ -206,24 +186,21 @@ def read_data(list_files, conf, logger):
     # read data
     time_ind = 0
     for i, f in enumerate(list_files):
-        nc_id = nc.Dataset(f, "r")
-
-        time_size, time = read_time(nc_id, logger)
+        rpg_data = read_file(f, RPG_VARS, logger)
+        time_size = rpg_data["time"].size
 
         # determining index of data
         ind_s = time_ind
         ind_e = time_ind + time_size
 
-        data["time"][ind_s:ind_e] = time
-        data["ele"][ind_s:ind_e] = nc_id.variables["elevation_angle"][:]
-        data["azi"][ind_s:ind_e] = nc_id.variables["azimuth_angle"][:]
-        data["tb"][ind_s:ind_e, :] = nc_id.variables["TBs"][:]
-        data["rain_flag"][ind_s:ind_e] = nc_id.variables["rain_flag"][:]
+        data["time"][ind_s:ind_e] = rpg_data["time"]
+        data["ele"][ind_s:ind_e] = rpg_data["elevation_angle"]
+        data["azi"][ind_s:ind_e] = rpg_data["azimuth_angle"]
+        data["tb"][ind_s:ind_e, :] = rpg_data["TBs"]
+        data["rain_flag"][ind_s:ind_e] = rpg_data["rain_flag"]
 
         if i == 0:
-            data["freq_sb"] = nc_id.variables["frequencies"][:]
-
-        nc_id.close()
+            data["freq_sb"] = rpg_data["frequencies"]
 
         time_ind += time_size
 
@@ -233,27 +210,22 @@ def read_data(list_files, conf, logger):
 
         time_ind = 0
         for i, f in enumerate(meteo_files):
-            nc_id = nc.Dataset(f, "r")
-
-            time_size, time = read_time(nc_id, logger)
+            rpg_data = read_file(f, MET_VARS, logger)
+            time_size = rpg_data["time"].size
 
             # determining index of data
             ind_s = time_ind
             ind_e = time_ind + time_size
 
-            meteo_data["time"][ind_s:ind_e] = time
-            meteo_data["ta"][ind_s:ind_e] = nc_id.variables["env_temperature"][:]
-            meteo_data["pa"][ind_s:ind_e] = nc_id.variables["env_pressure"][:] * 100.0
-            meteo_data["hur"][ind_s:ind_e] = (
-                nc_id.variables["env_relative_humidity"][:] / 100.0
-            )
-
-            nc_id.close()
+            meteo_data["time"][ind_s:ind_e] = rpg_data["time"]
+            meteo_data["ta"][ind_s:ind_e] = rpg_data["env_temperature"]
+            meteo_data["pa"][ind_s:ind_e] = rpg_data["env_pressure"] * 100.0
+            meteo_data["hur"][ind_s:ind_e] = rpg_data["env_relative_humidity"] / 100.0
 
             time_ind += time_size
 
         # synchronize meteo data from to brightness data
-        data = sync_meteo(data, meteo_data, logger)
+        data = sync_meteo(data, meteo_data, conf, logger)
 
     # irt data
     if irt_avail:
@@ -261,32 +233,29 @@ def read_data(list_files, conf, logger):
 
         time_ind = 0
         for i, f in enumerate(irt_files):
-            nc_id = nc.Dataset(f, "r")
-
-            time_size, time = read_time(nc_id, logger)
+            rpg_data = read_file(f, IRT_VARS, logger)
+            time_size = rpg_data["time"].size
 
             # determining index of data
             ind_s = time_ind
             ind_e = time_ind + time_size
 
-            irt_data["time"][ind_s:ind_e] = time
+            irt_data["time"][ind_s:ind_e] = rpg_data["time"]
             if i == 0:
-                data["wl_irp"] = nc_id.variables["frequencies"][:]
-            irt_data["tb_irp"][ind_s:ind_e, :] = nc_id.variables["IRR_data"][:] + C2K
-            irt_data["ele_irp"][ind_s:ind_e] = nc_id.variables["elevation_angle"][:]
-
-            nc_id.close()
+                data["wl_irp"] = rpg_data["frequencies"]
+            irt_data["tb_irp"][ind_s:ind_e, :] = rpg_data["IRR_data"] + C2K
+            irt_data["ele_irp"][ind_s:ind_e] = rpg_data["elevation_angle"]
 
             time_ind += time_size
         # synchronize meteo data from to brightness data
-        data = sync_irt(data, irt_data, logger)
+        data = sync_irt(data, irt_data, conf, logger)
 
     # produce time_bounds variable
     time_units = conf["time_units"]
     integ_time = conf["integration_time"]
-    data["time_bnds"][:, 0] = nc.date2num(data["time"], units=time_units)
+    data["time_bnds"][:, 0] = cf_time.date2num(data["time"], time_units)
     tmp = data["time"] + dt.timedelta(seconds=float(integ_time))
-    data["time_bnds"][:, 1] = nc.date2num(tmp, units=time_units)
+    data["time_bnds"][:, 1] = cf_time.date2num(tmp, time_units)
 
     # quality flags
     rain_filter = data["rain_flag"] == 1
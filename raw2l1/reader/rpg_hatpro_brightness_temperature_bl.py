@@ -1,37 +1,44 @@
 import datetime as dt
 
-import netCDF4 as nc
 import numpy as np
 
-from .libhatpro import correct_time_units
+from tools import allocation, cf_time
+
+from .libhatpro import align_ancillary, read_file
 
 # brand and model of the LIDAR
 BRAND = "RPG"
 MODEL = "HATPRO boundary layer temperature"
 
 TIME_DIM = "time"
-TIME_VAR = "time"
 
+# variables read in RPG files
+RPG_VARS = [
+    "TBs",
+    "rain_flag",
+    "frequencies",
+    "elevation_scan_angles",
+    "azimuth_angle",
+]
+MET_VARS = ["env_temperature", "env_pressure", "env_relative_humidity"]
 
 FLT_MISSING_VALUE = -999.0
 INT_MISSING_VALUE = -9
 
 
-def get_data_size(list_files, logger, only_time=False):
+def get_data_size(list_files, var_names, logger, only_time=False):
     """based on all files to read determine the size of the data"""
 
     dim = {}
     dim["time"] = 0
     for i, f in enumerate(list_files):
-        nc_id = nc.Dataset(f, "r")
+        rpg_data = read_file(f, var_names, logger)
 
-        dim["time"] += len(nc_id.dimensions[TIME_DIM])
+        dim["time"] += rpg_data["dims"][TIME_DIM]
 
         if i == 0 and only_time:
-            dim["n_freq"] = len(nc_id.dimensions["number_frequencies"])
-            dim["n_angle"] = len(nc_id.dimensions["number_scan_angles"])
-
-        nc_id.close()
+            dim["n_freq"] = rpg_data["dims"]["number_frequencies"]
+            dim["n_angle"] = rpg_data["dims"]["number_scan_angles"]
 
     logger.debug("time size = {}".format(dim["time"]))
 
@@ -41,44 +48,39 @@ def get_data_size(list_files, logger, only_time=False):
 def init_data(vars_dim, logger):
     """initialize data dictionary"""
 
+    alloc = allocation.Allocator()
+
     data = {}
 
-    data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    data["time_bnds"] = np.empty((vars_dim["time"], 2), dtype=np.dtype(dt.datetime))
-    data["freq_sb"] = (
-        np.ones((vars_dim["n_freq"],), dtype=np.float32) * FLT_MISSING_VALUE
+    data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    data["time_bnds"] = alloc.empty((vars_dim["time"], 2), np.dtype(dt.datetime))
+    data["freq_sb"] = alloc.full((vars_dim["n_freq"],), FLT_MISSING_VALUE, np.float32)
+    data["azi"] = alloc.full((vars_dim["n_angle"],), FLT_MISSING_VALUE, np.float32)
+    data["ele"] = alloc.full((vars_dim["n_angle"],), FLT_MISSING_VALUE, np.float32)
+    data["tb"] = alloc.full(
+        (vars_dim["time"], vars_dim["n_angle"], vars_dim["n_freq"]),
+        FLT_MISSING_VALUE,
+        np.float32,
     )
-    data["azi"] = np.ones((vars_dim["n_angle"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["ele"] = np.ones((vars_dim["n_angle"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["tb"] = (
-        np.ones(
-            (vars_dim["time"], vars_dim["n_angle"], vars_dim["n_freq"]),
-            dtype=np.float32,
-        )
-        * FLT_MISSING_VALUE
+    data["offset_tb"] = alloc.full(
+        (vars_dim["time"], vars_dim["n_angle"], vars_dim["n_freq"]),
+        FLT_MISSING_VALUE,
+        np.float32,
     )
-    data["offset_tb"] = (
-        np.ones(
-            (vars_dim["time"], vars_dim["n_angle"], vars_dim["n_freq"]),
-            dtype=np.float32,
-        )
-        * FLT_MISSING_VALUE
+    data["freq_shift"] = alloc.full(
+        (vars_dim["n_freq"],), FLT_MISSING_VALUE, np.float32
     )
-    data["freq_shift"] = (
-        np.ones((vars_dim["n_freq"],), dtype=np.float32) * FLT_MISSING_VALUE
+    data["tb_bias"] = alloc.full((vars_dim["n_freq"],), FLT_MISSING_VALUE, np.float32)
+    data["tb_cov"] = alloc.full(
+        (vars_dim["n_freq"], vars_dim["n_freq"]), FLT_MISSING_VALUE, np.float32
     )
-    data["tb_bias"] = (
-        np.ones((vars_dim["n_freq"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    data["tb_cov"] = (
-        np.ones((vars_dim["n_freq"], vars_dim["n_freq"]), dtype=np.float32)
-        * FLT_MISSING_VALUE
-    )
-    data["ta"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["pa"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["hur"] = np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    data["flag"] = np.zeros((vars_dim["time"],), dtype=np.int16)
-    data["rain_flag"] = np.zeros((vars_dim["time"],), dtype=np.int16)
+    data["ta"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["pa"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["hur"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    data["flag"] = alloc.full((vars_dim["time"],), 0, np.int16)
+    data["rain_flag"] = alloc.full((vars_dim["time"],), 0, np.int16)
+
+    alloc.log_summary(logger)
 
     return data
 
@@ -86,52 +88,29 @@ def init_data(vars_dim, logger):
 def init_meteo_data(vars_dim, logger):
     """initialize dict of meteo data"""
 
-    meteo_data = {}
-
-    meteo_data["time"] = np.empty((vars_dim["time"],), dtype=np.dtype(dt.datetime))
-    meteo_data["ta"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    meteo_data["pa"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-    meteo_data["hur"] = (
-        np.ones((vars_dim["time"],), dtype=np.float32) * FLT_MISSING_VALUE
-    )
-
-    return meteo_data
-
+    alloc = allocation.Allocator()
 
-def read_time(nc_id, logger):
-    """read time variable"""
+    meteo_data = {}
 
-    time = nc_id.variables[TIME_VAR][:]
-    units = correct_time_units(nc_id.variables[TIME_VAR].units)
+    meteo_data["time"] = alloc.empty((vars_dim["time"],), np.dtype(dt.datetime))
+    meteo_data["ta"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    meteo_data["pa"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
+    meteo_data["hur"] = alloc.full((vars_dim["time"],), FLT_MISSING_VALUE, np.float32)
 
-    time = nc.num2date(time, units=units)
+    alloc.log_summary(logger)
 
-    return len(time), time
+    return meteo_data
 
 
-def sync_meteo(data, meteo_data, logger):
+def sync_meteo(data, meteo_data, conf, logger):
     """find in meteo data timestep corresponding to brightness data time"""
 
-    common_time = np.intersect1d(
-        data["time"][:], meteo_data["time"][:], assume_unique=True
-    )
-
-    logger.debug(f"common timesteps found : {common_time.size:d}")
+    ind = align_ancillary(data, meteo_data, "meteo", conf, logger)
+    time_filter = ind >= 0
 
-    time_filter = np.array(
-        [True if t in common_time else False for t in data["time"][:]]
-    )
-    meteo_time_filter = np.array(
-        [True if t in common_time else False for t in meteo_data["time"][:]]
-    )
-
-    data["ta"][time_filter] = meteo_data["ta"][meteo_time_filter]
-    data["pa"][time_filter] = meteo_data["pa"][meteo_time_filter]
-    data["hur"][time_filter] = meteo_data["hur"][meteo_time_filter]
+    data["ta"][time_filter] = meteo_data["ta"][ind[time_filter]]
+    data["pa"][time_filter] = meteo_data["pa"][ind[time_filter]]
+    data["hur"][time_filter] = meteo_data["hur"][ind[time_filter]]
 
     return data
 
@@ -154,10 +133,10 @@ def read_data(list_files, conf, logger):
             logger.debug(f"files to read : {f}")
 
     # get variables size
-    vars_dim = get_data_size(list_files, logger, only_time=True)
+    vars_dim = get_data_size(list_files, RPG_VARS, logger, only_time=True)
 
     if meteo_avail:
-        meteo_vars_dim = get_data_size(meteo_files, logger)
+        meteo_vars_dim = get_data_size(meteo_files, MET_VARS, logger)
 
     # Initialize data
     data = init_data(vars_dim, logger)
@@ -165,26 +144,24 @@ def read_data(list_files, conf, logger):
     # read data
     time_ind = 0
     for i, f in enumerate(list_files):
-        nc_id = nc.Dataset(f, "r")
-
-        time_size, time = read_time(nc_id, logger)
+        rpg_data = read_file(f, RPG_VARS, logger)
+        time_size = rpg_data["time"].size
 
         # determining index of data
         ind_s = time_ind
         ind_e = time_ind + time_size
 
-        data["time"][ind_s:ind_e] = time
-        data["tb"][ind_s:ind_e, :] = np.swapaxes(nc_id.variables["TBs"][:], 1, 2)
-        data["rain_flag"][ind_s:ind_e] = nc_id.variables["rain_flag"][:]
+        data["time"][ind_s:ind_e] = rpg_data["time"]
+        data["tb"][ind_s:ind_e, :] = np.swapaxes(rpg_data["TBs"], 1, 2)
+        data["rain_flag"][ind_s:ind_e] = rpg_data["rain_flag"]
 
         if i == 0:
             data["nv"] = 2
             data["n_freq"] = vars_dim["n_freq"]
             data["n_angle"] = vars_dim["n_angle"]
-            data["freq_sb"] = nc_id.variables["frequencies"][:]
-            data["ele"] = nc_id.variables["elevation_scan_angles"][:]
-            data["azi"] = nc_id.variables["azimuth_angle"][0 : vars_dim["n_angle"]]
-        nc_id.close()
+            data["freq_sb"] = rpg_data["frequencies"]
+            data["ele"] = rpg_data["elevation_scan_angles"]
+            data["azi"] = rpg_data["azimuth_angle"][0 : vars_dim["n_angle"]]
 
         time_ind += time_size
 
@@ -194,34 +171,29 @@ def read_data(list_files, conf, logger):
 
         time_ind = 0
         for i, f in enumerate(meteo_files):
-            nc_id = nc.Dataset(f, "r")
-
-            time_size, time = read_time(nc_id, logger)
+            rpg_data = read_file(f, MET_VARS, logger)
+            time_size = rpg_data["time"].size
 
             # determining index of data
             ind_s = time_ind
             ind_e = time_ind + time_size
 
-            meteo_data["time"][ind_s:ind_e] = time
-            meteo_data["ta"][ind_s:ind_e] = nc_id.variables["env_temperature"][:]
-            meteo_data["pa"][ind_s:ind_e] = nc_id.variables["env_pressure"][:] * 100.0
-            meteo_data["hur"][ind_s:ind_e] = (
-                nc_id.variables["env_relative_humidity"][:] / 100.0
-            )
-
-            nc_id.close()
+            meteo_data["time"][ind_s:ind_e] = rpg_data["time"]
+            meteo_data["ta"][ind_s:ind_e] = rpg_data["env_temperature"]
+            meteo_data["pa"][ind_s:ind_e] = rpg_data["env_pressure"] * 100.0
+            meteo_data["hur"][ind_s:ind_e] = rpg_data["env_relative_humidity"] / 100.0
 
             time_ind += time_size
 
         # synchronize meteo data from to brightness data
-        data = sync_meteo(data, meteo_data, logger)
+        data = sync_meteo(data, meteo_data, conf, logger)
 
     # produce time_bounds variable
     time_units = conf["time_units"]
     integ_time = conf["integration_time"]
-    data["time_bnds"][:, 0] = nc.date2num(data["time"], units=time_units)
+    data["time_bnds"][:, 0] = cf_time.date2num(data["time"], time_units)
     tmp = data["time"] + dt.timedelta(seconds=float(integ_time))
-    data["time_bnds"][:, 1] = nc.date2num(tmp, units=time_units)
+    data["time_bnds"][:, 1] = cf_time.date2num(tmp, time_units)
 
     # quality flags
     rain_filter = data["rain_flag"] == 1
@@ -1,8 +1,8 @@
-import datetime as dt
-
 import netCDF4 as nc
 import numpy as np
 
+from tools import allocation, cf_time, file_io
+
 # brand and model of the LIDAR
 BRAND = "SigmaSpace"
 MODEL = "MiniMPL"
@@ -63,6 +63,8 @@ def get_dimension_size(list_files, logger):
 def init(data, dims, conf, logger):
     """Init data dict with size of data"""
 
+    alloc = allocation.Allocator()
+
     logger.debug("init data variable")
 
     # scalar values
@@ -78,82 +80,79 @@ def init(data, dims, conf, logger):
     data["first_azimuth_angle"] = MISSING_FLOAT
 
     # 1d values
-    data["time"] = np.ones((dims["time"],), dtype=np.dtype(dt.datetime))
-    data["temp_in"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["temp_out"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["rh_in"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["rh_out"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["ws_out"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["wd_out"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["pres_out"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["dew_point_out"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["rain_rate_out"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["elevation_angle"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["azimuth_angle"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["telescope_temp"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["detector_temp"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["laser_temp"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["latitude"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["longitude"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["altitude"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["laser_energy"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["syncpulse"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["lidar_ratio"] = np.ones((dims["time"],), dtype="f8") * MISSING_FLOAT
-    data["aod"] = np.ones((dims["time"],), dtype="f8") * MISSING_FLOAT
-    data["aod_age"] = np.ones((dims["time"],), dtype="i4") * MISSING_INT
-    data["bckgrd_total"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["bckgrd_copol"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["bckgrd_crosspol"] = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-
-    data["number_of_clouds"] = np.ones((dims["n_cld"],), dtype="i4") * MISSING_INT
+    data["time"] = alloc.empty((dims["time"],), "datetime64[us]")
+    data["temp_in"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["temp_out"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["rh_in"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["rh_out"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["ws_out"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["wd_out"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["pres_out"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["dew_point_out"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["rain_rate_out"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["elevation_angle"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["azimuth_angle"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["telescope_temp"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["detector_temp"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["laser_temp"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["latitude"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["longitude"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["altitude"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["laser_energy"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["syncpulse"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["lidar_ratio"] = alloc.full((dims["time"],), MISSING_FLOAT, "f8")
+    data["aod"] = alloc.full((dims["time"],), MISSING_FLOAT, "f8")
+    data["aod_age"] = alloc.full((dims["time"],), MISSING_INT, "i4")
+    data["bckgrd_copol"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+    data["bckgrd_crosspol"] = alloc.full((dims["time"],), MISSING_FLOAT, "f4")
+
+    data["number_of_clouds"] = alloc.full((dims["n_cld"],), MISSING_INT, "i4")
 
     # 2d values
-    data["copol_raw"] = (
-        np.ones((dims["time"], dims["range_raw"]), dtype="f4") * MISSING_FLOAT
+    data["copol_raw"] = alloc.full(
+        (dims["time"], dims["range_raw"]), MISSING_FLOAT, "f4"
     )
-    data["crosspol_raw"] = (
-        np.ones((dims["time"], dims["range_raw"]), dtype="f4") * MISSING_FLOAT
+    data["crosspol_raw"] = alloc.full(
+        (dims["time"], dims["range_raw"]), MISSING_FLOAT, "f4"
     )
-    data["copol_snr"] = (
-        np.ones((dims["time"], dims["range_raw"]), dtype="f4") * MISSING_FLOAT
+    data["copol_snr"] = alloc.full(
+        (dims["time"], dims["range_raw"]), MISSING_FLOAT, "f4"
     )
-    data["crosspol_snr"] = (
-        np.ones((dims["time"], dims["range_raw"]), dtype="f4") * MISSING_FLOAT
+    data["crosspol_snr"] = alloc.full(
+        (dims["time"], dims["range_raw"]), MISSING_FLOAT, "f4"
     )
-    data["depol_ratio"] = (
-        np.ones((dims["time"], dims["range_nrb"]), dtype="f4") * MISSING_FLOAT
+    data["depol_ratio"] = alloc.full(
+        (dims["time"], dims["range_nrb"]), MISSING_FLOAT, "f4"
     )
-    data["total_nrb"] = (
-        np.ones((dims["time"], dims["range_nrb"]), dtype="f4") * MISSING_FLOAT
+    data["copol_nrb"] = alloc.full(
+        (dims["time"], dims["range_nrb"]), MISSING_FLOAT, "f4"
     )
-    data["copol_nrb"] = (
-        np.ones((dims["time"], dims["range_nrb"]), dtype="f4") * MISSING_FLOAT
-    )
-    data["crosspol_nrb"] = (
-        np.ones((dims["time"], dims["range_nrb"]), dtype="f4") * MISSING_FLOAT
+    data["crosspol_nrb"] = alloc.full(
+        (dims["time"], dims["range_nrb"]), MISSING_FLOAT, "f4"
     )
 
-    data["extinc_coeff"] = (
-        np.ones((dims["time"], dims["range_vbp"]), dtype="f4") * MISSING_FLOAT
+    data["extinc_coeff"] = alloc.full(
+        (dims["time"], dims["range_vbp"]), MISSING_FLOAT, "f4"
     )
-    data["mass_concentration"] = (
-        np.ones((dims["time"], dims["range_vbp"]), dtype="f4") * MISSING_FLOAT
+    data["mass_concentration"] = alloc.full(
+        (dims["time"], dims["range_vbp"]), MISSING_FLOAT, "f4"
     )
-    data["vert_bck_coeff"] = (
-        np.ones((dims["time"], dims["range_vbp"]), dtype="f4") * MISSING_FLOAT
+    data["vert_bck_coeff"] = alloc.full(
+        (dims["time"], dims["range_vbp"]), MISSING_FLOAT, "f4"
     )
-    data["particle_type"] = (
-        np.ones((dims["time"], dims["range_nrb"]), dtype="f4") * MISSING_FLOAT
+    data["particle_type"] = alloc.full(
+        (dims["time"], dims["range_nrb"]), MISSING_FLOAT, "f4"
     )
 
-    data["pbls"] = np.ones((dims["time"], dims["n_cld"]), dtype="f4")
+    data["pbls"] = alloc.empty((dims["time"], dims["n_cld"]), "f4")
 
     # 3d values
-    data["clouds"] = (
-        np.ones((dims["time"], dims["n_cld"], dims["n_cld_out"]), dtype="f8")
-        * MISSING_FLOAT
+    data["clouds"] = alloc.full(
+        (dims["time"], dims["n_cld"], dims["n_cld_out"]), MISSING_FLOAT, "f8"
     )
 
+    alloc.log_summary(logger)
+
     return data
 
 
@@ -182,20 +181,14 @@ def read_scalar_values(data, nc_id, logger):
 
 
 def read_time(nc_id):
-    """convert time format of file into datetime object"""
-
-    year = nc_id.variables["year"][:]
-    month = nc_id.variables["month"][:]
-    day = nc_id.variables["day"][:]
-    hour = nc_id.variables["hour"][:]
-    minute = nc_id.variables["minute"][:]
-    second = nc_id.variables["second"][:]
+    """convert time fields of file into datetime64"""
 
-    tmp = []
-    for y, m, d, hh, mm, ss in zip(year, month, day, hour, minute, second):
-        tmp.append(dt.datetime(int(y), int(m), int(d), int(hh), int(mm), int(ss)))
-
-    return np.array(tmp)
+    return cf_time.from_components(
+        *[
+            nc_id.variables[field][:]
+            for field in ["year", "month", "day", "hour", "minute", "second"]
+        ]
+    )
 
 
 def read_nd_values(data, nc_id, time_ind, logger):
@@ -283,8 +276,12 @@ def read_data(list_files, conf, logger):
     # read data
     # ------------------------------------------------------------------------
     time_ind = 0
-    for i_file, file_ in enumerate(list_files):
-        nc_id = nc.Dataset(file_, "r")
+    # next files are loaded while the current one is decoded
+    files_content = file_io.iter_prefetched(
+        list_files, file_io.load_content, file_io.get_prefetch_depth(conf)
+    )
+    for i_file, (file_, content) in enumerate(files_content):
+        nc_id = file_io.open_netcdf(file_, content)
         nc_id.set_auto_mask(False)
 
         # read scalar values
@@ -305,7 +302,7 @@ def read_data(list_files, conf, logger):
     data["bckgrd_total"] = data["bckgrd_copol"] + 2.0 * data["bckgrd_crosspol"]
 
     # start time
-    data["start_time"] = data["time"] - dt.timedelta(seconds=data["time_resol"])
+    data["start_time"] = data["time"] - np.timedelta64(data["time_resol"], "s")
 
     # clouds and pbls replace missing values
     data["clouds"][np.isnan(data["clouds"])] = MISSING_FLOAT
@@ -360,11 +357,8 @@ def read_data(list_files, conf, logger):
     )
 
     # add date in separate variables
-    data["year"] = np.array([d.year for d in data["time"]])
-    data["month"] = np.array([d.month for d in data["time"]])
-    data["day"] = np.array([d.day for d in data["time"]])
-    data["hour"] = np.array([d.hour for d in data["time"]])
-    data["minute"] = np.array([d.minute for d in data["time"]])
-    data["second"] = np.array([d.second for d in data["time"]])
+    time_fields = cf_time.to_components(data["time"])
+    for field in ["year", "month", "day", "hour", "minute", "second"]:
+        data[field] = time_fields[field]
 
     return data
@@ -9,9 +9,10 @@ import ast
 import datetime as dt
 import sys
 
-import netCDF4 as nc
 import numpy as np
 
+from tools import allocation, cf_time, file_io, projection, range_correction
+
 LIST_LASER_TYPE = ["spectra", "brilliant", "qsmart"]
 
 
@@ -42,9 +43,9 @@ BCK_COMMENT_FMT = "calcultated between {:5d} m and {:5d} m"
 
 
 def date_to_dt(date_num, date_units):
-    """convert date np.array from datenum to datetime.datetime"""
+    """convert date np.array from datenum to datetime64"""
 
-    return nc.num2date(date_num, units=date_units, calendar="standard")
+    return cf_time.num2date(date_num, date_units)
 
 
 def get_channel_conf(conf, logger):
@@ -177,7 +178,7 @@ def get_data_size(list_files, logger):
     # loop over list of files
     for i_file, file_ in enumerate(list_files):
         try:
-            f_id = open(file_, "rb")
+            f_id = file_io.open_file(file_, "rb")
         except OSError:
             logger.error("error trying to open %s", file_)
             continue
@@ -252,16 +253,18 @@ def get_data_size(list_files, logger):
 def init_data(data_dim, logger):
     """initialize dict containing ndarrays based on data dimension"""
 
+    alloc = allocation.Allocator()
+
     n_chan = data_dim["n_chan"]
 
     data = {}
 
     # dimensions
-    data["time"] = np.empty((data_dim["time"],), dtype=np.dtype(dt.datetime))
-    data["time_bounds"] = np.empty(
-        (data_dim["time"], data_dim["nv"]), dtype=np.dtype(dt.datetime)
+    data["time"] = alloc.empty((data_dim["time"],), np.dtype(dt.datetime))
+    data["time_bounds"] = alloc.empty(
+        (data_dim["time"], data_dim["nv"]), np.dtype(dt.datetime)
     )
-    data["range"] = np.empty((data_dim["range"],), dtype=np.float32)
+    data["range"] = alloc.empty((data_dim["range"],), np.float32)
 
     # scalar values
     data["type1_shots"] = MISSING_FLOAT
@@ -274,37 +277,37 @@ def init_data(data_dim, logger):
     data["latitude"] = MISSING_FLOAT
     data["altitude"] = MISSING_FLOAT
 
-    data["active"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["detection_mode_ind"] = np.ones((n_chan,), dtype=int) * MISSING_INT
+    data["active"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["detection_mode_ind"] = alloc.full((n_chan,), MISSING_INT, int)
     data["detection_mode"] = np.array(["photocounting"] * n_chan)
-    data["telescope"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["n_range"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["number_one"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["voltage"] = np.ones((n_chan,), dtype=np.float32) * MISSING_FLOAT
-    data["range_resol_vect"] = np.ones((n_chan,), dtype=np.float32) * MISSING_FLOAT
-    data["wavelength"] = np.ones((n_chan,), dtype=np.float32) * MISSING_FLOAT
+    data["telescope"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["n_range"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["number_one"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["voltage"] = alloc.full((n_chan,), MISSING_FLOAT, np.float32)
+    data["range_resol_vect"] = alloc.full((n_chan,), MISSING_FLOAT, np.float32)
+    data["wavelength"] = alloc.full((n_chan,), MISSING_FLOAT, np.float32)
     data["polarization"] = np.array([str(MISSING_INT)] * n_chan, dtype=str)
-    data["filter_wheel_position"] = (
-        np.ones((n_chan,), dtype=int) * MISSING_INT
-    )  # speficfic for IPRAL
+    # speficfic for IPRAL
+    data["filter_wheel_position"] = alloc.full((n_chan,), MISSING_INT, int)
     # unused column
-    data["bin_shift"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["bin_shift_dec"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["adc_bits"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["n_shots"] = np.ones((n_chan,), dtype=int) * MISSING_INT
-    data["discriminator_level"] = np.ones((n_chan,), dtype=int) * MISSING_FLOAT
-    data["adc_range"] = np.ones((n_chan,), dtype=np.float32) * MISSING_FLOAT
+    data["bin_shift"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["bin_shift_dec"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["adc_bits"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["n_shots"] = alloc.full((n_chan,), MISSING_INT, int)
+    data["discriminator_level"] = alloc.full((n_chan,), MISSING_FLOAT, float)
+    data["adc_range"] = alloc.full((n_chan,), MISSING_FLOAT, np.float32)
 
     # multi_dim vars
     for i_chan in range(data_dim["n_chan"]):
-        data[f"rcs_{i_chan:02d}"] = (
-            np.ones((data_dim["time"], data_dim["range"]), dtype=np.float32)
-            * MISSING_FLOAT
+        data[f"rcs_{i_chan:02d}"] = alloc.full(
+            (data_dim["time"], data_dim["range"]), MISSING_FLOAT, np.float32
         )
-        data[f"bckgrd_rcs_{i_chan:02d}"] = (
-            np.ones((data_dim["time"],), dtype=np.float32) * MISSING_FLOAT
+        data[f"bckgrd_rcs_{i_chan:02d}"] = alloc.full(
+            (data_dim["time"],), MISSING_FLOAT, np.float32
         )
 
+    alloc.log_summary(logger)
+
     return data
 
 
@@ -518,9 +521,13 @@ def read_data(list_files, conf, logger):
     logger.info("determining size of var to read")
     data_dim = get_data_size(list_files, logger)
 
-    for ind, file_ in enumerate(list_files):
+    # next files are loaded while the current one is decoded
+    files_content = file_io.iter_prefetched(
+        list_files, file_io.load_content, file_io.get_prefetch_depth(conf)
+    )
+    for ind, (file_, content) in enumerate(files_content):
         try:
-            f_id = open(file_, "rb")
+            f_id = file_io.open_content(file_, content)
         except OSError:
             logger.error("error trying to open %s", file_)
             continue
@@ -576,7 +583,6 @@ def read_data(list_files, conf, logger):
     # PR2 and background
     for i_chan in range(data_dim["n_chan"]):
         profiles = data[f"rcs_{i_chan:02d}"]
-        square = np.square(data["range"])
 
         data[f"bckgrd_rcs_{i_chan:02d}"] = np.mean(profiles[:, bck_filter], axis=1)
         # remove background is needed
@@ -584,7 +590,14 @@ def read_data(list_files, conf, logger):
             logger.debug("removing bckgrd for chan %d", i_chan)
             profiles = (profiles.T - data[f"bckgrd_rcs_{i_chan:02d}"]).T
 
-        data[f"rcs_{i_chan:02d}"] = profiles * square
+        # range correction in place if the output has the type of the profiles
+        dtype = projection.get_dtype(
+            conf, f"rcs_{i_chan:02d}", range_correction.DEFAULT_DTYPE
+        )
+        out = profiles if profiles.dtype == dtype else None
+        data[f"rcs_{i_chan:02d}"] = range_correction.range_correct(
+            profiles, data["range"], dtype=dtype, out=out
+        )
         data[f"units_rcs_{i_chan:02d}"] = data[f"units_{i_chan:02d}"] + ".m^2"
 
     return data
@@ -12,6 +12,8 @@ import sys
 import netCDF4 as nc
 import numpy as np
 
+from tools import allocation, cf_time, file_io, projection, time_window
+
 # brand and model of the LIDAR
 BRAND = "vaisala"
 MODEL = "CL61"
@@ -23,8 +25,154 @@ MISSING_FLOAT = -999.9
 # physical constants
 CELSIUS_TO_KELVIN = 273.15
 
-
-def get_dimension_size(list_files, logger):
+# data keys computed from other variables
+DEPENDENCIES = {
+    "rcs_0": ("rcs_1", "rcs_2"),
+}
+
+# time dependant variables: dimension, type and initial value
+TIMEDEP_VARS_INIT = {
+    "vertical_visibility": ("time", "f4", MISSING_FLOAT),
+    "fog_detection": ("time", "i2", MISSING_INT),
+    "precipitation_detection": ("time", "i2", MISSING_INT),
+    "receiver_gain": ("time", "i2", MISSING_INT),
+    "beta_sum": ("time", "f4", MISSING_FLOAT),
+    "beta_noise": ("time", "f4", MISSING_FLOAT),
+    "lat": ("time", "f4", MISSING_FLOAT),
+    "lon": ("time", "f4", MISSING_FLOAT),
+    "alt": ("time", "f4", MISSING_FLOAT),
+    "tilt_angle": ("time", "f4", MISSING_FLOAT),
+    "tilt_angle_correction": ("time", "i2", MISSING_INT),
+    # starting fw 1.1.x
+    "cloud_cover": ("time", "i4", MISSING_INT),
+    # time, layer dependant variables
+    "cbh": ("layer", "f4", MISSING_FLOAT),
+    "cloud_penetration_depth": ("layer", "i4", MISSING_INT),
+    "cloud_thickness": ("layer", "i4", MISSING_INT),
+    "cloud_layer_cover": ("layer", "i4", MISSING_INT),
+    "cloud_layer_height": ("layer", "f4", MISSING_FLOAT),
+    # time, range dependant variables
+    "rcs_1": ("range", "f4", 1),
+    "rcs_2": ("range", "f4", 1),
+    "beta": ("range", "f4", 1),
+    "linear_depol_ratio": ("range", "f4", 1),
+    # house keeping data
+    "hkd_rh_int": ("time", "f4", MISSING_FLOAT),
+    "hkd_temp_int": ("time", "f4", MISSING_FLOAT),
+    "hkd_temp_trans": ("time", "f4", MISSING_FLOAT),
+    "hkd_pres_int": ("time", "f4", MISSING_FLOAT),
+    "hkd_temp_laser": ("time", "f4", MISSING_FLOAT),
+    "hkd_state_laser": ("time", "f4", MISSING_FLOAT),
+    "hkd_state_optics": ("time", "f4", MISSING_FLOAT),
+    "hkd_bkgd_radiance": ("time", "f4", MISSING_FLOAT),
+    "hkd_heater_int": ("time", "i2", MISSING_INT),
+    "hkd_window_blower": ("time", "i2", MISSING_INT),
+    "hkd_window_blower_heater": ("time", "i2", MISSING_INT),
+}
+
+# time dependant variables: name in file and first firmware providing them
+TIMEDEP_VARS = [
+    ("vertical_visibility", "vertical_visibility", 0),
+    ("fog_detection", "fog_detection", 1.2),
+    ("precipitation_detection", "precipitation_detection", 1.2),
+    ("receiver_gain", "receiver_gain", 1.2),
+    ("beta_sum", "beta_att_sum", 0),
+    ("beta_noise", "beta_att_noise_level", 0),
+    ("lat", "latitude", 0),
+    ("lon", "longitude", 0),
+    ("alt", "elevation", 0),
+    ("cloud_cover", "sky_condition_total_cloud_cover", 1.1),
+    ("tilt_angle", "tilt_angle", 1.1),
+    ("tilt_angle_correction", "tilt_correction", 1.1),
+    ("cbh", "cloud_base_heights", 0),
+    ("cloud_layer_cover", "sky_condition_cloud_layer_covers", 1.1),
+    ("cloud_layer_height", "sky_condition_cloud_layer_heights", 1.1),
+    ("cloud_penetration_depth", "cloud_penetration_depth", 1.2),
+    ("cloud_thickness", "cloud_thickness", 1.2),
+    ("rcs_1", "p_pol", 0),
+    ("rcs_2", "x_pol", 0),
+    ("beta", "beta_att", 0),
+    ("linear_depol_ratio", "linear_depol_ratio", 0),
+]
+
+# fw v1.1 HKD are attributes of the monitoring group
+HKD_ATTRS_V11 = {
+    "hkd_bkgd_radiance": "background_radiance",
+    "hkd_rh_int": "internal_humidity",
+    "hkd_temp_int": "internal_temperature",
+    "hkd_pres_int": "internal_pressure",
+    "hkd_temp_laser": "laser_temperature",
+    "hkd_state_laser": "laser_power_percent",
+    "hkd_state_optics": "window_condition",
+}
+
+# fw v1.2 HKD are variables of the monitoring group
+HKD_VARS = {
+    "hkd_bkgd_radiance": "background_radiance",
+    "hkd_rh_int": "internal_humidity",
+    "hkd_temp_int": "internal_temperature",
+    "hkd_temp_trans": "transmitter_enclosure_temperature",
+    "hkd_pres_int": "internal_pressure",
+    "hkd_temp_laser": "laser_temperature",
+    "hkd_state_laser": "laser_power_percent",
+    "hkd_state_optics": "window_condition",
+    "hkd_heater_int": "internal_heater",
+    "hkd_window_blower": "window_blower",
+    "hkd_window_blower_heater": "window_blower_heater",
+}
+
+# status variables (fw >= 1.2) of the status group
+STATUS_VARS = {
+    # device
+    "status_device_controller_temperature": "Device_controller_temperature",
+    "status_device_controller_electronics": "Device_controller_electronics",
+    "status_device_controller_overall": "Device_controller_overall",
+    # optics
+    "status_optics_unit_accelerometer": "Optics_unit_accelerometer",
+    "status_optics_unit_electronics": "Optics_unit_electronics",
+    "status_optics_unit_overall": "Optics_unit_overall",
+    "status_optics_unit_memory": "Optics_unit_memory",
+    "status_optics_unit_tilt_angle": "Optics_unit_tilt_angle",
+    # receiver
+    "status_receiver_electronics": "Receiver_electronics",
+    "status_receiver_overall": "Receiver_overall",
+    "status_receiver_memory": "Receiver_memory",
+    "status_receiver_voltage": "Receiver_voltage",
+    "status_receiver_solar_saturation": "Receiver_solar_saturation",
+    "status_receiver_sensitivity": "Receiver_sensitivity",
+    # window
+    "status_window_blocking": "Window_condition",
+    "status_window_condition": "Window_condition",
+    "status_window_blower_fan": "Window_blower_fan",
+    "status_window_blower_heater": "Window_blower_heater",
+    # servo
+    "status_servo_drive_electronics": "Servo_drive_electronics",
+    "status_servo_drive_overall": "Servo_drive_overall",
+    "status_servo_drive_memory": "Servo_drive_memory",
+    "status_servo_drive_control": "Servo_drive_control",
+    "status_servo_drive_ready": "Servo_drive_ready",
+    # transmitter
+    "status_transmitter_electronics": "Transmitter_electronics",
+    "status_transmitter_light_source": "Transmitter_light_source",
+    "status_transmitter_light_source_power": "Transmitter_light_source_power",
+    "status_transmitter_overall": "Transmitter_overall",
+    "status_transmitter_light_source_safety": "Transmitter_light_source_safety",
+    "status_transmitter_memory": "Transmitter_memory",
+    # others
+    "status_maintenance_overall": "Maintenance_overall",
+    "status_device_overall": "Device_overall",
+    "status_recently_started": "Recently_started",
+    "status_measurement_status": "Measurement_status",
+    "status_datacom_overall": "Datacom_overall",
+    "status_measurement_data_destination_not_set": (
+        "Measurement_data_destination_not_set"
+    ),
+    "status_inside_heater": "Inside_heater",
+    "status_data_generation_status": "Data_generation_status",
+}
+
+
+def get_dimension_size(list_files, logger, window=None):
     """
     Determine the size of dimensions.
 
@@ -34,16 +182,22 @@ def get_dimension_size(list_files, logger):
         The list of files to analyze.
     logger : logging.Logger
         Logger object to log the progress.
+    window : tuple of datetime.datetime, optional
+        Time window of the data to read. Only the timesteps inside the window
+        are counted.
 
     Returns
     -------
     dict
         Dictionary with the dimensions of the data (time, range, layer)
+    list of str
+        The files with time steps inside the window.
 
     """
     # get size of data to read
     logger.info("Determining size of data")
     data_dims = {}
+    files_to_read = []
 
     for i_file, file_ in enumerate(list_files):
         logger.debug("reading %s", file_)
@@ -52,16 +206,21 @@ def get_dimension_size(list_files, logger):
         if i_file == 0:
             data_dims["range"] = nc_id.dimensions["range"].size
             data_dims["layer"] = nc_id.dimensions["layer"].size
-            try:
-                data_dims["time"] = nc_id.dimensions["time"].size
-            except KeyError:
-                data_dims["time"] = nc_id.dimensions["profile"].size
-        else:
-            # unlimited dimensions
-            try:
-                data_dims["time"] += nc_id.dimensions["time"].size
-            except KeyError:
-                data_dims["time"] += nc_id.dimensions["profile"].size
+            data_dims["time"] = 0
+
+        # unlimited dimensions
+        try:
+            time_size = nc_id.dimensions["time"].size
+        except KeyError:
+            time_size = nc_id.dimensions["profile"].size
+
+        if window is not None:
+            t_sel = time_window.get_nc_time_selection(nc_id.variables["time"], window)
+            time_size = time_window.get_selection_size(t_sel, time_size)
+
+        data_dims["time"] += time_size
+        if window is None or time_size > 0:
+            files_to_read.append(file_)
 
         nc_id.close()
 
@@ -69,7 +228,11 @@ def get_dimension_size(list_files, logger):
     for var_name, size in data_dims.items():
         logger.debug("%s : %d", var_name, size)
 
-    return data_dims
+    # the first file still provides the dimensions and the scalars
+    if not files_to_read:
+        files_to_read = list_files[:1]
+
+    return data_dims, files_to_read
 
 
 def get_fw_version(nc_id, logger):
@@ -127,6 +290,8 @@ def init(data, dims, conf, logger):
         Dictionary to store the data with variables initialized.
 
     """
+    alloc = allocation.Allocator()
+
     # scalar variables
     # ------------------------------------------------------------------------
     data["tilt_angle_first"] = MISSING_FLOAT
@@ -135,115 +300,36 @@ def init(data, dims, conf, logger):
 
     # dimensions variables
     # ------------------------------------------------------------------------
-    data["time"] = np.ones(dims["time"], dtype=np.dtype(dt.datetime))
-    data["layer"] = np.ones(dims["layer"], dtype="i4")
-    data["range"] = np.ones(dims["range"], dtype="i4")
+    data["time"] = alloc.empty(dims["time"], np.dtype(dt.datetime))
+    data["layer"] = alloc.empty(dims["layer"], "i4")
+    data["range"] = alloc.empty(dims["range"], "i4")
 
     # time dependant variables
     # ------------------------------------------------------------------------
-    ones_int16 = np.ones((dims["time"],), dtype="i2") * MISSING_INT
-    ones_flt32 = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    data["vertical_visibility"] = ones_flt32.copy()
-    data["fog_detection"] = ones_int16.copy()
-    data["precipitation_detection"] = ones_int16.copy()
-    data["receiver_gain"] = ones_int16.copy()
-    data["beta_sum"] = ones_flt32.copy()
-    data["beta_noise"] = ones_flt32.copy()
-    data["lat"] = ones_flt32.copy()
-    data["lon"] = ones_flt32.copy()
-    data["alt"] = ones_flt32.copy()
-    data["tilt_angle"] = ones_flt32.copy()
-    data["tilt_angle_correction"] = ones_int16.copy()
-    data["cloud_cover"] = ones_flt32.copy()
+    required = projection.get_required(conf, DEPENDENCIES)
+    shapes = {
+        "time": (dims["time"],),
+        "layer": (dims["time"], dims["layer"]),
+        "range": (dims["time"], dims["range"]),
+    }
+    for var_name, (dim, dtype, fill_value) in TIMEDEP_VARS_INIT.items():
+        if projection.is_required(required, var_name):
+            data[var_name] = alloc.full(shapes[dim], fill_value, dtype)
 
     # range dependent variables
     # -------------------------------------------------------------------------
-    data["overlap_function"] = np.ones((dims["range"],), dtype="f4") * MISSING_FLOAT
+    data["overlap_function"] = alloc.full((dims["range"],), MISSING_FLOAT, "f4")
 
-    # Time, layer dependant variables
+    # Status variables (string)
     # -------------------------------------------------------------------------
-    ones_int32 = np.ones((dims["time"], dims["layer"]), dtype="i4") * MISSING_INT
-    ones_flt32 = np.ones((dims["time"], dims["layer"]), dtype="f4") * MISSING_FLOAT
-    data["cbh"] = ones_flt32.copy()
-    data["cloud_penetration_depth"] = ones_int32.copy()
-    data["cloud_thickness"] = ones_int32.copy()
-    # starting fw 1.1.x
-    data["cloud_cover"] = np.ones((dims["time"]), dtype=np.int32) * MISSING_INT
-    data["cloud_layer_cover"] = ones_int32.copy()
-    data["cloud_layer_height"] = ones_flt32.copy()
+    for var_name in STATUS_VARS:
+        if projection.is_required(required, var_name):
+            data[var_name] = alloc.full((dims["time"],), MISSING_INT, "i2")
 
-    # Time, range dependent variables
-    # -------------------------------------------------------------------------
-    ones_flt32 = np.ones((dims["time"], dims["range"]), dtype="f4")
-    data["rcs_0"] = ones_flt32.copy()
-    data["rcs_1"] = ones_flt32.copy()
-    data["rcs_2"] = ones_flt32.copy()
-    data["beta"] = ones_flt32.copy()
-    data["linear_depol_ratio"] = ones_flt32.copy()
+    skipped = [key for key in [*TIMEDEP_VARS_INIT, *STATUS_VARS] if key not in data]
+    logger.debug("variables not needed in output file: %s", ", ".join(skipped))
 
-    # house keeping data variables
-    # -------------------------------------------------------------------------
-    ones_flt32 = np.ones((dims["time"],), dtype="f4") * MISSING_FLOAT
-    ones_int16 = np.ones((dims["time"],), dtype="i2") * MISSING_INT
-    data["hkd_rh_int"] = ones_flt32.copy()
-    data["hkd_temp_int"] = ones_flt32.copy()
-    data["hkd_temp_trans"] = ones_flt32.copy()
-    data["hkd_pres_int"] = ones_flt32.copy()
-    data["hkd_temp_laser"] = ones_flt32.copy()
-    data["hkd_state_laser"] = ones_flt32.copy()
-    data["hkd_state_optics"] = ones_flt32.copy()
-    data["hkd_bkgd_radiance"] = ones_flt32.copy()
-    data["hkd_heater_int"] = ones_int16.copy()
-    data["hkd_window_blower"] = ones_int16.copy()
-    data["hkd_window_blower_heater"] = ones_int16.copy()
-
-    # Status variables (string)
-    # -------------------------------------------------------------------------
-    ones_int16 = np.ones((dims["time"],), dtype="i2") * MISSING_INT
-    # device
-    data["status_device_controller_temperature"] = ones_int16.copy()
-    data["status_device_controller_electronics"] = ones_int16.copy()
-    data["status_device_controller_overall"] = ones_int16.copy()
-    # optics
-    data["status_optics_unit_accelerometer"] = ones_int16.copy()
-    data["status_optics_unit_electronics"] = ones_int16.copy()
-    data["status_optics_unit_overall"] = ones_int16.copy()
-    data["status_optics_unit_memory"] = ones_int16.copy()
-    data["status_optics_unit_tilt_angle"] = ones_int16.copy()
-    # receiver
-    data["status_receiver_electronics"] = ones_int16.copy()
-    data["status_receiver_overall"] = ones_int16.copy()
-    data["status_receiver_memory"] = ones_int16.copy()
-    data["status_receiver_voltage"] = ones_int16.copy()
-    data["status_receiver_solar_saturation"] = ones_int16.copy()
-    data["status_receiver_sensitivity"] = ones_int16.copy()
-    # window
-    data["status_window_blocking"] = ones_int16.copy()
-    data["status_window_condition"] = ones_int16.copy()
-    data["status_window_blower_fan"] = ones_int16.copy()
-    data["status_window_blower_heater"] = ones_int16.copy()
-    # servo
-    data["status_servo_drive_electronics"] = ones_int16.copy()
-    data["status_servo_drive_overall"] = ones_int16.copy()
-    data["status_servo_drive_memory"] = ones_int16.copy()
-    data["status_servo_drive_control"] = ones_int16.copy()
-    data["status_servo_drive_ready"] = ones_int16.copy()
-    # transmitter
-    data["status_transmitter_electronics"] = ones_int16.copy()
-    data["status_transmitter_light_source"] = ones_int16.copy()
-    data["status_transmitter_light_source_power"] = ones_int16.copy()
-    data["status_transmitter_overall"] = ones_int16.copy()
-    data["status_transmitter_light_source_safety"] = ones_int16.copy()
-    data["status_transmitter_memory"] = ones_int16.copy()
-    # others
-    data["status_maintenance_overall"] = ones_int16.copy()
-    data["status_device_overall"] = ones_int16.copy()
-    data["status_recently_started"] = ones_int16.copy()
-    data["status_measurement_status"] = ones_int16.copy()
-    data["status_datacom_overall"] = ones_int16.copy()
-    data["status_measurement_data_destination_not_set"] = ones_int16.copy()
-    data["status_inside_heater"] = ones_int16.copy()
-    data["status_data_generation_status"] = ones_int16.copy()
+    alloc.log_summary(logger)
 
     return data
 
@@ -333,7 +419,7 @@ def read_scalar_vars(data, nc_id, logger):
     return data
 
 
-def read_timedep_vars(data, nc_id, time_ind, logger):
+def read_timedep_vars(data, nc_id, time_ind, logger, window=None):
     """
     Read 1d and 2d time dependant variables from netCDF file.
 
@@ -347,6 +433,8 @@ def read_timedep_vars(data, nc_id, time_ind, logger):
         Index of the time to read.
     logger : logging.Logger
         Logger object to log the progress.
+    window : tuple of datetime.datetime, optional
+        Time window of the data to read. All data are read if None.
 
     Returns
     -------
@@ -358,7 +446,11 @@ def read_timedep_vars(data, nc_id, time_ind, logger):
     """
     # dimensions variables
     # ------------------------------------------------------------------------
-    time = nc.num2date(nc_id.variables["time"][:], units=nc_id.variables["time"].units)
+    # only data inside the time window are read
+    t_sel = time_window.get_nc_time_selection(nc_id.variables["time"], window)
+    time = cf_time.num2date(
+        nc_id.variables["time"][t_sel], nc_id.variables["time"].units
+    )
     time_size = time.size
 
     # index size
@@ -370,47 +462,12 @@ def read_timedep_vars(data, nc_id, time_ind, logger):
         "processing timesteps %s to %s", data["time"][ind_b], data["time"][ind_e - 1]
     )
 
-    # time dependant variables variables
+    # time dependant variables
     # ------------------------------------------------------------------------
-    # fmt: off
-    data["vertical_visibility"][ind_b:ind_e] = nc_id.variables["vertical_visibility"][:]
-    if data["float_fw_version"] >= 1.2:
-        data["fog_detection"][ind_b:ind_e] = nc_id.variables["fog_detection"][:]
-        data["precipitation_detection"][ind_b:ind_e] = nc_id.variables["precipitation_detection"][:]  # noqa
-        data["receiver_gain"][ind_b:ind_e] = nc_id.variables["receiver_gain"][:]
-    data["beta_sum"][ind_b:ind_e] = nc_id.variables["beta_att_sum"][:]
-    data["beta_noise"][ind_b:ind_e] = nc_id.variables["beta_att_noise_level"][:]
-    data["lat"][ind_b:ind_e] = nc_id.variables["latitude"][:]
-    data["lon"][ind_b:ind_e] = nc_id.variables["longitude"][:]
-    data["alt"][ind_b:ind_e] = nc_id.variables["elevation"][:]
-    if data["float_fw_version"] >= 1.1:
-        data["cloud_cover"][ind_b:ind_e] = nc_id.variables["sky_condition_total_cloud_cover"][:]  # noqa
-        data["tilt_angle"][ind_b:ind_e] = nc_id.variables["tilt_angle"][:]
-        data["tilt_angle_correction"][ind_b:ind_e] = nc_id.variables["tilt_correction"][:]  # noqa
-    # fmt: on
-
-    # Time, layer dependant variables
-    # -------------------------------------------------------------------------
-    # fmt: off
-    data["cbh"][ind_b:ind_e, :] = nc_id.variables["cloud_base_heights"][:]
-    # starting fw 1.1.x
-    if data["float_fw_version"] >= 1.1:
-        data["cloud_cover"][ind_b:ind_e] = nc_id.variables["sky_condition_total_cloud_cover"][:]  # noqa
-        data["cloud_layer_cover"][ind_b:ind_e, :] = nc_id.variables["sky_condition_cloud_layer_covers"][:]  # noqa
-        data["cloud_layer_height"][ind_b:ind_e, :] = nc_id.variables["sky_condition_cloud_layer_heights"][:]  # noqa
-    if data["float_fw_version"] >= 1.2:
-        data["cloud_penetration_depth"][ind_b:ind_e, :] = nc_id.variables["cloud_penetration_depth"][:]  # noqa
-        data["cloud_thickness"][ind_b:ind_e, :] = nc_id.variables["cloud_thickness"][:]  # noqa
-    # fmt: off
-
-    # Time, range dependent variables
-    # -------------------------------------------------------------------------
-    # fmt: off
-    data["rcs_1"][ind_b:ind_e, :] = nc_id.variables["p_pol"][:]
-    data["rcs_2"][ind_b:ind_e, :] = nc_id.variables["x_pol"][:]
-    data["beta"][ind_b:ind_e, :] = nc_id.variables["beta_att"][:]
-    data["linear_depol_ratio"][ind_b:ind_e, :] = nc_id.variables["linear_depol_ratio"][:]  # noqa
-    # fmt: on
+    # variables not needed in the output file are not allocated nor read
+    for var_name, nc_name, min_fw in TIMEDEP_VARS:
+        if var_name in data and data["float_fw_version"] >= min_fw:
+            data[var_name][ind_b:ind_e] = nc_id.variables[nc_name][t_sel]
 
     # house keeping data variables
     # -------------------------------------------------------------------------
@@ -422,75 +479,24 @@ def read_timedep_vars(data, nc_id, time_ind, logger):
 
     # fw v1.1 HKD are attributes of the monitoring group
     if data["float_fw_version"] == 1.1:
-        data["hkd_bkgd_radiance"][ind_b:ind_e] = mon.background_radiance
-        data["hkd_rh_int"][ind_b:ind_e] = mon.internal_humidity
-        data["hkd_temp_int"][ind_b:ind_e] = mon.internal_temperature
-        data["hkd_pres_int"][ind_b:ind_e] = mon.internal_pressure
-        data["hkd_temp_laser"][ind_b:ind_e] = mon.laser_temperature
-        data["hkd_state_laser"][ind_b:ind_e] = mon.laser_power_percent
-        data["hkd_state_optics"][ind_b:ind_e] = mon.window_condition
+        for var_name, attr_name in HKD_ATTRS_V11.items():
+            if var_name in data:
+                data[var_name][ind_b:ind_e] = mon.getncattr(attr_name)
 
     # fw v1.2 HKD are variables of the monitoring group
     if data["float_fw_version"] >= 1.2:
-        # fmt: off
-        data["hkd_bkgd_radiance"][ind_b:ind_e] = mon.variables["background_radiance"][:]
-        data["hkd_rh_int"][ind_b:ind_e] = mon.variables["internal_humidity"][:]
-        data["hkd_temp_int"][ind_b:ind_e] = mon.variables["internal_temperature"][:]
-        data["hkd_temp_trans"][ind_b:ind_e] = mon.variables["transmitter_enclosure_temperature"][:]  # noqa
-        data["hkd_pres_int"][ind_b:ind_e] = mon.variables["internal_pressure"][:]
-        data["hkd_temp_laser"][ind_b:ind_e] = mon.variables["laser_temperature"][:]
-        data["hkd_state_laser"][ind_b:ind_e] = mon.variables["laser_power_percent"][:]
-        data["hkd_state_optics"][ind_b:ind_e] = mon.variables["window_condition"][:]
-        data["hkd_heater_int"][ind_b:ind_e] = mon.variables["internal_heater"][:]
-        data["hkd_window_blower"][ind_b:ind_e] = mon.variables["window_blower"][:]
-        data["hkd_window_blower_heater"][ind_b:ind_e] = mon.variables["window_blower_heater"][:]  # noqa
-        # fmt: on
+        for var_name, nc_name in HKD_VARS.items():
+            if var_name in data:
+                data[var_name][ind_b:ind_e] = mon.variables[nc_name][t_sel]
 
     # status code variables
     # -------------------------------------------------------------------------
     logger.debug("reading status code variables")
     if data["float_fw_version"] >= 1.2:
         status = nc_id["status"]
-        # fmt: off
-        data["status_device_controller_temperature"][ind_b:ind_e] = status.variables["Device_controller_temperature"][:]  # noqa
-        data["status_device_controller_electronics"][ind_b:ind_e] = status.variables["Device_controller_electronics"][:]  # noqa
-        data["status_device_controller_overall"][ind_b:ind_e] = status.variables["Device_controller_overall"][:]  # noqa
-        data["status_optics_unit_accelerometer"][ind_b:ind_e] = status.variables["Optics_unit_accelerometer"][:]  # noqa
-        data["status_optics_unit_electronics"][ind_b:ind_e] = status.variables["Optics_unit_electronics"][:]  # noqa
-        data["status_optics_unit_overall"][ind_b:ind_e] = status.variables["Optics_unit_overall"][:]  # noqa
-        data["status_optics_unit_memory"][ind_b:ind_e] = status.variables["Optics_unit_memory"][:]  # noqa
-        data["status_optics_unit_tilt_angle"][ind_b:ind_e] = status.variables["Optics_unit_tilt_angle"][:]  # noqa
-        data["status_receiver_electronics"][ind_b:ind_e] = status.variables["Receiver_electronics"][:]  # noqa
-        data["status_receiver_overall"][ind_b:ind_e] = status.variables["Receiver_overall"][:]  # noqa
-        data["status_receiver_memory"][ind_b:ind_e] = status.variables["Receiver_memory"][:]  # noqa
-        data["status_receiver_voltage"][ind_b:ind_e] = status.variables["Receiver_voltage"][:]  # noqa
-        data["status_receiver_solar_saturation"][ind_b:ind_e] = status.variables["Receiver_solar_saturation"][:]  # noqa
-        data["status_receiver_sensitivity"][ind_b:ind_e] = status.variables["Receiver_sensitivity"][:]  # noqa
-        data["status_window_blocking"][ind_b:ind_e] = status.variables["Window_condition"][:]  # noqa
-        data["status_window_condition"][ind_b:ind_e] = status.variables["Window_condition"][:]  # noqa
-        data["status_window_blower_fan"][ind_b:ind_e] = status.variables["Window_blower_fan"][:]  # noqa
-        data["status_window_blower_heater"][ind_b:ind_e] = status.variables["Window_blower_heater"][:]  # noqa
-        data["status_servo_drive_electronics"][ind_b:ind_e] = status.variables["Servo_drive_electronics"][:]  # noqa
-        data["status_servo_drive_overall"][ind_b:ind_e] = status.variables["Servo_drive_overall"][:]  # noqa
-        data["status_servo_drive_memory"][ind_b:ind_e] = status.variables["Servo_drive_memory"][:]  # noqa
-        data["status_servo_drive_control"][ind_b:ind_e] = status.variables["Servo_drive_control"][:]  # noqa
-        data["status_servo_drive_ready"][ind_b:ind_e] = status.variables["Servo_drive_ready"][:]  # noqa
-        data["status_transmitter_electronics"][ind_b:ind_e] = status.variables["Transmitter_electronics"][:]  # noqa
-        data["status_transmitter_light_source"][ind_b:ind_e] = status.variables["Transmitter_light_source"][:]  # noqa
-        data["status_transmitter_light_source_power"][ind_b:ind_e] = status.variables["Transmitter_light_source_power"][:]  # noqa
-        data["status_transmitter_overall"][ind_b:ind_e] = status.variables["Transmitter_overall"][:]  # noqa
-        data["status_transmitter_light_source_safety"][ind_b:ind_e] = status.variables["Transmitter_light_source_safety"][:]  # noqa
-        data["status_transmitter_memory"][ind_b:ind_e] = status.variables["Transmitter_memory"][:]  # noqa
-        data["status_maintenance_overall"][ind_b:ind_e] = status.variables["Maintenance_overall"][:]  # noqa
-        data["status_device_overall"][ind_b:ind_e] = status.variables["Device_overall"][:]  # noqa
-        data["status_recently_started"][ind_b:ind_e] = status.variables["Recently_started"][:]  # noqa
-        data["status_measurement_status"][ind_b:ind_e] = status.variables["Measurement_status"][:]  # noqa
-        data["status_datacom_overall"][ind_b:ind_e] = status.variables["Datacom_overall"][:]  # noqa
-        data["status_measurement_data_destination_not_set"][ind_b:ind_e] = status.variables["Measurement_data_destination_not_set"][:]  # noqa
-        data["status_inside_heater"][ind_b:ind_e] = status.variables["Inside_heater"][:]  # noqa
-        data["status_data_generation_status"][ind_b:ind_e] = status.variables["Data_generation_status"][:]  # noqa
-
-        # fmt: on
+        for var_name, nc_name in STATUS_VARS.items():
+            if var_name in data:
+                data[var_name][ind_b:ind_e] = status.variables[nc_name][t_sel]
 
     return time_size, data
 
@@ -554,7 +560,8 @@ def read_data(list_files, conf, logger):
     # get size of data to read and init variables
     # ------------------------------------------------------------------------
     logger.info("Determining size of data")
-    data_dims = get_dimension_size(list_files, logger)
+    window = conf.get(time_window.TIME_WINDOW_KEY)
+    data_dims, list_files = get_dimension_size(list_files, logger, window=window)
     logger.info("initializing data output array")
     data = init(data, data_dims, conf, logger)
 
@@ -562,10 +569,16 @@ def read_data(list_files, conf, logger):
     nb_files_read = 0
     time_ind = 0
     # Loop over the list of files
-    for ifile in list_files:
+    # next files are loaded while the current one is decoded if they are
+    # entirely read
+    partial = window is not None or projection.get_required(conf) is not None
+    files_content = file_io.iter_prefetched(
+        list_files, file_io.load_content, file_io.get_prefetch_depth(conf, partial)
+    )
+    for ifile, content in files_content:
         # Opening file
         try:
-            raw_data = nc.Dataset(ifile, "r")
+            raw_data = file_io.open_netcdf(ifile, content)
             nb_files_read += 1
         except (RuntimeError, OSError):
             logger.error("109 unable to load " + ifile + " trying next one")
@@ -594,7 +607,9 @@ def read_data(list_files, conf, logger):
         if nb_files_read >= 1:
             # Time dependant variables
             logger.info("reading time dependant variables for file %02d", nb_files_read)
-            time_size, data = read_timedep_vars(data, raw_data, time_ind, logger)
+            time_size, data = read_timedep_vars(
+                data, raw_data, time_ind, logger, window=window
+            )
 
             # increment indexes
             time_ind += time_size
@@ -609,22 +624,20 @@ def read_data(list_files, conf, logger):
         sys.exit(1)
 
     # full backscatter
-    data["rcs_0"] = data["rcs_1"] + data["rcs_2"]
+    if "rcs_1" in data and "rcs_2" in data:
+        data["rcs_0"] = data["rcs_1"] + data["rcs_2"]
 
     # start time of measurements
     data["start_time"] = data["time"] - dt.timedelta(seconds=int(data["time_resol"]))
 
     # change of units
-    data["hkd_temp_int"] = np.where(
-        data["hkd_temp_int"] != MISSING_FLOAT,
-        data["hkd_temp_int"] + CELSIUS_TO_KELVIN,
-        data["hkd_temp_int"],
-    )
-    data["hkd_temp_laser"] = np.where(
-        data["hkd_temp_laser"] != MISSING_FLOAT,
-        data["hkd_temp_laser"] + CELSIUS_TO_KELVIN,
-        data["hkd_temp_laser"],
-    )
+    for var_name in ["hkd_temp_int", "hkd_temp_laser"]:
+        if var_name in data:
+            data[var_name] = np.where(
+                data[var_name] != MISSING_FLOAT,
+                data[var_name] + CELSIUS_TO_KELVIN,
+                data[var_name],
+            )
 
     # force localization if defined in conf file
     if "lat" in conf:
@@ -635,18 +648,22 @@ def read_data(list_files, conf, logger):
         data["station_alt"] = float(conf["alt"])
 
     # correct problem of missing values for clouds and cover variables
-    cbh_filter = (data["cbh"] > 0) & (data["cbh"] < 20000)
-    data["cbh"] = np.where(cbh_filter, data["cbh"], MISSING_FLOAT)
-    cc_filter = data["cloud_cover"] > 0
-    data["cloud_cover"] = np.where(cc_filter, data["cloud_cover"], MISSING_INT)
-    cc_filter = data["cloud_layer_cover"] > 0
-    data["cloud_layer_cover"] = np.where(
-        cc_filter, data["cloud_layer_cover"], MISSING_INT
-    )
-    cc_filter = data["cloud_layer_height"] > 0
-    data["cloud_layer_height"] = np.where(
-        cc_filter, data["cloud_layer_height"], MISSING_FLOAT
-    )
+    if "cbh" in data:
+        cbh_filter = (data["cbh"] > 0) & (data["cbh"] < 20000)
+        data["cbh"] = np.where(cbh_filter, data["cbh"], MISSING_FLOAT)
+    if "cloud_cover" in data:
+        cc_filter = data["cloud_cover"] > 0
+        data["cloud_cover"] = np.where(cc_filter, data["cloud_cover"], MISSING_INT)
+    if "cloud_layer_cover" in data:
+        cc_filter = data["cloud_layer_cover"] > 0
+        data["cloud_layer_cover"] = np.where(
+            cc_filter, data["cloud_layer_cover"], MISSING_INT
+        )
+    if "cloud_layer_height" in data:
+        cc_filter = data["cloud_layer_height"] > 0
+        data["cloud_layer_height"] = np.where(
+            cc_filter, data["cloud_layer_height"], MISSING_FLOAT
+        )
 
     # print status (only for fw >= 1.2)
     print_status_message(data, logger)
@@ -5,6 +5,7 @@ from os.path import basename
 
 import numpy as np
 
+from tools import column_buffer, file_io, projection, range_correction
 from tools.utils import chomp, to_bool
 
 # brand and model of the LIDAR
@@ -145,18 +146,18 @@ def store_error(data, err_msg, logger):
 
 
 def log_error_msg(data, logger):
-    msg_format = "\t- {} : {:d} message(s)"
+    msg_format = "\t- %s : %d message(s)"
 
     if len(data["list_errors"]) > 0:
         logger.info("summary of instruments messages")
 
     for msg in data["list_errors"]:
         if data["list_errors"][msg]["level"] == "STATUS":
-            logger.info(msg_format.format(msg, data["list_errors"][msg]["count"]))
+            logger.info(msg_format, msg, data["list_errors"][msg]["count"])
         elif data["list_errors"][msg]["level"] == "WARNING":
-            logger.warning(msg_format.format(msg, data["list_errors"][msg]["count"]))
+            logger.warning(msg_format, msg, data["list_errors"][msg]["count"])
         elif data["list_errors"][msg]["level"] == "ALARM":
-            logger.error(msg_format.format(msg, data["list_errors"][msg]["count"]))
+            logger.error(msg_format, msg, data["list_errors"][msg]["count"])
 
 
 def are_units_meters(err_msg, logger):
@@ -200,7 +201,6 @@ def check_scale_value(data, conf, ind, f_name, logger):
 
         if conf["check_scale"]:
             data["rcs_0"][ind, :] = conf["missing_float"]
-            data["pr2"][ind, :] = conf["missing_float"]
 
 
 def get_file_lines(filename, conf, logger):
@@ -210,38 +210,16 @@ def get_file_lines(filename, conf, logger):
     """
 
     try:
-        with open(filename, encoding=conf["file_encoding"]) as f_id:
-            logger.debug("reading " + filename)
+        with file_io.open_file(filename, encoding=conf["file_encoding"]) as f_id:
+            logger.debug("reading %s", filename)
             lines = chomp(f_id.readlines())
-    except OSError:
+    except file_io.READ_ERRORS:
         logger.error("109 Impossible to open file " + filename)
         return None
 
     return lines
 
 
-def count_msg_to_read(list_files, f_fmt, logger):
-    """
-    to a first reading of the CL31 file to determine the number
-    of data messages which need to be read
-    """
-
-    n_data_msg = 0
-
-    # loop over filenames to read to count the number of messages
-    # data message start with a date using the format "-%Y-%m-%d %H:%M:%S"
-    for ifile in list_files:
-        try:
-            dt.datetime.strptime(basename(ifile), f_fmt)
-            n_data_msg += 1
-        except ValueError:
-            continue
-
-    logger.info("%d data messages to read" % n_data_msg)
-
-    return n_data_msg
-
-
 def get_conf_msg(line, logger):
     """
     Extract conf message
@@ -264,7 +242,7 @@ def get_range_resol(conf_msg, logger):
     try:
         int_coding = int(conf_msg[7:8])
         range_resol = RANGE_RESOL[int_coding]
-        logger.debug("range resolution: %d m" % range_resol)
+        logger.debug("range resolution: %d m", range_resol)
     except Exception as err:
         logger.warning("105 Problem reading range resolution: " + repr(err))
         return None
@@ -280,7 +258,7 @@ def get_range_ngates(conf_msg, logger):
     try:
         int_coding = int(conf_msg[7:8])
         range_ngates = RANGE_GATES[int_coding]
-        logger.debug("number of vertical gates: %d" % range_ngates)
+        logger.debug("number of vertical gates: %d", range_ngates)
     except Exception as err:
         logger.warning("105 Problem reading number of vertical gates " + repr(err))
         return None
@@ -433,7 +411,8 @@ def get_acq_conf(filename, data, data_dim, f_fmt, conf, logger):
 
 def init_data(data, data_dim, conf, logger):
     """
-    declare size of the numpy arraies and initialiase it
+    declare the arraies in the data buffer and initialiase it. Time
+    dependant arrays grow while messages are read
     """
 
     # get missing values
@@ -442,53 +421,36 @@ def init_data(data, data_dim, conf, logger):
 
     # Dimension variables
     # -------------------------------------------------------------------------
-    data["time"] = np.ones((data_dim["time"],), dtype=np.dtype(dt.datetime)) * np.nan
+    data.add_column("time", np.dtype(dt.datetime), np.nan)
     data["cbh_layer"] = np.array([x + 1 for x in range(CBH_DIM)])
     data["clh_layer"] = np.array([x + 1 for x in range(CLH_DIM)])
 
     # Time dependant variables
     # -------------------------------------------------------------------------
-    data["scale"] = np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    data["laser_temp"] = np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    data["laser_energy"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["bckgrd_rcs_0"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["window_transmission"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["tilt_angle"] = np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    data["integrated_rcs_0"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["vertical_visibility"] = (
-        np.ones((data_dim["time"],), dtype=np.int32) * missing_int
-    )
-    data["alarm"] = np.ndarray((data_dim["time"],), dtype="S1")
-    data["info_flags"] = np.ndarray((data_dim["time"],), dtype="S12")
+    data.add_column("scale", np.float32, missing_float)
+    data.add_column("laser_temp", np.float32, missing_float)
+    data.add_column("laser_energy", np.float32, missing_float)
+    data.add_column("bckgrd_rcs_0", np.float32, missing_float)
+    data.add_column("window_transmission", np.float32, missing_float)
+    data.add_column("tilt_angle", np.float32, missing_float)
+    data.add_column("integrated_rcs_0", np.float32, missing_float)
+    data.add_column("vertical_visibility", np.int32, missing_int)
+    data.add_column("alarm", "S1", b"")
+    data.add_column("info_flags", "S12", b"")
 
     # Time, layer dependant variables
     # -------------------------------------------------------------------------
-    data["cbh"] = np.ones((data_dim["time"], CBH_DIM), dtype=np.int32) * missing_int
-    data["clh"] = np.ones((data_dim["time"], CLH_DIM), dtype=np.float32) * missing_float
-    data["cloud_amount"] = (
-        np.ones((data_dim["time"], CLH_DIM), dtype=np.int16) * missing_int
-    )
+    data.add_column("cbh", np.int32, missing_int, (CBH_DIM,))
+    data.add_column("clh", np.float32, missing_float, (CLH_DIM,))
+    data.add_column("cloud_amount", np.int16, missing_int, (CLH_DIM,))
 
     # Time, range dependent variables
     # -------------------------------------------------------------------------
-    data["rcs_0"] = (
-        np.ones((data_dim["time"], data_dim["range"]), dtype=np.float32) * missing_float
-    )
-    data["pr2"] = (
-        np.ones((data_dim["time"], data_dim["range"]), dtype=np.float32) * missing_float
-    )
+    data.add_column("rcs_0", np.float32, missing_float, (data_dim["range"],))
 
     # Special variable to store for each message the unit of CBH and CLH
     # -------------------------------------------------------------------------
-    data["are_unit_meter"] = np.ones((data_dim["time"],), dtype=bool)
+    data.add_column("are_unit_meter", bool, True)
     data["list_errors"] = {}
 
     return data
@@ -671,6 +633,7 @@ def read_vars(lines, data, conf, time_ind, f_name, f_fmt, logger):
     """
 
     # get timestamp
+    data.reserve(time_ind + 1)
     data["time"][time_ind] = dt.datetime.strptime(basename(f_name), f_fmt)
     n_lines = len(lines)
     i_line = 0
@@ -684,18 +647,15 @@ def read_vars(lines, data, conf, time_ind, f_name, f_fmt, logger):
             continue
 
         msg = lines[i_line : i_line + msg_n_lines]
-        logger.debug("processing data message %d" % (time_ind + 1))
+        data.reserve(time_ind + 1)
 
         # read time only dependent variables
-        logger.debug("reading time only dependent variables")
         data = read_time_dep_vars(data, time_ind, msg, data["msg_type"], logger)
 
         # read CBH
-        logger.debug("reading cbh/clh")
         data = read_cbh_vars(data, time_ind, msg, logger)
 
         # read rcs
-        logger.debug("reading rcs")
         data = read_rcs_var(data, time_ind, msg, logger)
 
         # check scale value if needed
@@ -726,10 +686,9 @@ def read_data(list_files, conf, logger):
 
     # analyse file to read to determine the size of the time variable
     # -------------------------------------------------------------------------
-    data = {}
+    # the number of data messages is not known before reading all the files
+    data = column_buffer.ColumnBuffer()
     data_dim = {}
-    logger.info("analysing input files to get the configuration")
-    data_dim["time"] = count_msg_to_read(list_files, filename_fmt, logger)
 
     # checking conf parameters
     # -------------------------------------------------------------------------
@@ -763,9 +722,12 @@ def read_data(list_files, conf, logger):
     logger.info("reading files")
     time_ind = 0
     nb_files_read = 0
-    for ifile in list_files:
-        # try reading the file
-        lines = get_file_lines(ifile, conf, logger)
+    # next file is read while the current one is decoded
+    for ifile, lines in file_io.iter_prefetched(
+        list_files,
+        lambda f: get_file_lines(f, conf, logger),
+        file_io.get_prefetch_depth(conf),
+    ):
         if lines is None:
             logger.warning(f"102 No data found in the file '{ifile}'trying next file")
             continue
@@ -777,6 +739,9 @@ def read_data(list_files, conf, logger):
             lines, data, conf, time_ind, ifile, filename_fmt, logger
         )
 
+    logger.info("%d data messages read", time_ind)
+    data = data.finalize(time_ind)
+
     # add start_time and time resolution variable
     # ------------------------------------------------------------------------
     data["time_resolution"] = conf["time_resol"]
@@ -784,7 +749,14 @@ def read_data(list_files, conf, logger):
 
     # Final calculation on whole profiles
     # -------------------------------------------------------------------------
-    data["pr2"] = data["rcs_0"] * RCS_FACTOR * data["range"] ** 2
+    # Pr² is only computed if it is written in the output file
+    if projection.is_required(projection.get_required(conf), "pr2"):
+        data["pr2"] = range_correction.range_correct(
+            data["rcs_0"],
+            data["range"],
+            RCS_FACTOR,
+            projection.get_dtype(conf, "pr2", range_correction.DEFAULT_DTYPE),
+        )
 
     # Summary of instrument message
     # ------------------------------------------------------------------------
@@ -6,6 +6,7 @@ import sys
 
 import numpy as np
 
+from tools import column_buffer, file_io, projection, range_correction, time_window
 from tools.utils import chomp, to_bool
 
 # brand and model of the LIDAR
@@ -33,8 +34,20 @@ RCS_MSG_START_LINE = {2: 4}
 CBH_DIM = 3
 CLH_DIM = 5
 
-# constant
+# layout of rcs lines: 3 digits offset of first sample followed by 16 samples
 RCS_BYTES_SIZE = 4
+RCS_OFFSET_SIZE = 3
+RCS_SAMPLES_PER_LINE = 16
+RCS_LINE_WIDTH = RCS_OFFSET_SIZE + RCS_SAMPLES_PER_LINE * RCS_BYTES_SIZE
+RCS_NB_LINES = {2: 16}
+
+# conversion table of ASCII codes into hexadecimal digit values
+INVALID_HEX = 255
+HEX_LUT = np.full(256, INVALID_HEX, dtype=np.uint8)
+for hex_char in b"0123456789abcdefABCDEF":
+    HEX_LUT[hex_char] = int(chr(hex_char), 16)
+
+# constant
 RCS_FACTOR = 1e-7
 DEG_TO_K = 273.15
 FEET_TO_METERS = 0.3048
@@ -146,18 +159,18 @@ def store_error(data, err_msg, logger):
 
 
 def log_error_msg(data, logger):
-    msg_format = "{} : {:d} message(s)"
+    msg_format = "%s : %d message(s)"
 
     if len(data["list_errors"]) > 0:
         logger.info("summary of instruments messages")
 
     for msg in data["list_errors"]:
         if data["list_errors"][msg]["level"] == "STATUS":
-            logger.info(msg_format.format(msg, data["list_errors"][msg]["count"]))
+            logger.info(msg_format, msg, data["list_errors"][msg]["count"])
         elif data["list_errors"][msg]["level"] == "WARNING":
-            logger.warning(msg_format.format(msg, data["list_errors"][msg]["count"]))
+            logger.warning(msg_format, msg, data["list_errors"][msg]["count"])
         elif data["list_errors"][msg]["level"] == "ALARM":
-            logger.error(msg_format.format(msg, data["list_errors"][msg]["count"]))
+            logger.error(msg_format, msg, data["list_errors"][msg]["count"])
 
 
 def are_units_meters(err_msg, logger):
@@ -200,9 +213,7 @@ def check_scale_value(data, conf, ind, f_name, logger):
     if data["scale"][ind] != OK_SCALE_VALUE:
         logger.warning(msg.format(f_name, data["time"][ind]))
 
-        if conf["check_scale"]:
-            data["rcs_0"][ind, :] = conf["missing_float"]
-            data["pr2"][ind, :] = conf["missing_float"]
+        # profile is voided by decode_rcs if check_scale is true
 
 
 def get_file_lines(filename, conf, logger):
@@ -212,40 +223,16 @@ def get_file_lines(filename, conf, logger):
 
     """
     try:
-        with open(filename, encoding=conf["file_encoding"]) as f_id:
-            logger.debug("reading " + filename)
+        with file_io.open_file(filename, encoding=conf["file_encoding"]) as f_id:
+            logger.debug("reading %s", filename)
             lines = chomp(f_id.readlines())
-    except OSError:
+    except file_io.READ_ERRORS:
         logger.error("109 Impossible to open file " + filename)
         return None
 
     return lines
 
 
-def count_msg_to_read(list_files, conf, logger):
-    """
-    to a first reading of the CL31 file to determine the number
-    of data messages which need to be read
-
-    """
-    n_data_msg = 0
-
-    # loop over filenames to read to count the number of messages
-    # data message start with a date using the format "-%Y-%m-%d %H:%M:%S"
-    for ifile in list_files:
-        lines = get_file_lines(ifile, conf, logger)
-        for line in lines:
-            try:
-                dt.datetime.strptime(line, FMT_DATE)
-                n_data_msg += 1
-            except ValueError:
-                continue
-
-    logger.info("%d data messages to read" % n_data_msg)
-
-    return n_data_msg
-
-
 def get_conf_msg(line, logger):
     """
     Extract conf message.
@@ -269,7 +256,7 @@ def get_range_resol(conf_msg, logger):
     try:
         int_coding = int(conf_msg[-2])
         range_resol = RANGE_RESOL[int_coding]
-        logger.debug("range resolution: %d m" % range_resol)
+        logger.debug("range resolution: %d m", range_resol)
     except Exception as err:
         logger.warning("105 Problem reading range resolution: " + repr(err))
         return None
@@ -286,7 +273,7 @@ def get_range_ngates(conf_msg, logger):
         int_coding = int(conf_msg[-2])
         print(conf_msg)
         range_ngates = RANGE_GATES[int_coding]
-        logger.debug("number of vertical gates: %d" % range_ngates)
+        logger.debug("number of vertical gates: %d", range_ngates)
     except Exception as err:
         logger.warning("105 Problem reading number of vertical gates %s", repr(err))
         return None
@@ -441,7 +428,8 @@ def get_acq_conf(filename, data, data_dim, conf, logger):
 
 def init_data(data, data_dim, conf, logger):
     """
-    declare size of the numpy arraies and initialiase it
+    declare the arraies in the data buffer and initialiase it. Time
+    dependant arrays grow while messages are read
     """
     # get missing values
     missing_int = conf["missing_int"]
@@ -449,53 +437,40 @@ def init_data(data, data_dim, conf, logger):
 
     # Dimension variables
     # -------------------------------------------------------------------------
-    data["time"] = np.ones((data_dim["time"],), dtype=np.dtype(dt.datetime)) * np.nan
+    data.add_column("time", np.dtype(dt.datetime), np.nan)
     data["cbh_layer"] = np.array([x + 1 for x in range(CBH_DIM)])
     # data["clh_layer"] = np.array([x + 1 for x in range(CLH_DIM)])
 
     # Time dependant variables
     # -------------------------------------------------------------------------
-    data["scale"] = np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    data["laser_temp"] = np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    data["laser_energy"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["bckgrd_rcs_0"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["window_transmission"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["tilt_angle"] = np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    data["integrated_rcs_0"] = (
-        np.ones((data_dim["time"],), dtype=np.float32) * missing_float
-    )
-    data["vertical_visibility"] = (
-        np.ones((data_dim["time"],), dtype=np.int32) * missing_int
-    )
-    data["alarm"] = np.ndarray((data_dim["time"],), dtype="S1")
-    data["info_flags"] = np.ndarray((data_dim["time"],), dtype="S12")
+    data.add_column("scale", np.float32, missing_float)
+    data.add_column("laser_temp", np.float32, missing_float)
+    data.add_column("laser_energy", np.float32, missing_float)
+    data.add_column("bckgrd_rcs_0", np.float32, missing_float)
+    data.add_column("window_transmission", np.float32, missing_float)
+    data.add_column("tilt_angle", np.float32, missing_float)
+    data.add_column("integrated_rcs_0", np.float32, missing_float)
+    data.add_column("vertical_visibility", np.int32, missing_int)
+    data.add_column("alarm", "S1", b"")
+    data.add_column("info_flags", "S12", b"")
 
     # Time, layer dependant variables
     # -------------------------------------------------------------------------
-    data["cbh"] = np.ones((data_dim["time"], CBH_DIM), dtype=np.int32) * missing_int
-    # data["clh"] = np.ones((data_dim["time"], CLH_DIM), dtype=np.int32) * missing_int
-    data["cloud_amount"] = (
-        np.ones((data_dim["time"], CLH_DIM), dtype=np.int16) * missing_int
-    )
+    data.add_column("cbh", np.int32, missing_int, (CBH_DIM,))
+    # data.add_column("clh", np.int32, missing_int, (CLH_DIM,))
+    data.add_column("cloud_amount", np.int16, missing_int, (CLH_DIM,))
 
     # Time, range dependent variables
     # -------------------------------------------------------------------------
-    data["rcs_0"] = (
-        np.ones((data_dim["time"], data_dim["range"]), dtype=np.float32) * missing_float
-    )
-    data["pr2"] = (
-        np.ones((data_dim["time"], data_dim["range"]), dtype=np.float32) * missing_float
-    )
+    # raw rcs lines are stored and decoded at once after all files are read.
+    # One extra byte per line allows to detect lines too long
+    n_lines = RCS_NB_LINES[data["msg_type"]]
+    data.add_column("rcs_raw", f"S{RCS_LINE_WIDTH + 1}", b"", (n_lines,))
+    data.add_column("rcs_0", np.float32, missing_float, (data_dim["range"],))
 
     # Special variable to store for each message the unit of CBH and CLH
     # -------------------------------------------------------------------------
-    data["are_unit_meter"] = np.ones((data_dim["time"],), dtype=bool)
+    data.add_column("are_unit_meter", bool, True)
     data["list_errors"] = {}
 
     return data
@@ -636,44 +611,82 @@ def read_cbh_vars(data, ind, msg, logger):
 
 def read_rcs_var(data, ind, msg, logger):
     """
-    read the rcs value in a data msg
+    store the lines of the rcs profile of a data msg. Profiles are decoded
+    by decode_rcs once all messages are read
     """
     # get line a of the message containing RCS based on CL31 conf
-    get_rcs_line_nb_in_msg(data["msg_type"])
-    # size of the profile to read
-    rcs_size = data["range"].size
-    # extract line containing rcs
+    line_to_read = get_rcs_line_nb_in_msg(data["msg_type"])
+    n_lines = RCS_NB_LINES[data["msg_type"]]
+    rcs_lines = msg[line_to_read : line_to_read + n_lines]
+
+    # incomplete or non ASCII messages are left empty and ignored when decoding
     try:
-        # rcs_line = msg[line_to_read]
-        # rcs_line = "".join(msg[4:])
-        rcs_line = ""
-        for line in msg[4:]:
-            rcs_line = rcs_line + line[3:]
-    except IndexError:
+        data["rcs_raw"][ind, : len(rcs_lines)] = rcs_lines
+    except UnicodeEncodeError:
         logger.error("Impossible to decode message. Profile is ignore")
-        return data
 
-    try:
-        tmp = [
-            rcs_line[
-                s * RCS_BYTES_SIZE : s * RCS_BYTES_SIZE
-                + RCS_BYTES_SIZE  # fmt: skip
-            ]
-            for s in range(rcs_size)
-        ]
-        tmp = np.array([int(g, 16) if g != "" else np.nan for g in tmp])
+    return data
 
-    except ValueError:
-        logger.error("Impossible to decode message. Profile is ignore")
-        return data
 
-    # Each sample is coded with a 20-bit HEX ASCII character set
+def get_rcs_line_offsets(n_lines):
+    """
+    expected offsets at the beginning of rcs lines as ASCII codes
+    """
+    offsets = [
+        f"{i * RCS_SAMPLES_PER_LINE:0{RCS_OFFSET_SIZE}d}" for i in range(n_lines)
+    ]
+
+    return np.frombuffer("".join(offsets).encode(), dtype=np.uint8).reshape(
+        n_lines, RCS_OFFSET_SIZE
+    )
+
+
+def decode_rcs(data, conf, logger):
+    """
+    decode all the rcs profiles read at once
+
+    The layout of the lines (offset prefix and width) is checked for all
+    the profiles. Profiles with a bad layout keep missing values
+    """
+    raw = data.pop("rcs_raw")
+    n_time, n_lines = raw.shape
+    rcs_size = data["range"].size
+
+    # ASCII codes of each line: (time, line, char)
+    chars = raw.view(np.uint8).reshape(n_time, n_lines, RCS_LINE_WIDTH + 1)
+
+    # check layout: offsets, width of lines and hexadecimal characters
+    valid = np.all(
+        chars[:, :, :RCS_OFFSET_SIZE] == get_rcs_line_offsets(n_lines), axis=(1, 2)
+    )
+    valid &= np.all(chars[:, :, RCS_LINE_WIDTH] == 0, axis=1)
+    nibbles = HEX_LUT[chars[:, :, RCS_OFFSET_SIZE:RCS_LINE_WIDTH]]
+    nibbles = nibbles.reshape(n_time, -1)[:, : rcs_size * RCS_BYTES_SIZE]
+    valid &= np.all(nibbles != INVALID_HEX, axis=1)
+
+    # messages read with a bad layout
+    n_invalid = np.count_nonzero(~valid & np.any(chars != 0, axis=(1, 2)))
+    if n_invalid > 0:
+        logger.error(
+            "Impossible to decode %d messages. Profiles are ignored", n_invalid
+        )
+
+    # Each sample is coded with a 16-bit HEX ASCII character set
     # msb nibble and bit first, 2's complement
-    corr_2s_needed = tmp > 2**15
-    if any(corr_2s_needed):
-        tmp[corr_2s_needed] = -(2**16 - tmp[corr_2s_needed])
+    nibbles = nibbles[valid].reshape(-1, rcs_size, RCS_BYTES_SIZE).astype(np.int32)
+    samples = (
+        (nibbles[:, :, 0] << 12)
+        | (nibbles[:, :, 1] << 8)
+        | (nibbles[:, :, 2] << 4)
+        | nibbles[:, :, 3]
+    )
+    samples = np.where(samples > 2**15, samples - 2**16, samples)
+
+    data["rcs_0"][valid] = samples.astype(np.float32) * 10
 
-    data["rcs_0"][ind][:] = np.array(tmp, dtype=np.float32) * 10
+    # void profiles with wrong scale
+    if conf["check_scale"]:
+        data["rcs_0"][data["scale"] != OK_SCALE_VALUE] = conf["missing_float"]
 
     return data
 
@@ -685,6 +698,8 @@ def read_vars(lines, data, conf, time_ind, f_name, logger):
     n_lines = len(lines)
     i_line = 0
     msg_n_lines = get_msg_nb_lines(data["msg_type"])
+    window = conf.get(time_window.TIME_WINDOW_KEY)
+    first_ind = time_ind
 
     # loop over the lines
     while i_line < n_lines:
@@ -695,15 +710,20 @@ def read_vars(lines, data, conf, time_ind, f_name, logger):
 
         # Try finding line with time stamp
         try:
-            data["time"][time_ind] = dt.datetime.strptime(lines[i_line], FMT_DATE)
+            msg_time = dt.datetime.strptime(lines[i_line], FMT_DATE)
         except ValueError:
             i_line += 1
             continue
 
-        logger.debug("timestamp: {:%Y%m%d %H:%M:%S}".format(data["time"][time_ind]))
+        # skip decoding of messages outside of the time window
+        if not time_window.is_in_window(msg_time, window):
+            i_line += 1
+            continue
+
+        data.reserve(time_ind + 1)
+        data["time"][time_ind] = msg_time
 
         msg = lines[i_line: i_line + msg_n_lines]  # fmt: skip
-        logger.debug("processing data message %d" % (time_ind + 1))
 
         # check if there is no change in message number
         cur_msg_type = get_msg_type(get_conf_msg(msg[1], logger), f_name, logger)
@@ -717,15 +737,12 @@ def read_vars(lines, data, conf, time_ind, f_name, logger):
             continue
 
         # read time only dependent variables
-        logger.debug("reading time only dependent variables")
         data = read_time_dep_vars(data, time_ind, msg, data["msg_type"], logger)
 
         # read CBH
-        logger.debug("reading cbh/clh")
         data = read_cbh_vars(data, time_ind, msg, logger)
 
         # read rcs
-        logger.debug("reading rcs")
         data = read_rcs_var(data, time_ind, msg, logger)
 
         # check scale value if needed
@@ -736,6 +753,9 @@ def read_vars(lines, data, conf, time_ind, f_name, logger):
         i_line += 1
         time_ind += 1
 
+    # one summary per file instead of messages for each data message
+    logger.debug("%d data messages read in %s", time_ind - first_ind, f_name)
+
     return time_ind, data
 
 
@@ -764,10 +784,9 @@ def read_data(list_files, conf, logger):
 
     # analyse file to read to determine the size of the time variable
     # -------------------------------------------------------------------------
-    data = {}
+    # the number of data messages is not known before reading all the files
+    data = column_buffer.ColumnBuffer()
     data_dim = {}
-    logger.info("analysing input files to get the configuration")
-    data_dim["time"] = count_msg_to_read(list_files, conf, logger)
 
     # Get range and vertical resolution from first file
     logger.info("analyzing first file to determine acquisition configuration")
@@ -781,9 +800,12 @@ def read_data(list_files, conf, logger):
     logger.info("reading files")
     time_ind = 0
     nb_files_read = 0
-    for ifile in list_files:
-        # try reading the file
-        lines = get_file_lines(ifile, conf, logger)
+    # next file is read while the current one is decoded
+    for ifile, lines in file_io.iter_prefetched(
+        list_files,
+        lambda f: get_file_lines(f, conf, logger),
+        file_io.get_prefetch_depth(conf),
+    ):
         if lines is None:
             logger.warning("102 No data found in the file '%s' trying next file", ifile)
             continue
@@ -793,6 +815,9 @@ def read_data(list_files, conf, logger):
         # reading data in the file
         time_ind, data = read_vars(lines, data, conf, time_ind, ifile, logger)
 
+    logger.info("%d data messages read", time_ind)
+    data = data.finalize(time_ind)
+
     # add start_time and time resolution variable
     # ------------------------------------------------------------------------
     data["time_resolution"] = conf["time_resol"]
@@ -800,7 +825,16 @@ def read_data(list_files, conf, logger):
 
     # Final calculation on whole profiles
     # -------------------------------------------------------------------------
-    data["pr2"] = data["rcs_0"] * RCS_FACTOR * data["range"] ** 2
+    logger.info("decoding rcs profiles")
+    data = decode_rcs(data, conf, logger)
+    # Pr² is only computed if it is written in the output file
+    if projection.is_required(projection.get_required(conf), "pr2"):
+        data["pr2"] = range_correction.range_correct(
+            data["rcs_0"],
+            data["range"],
+            RCS_FACTOR,
+            projection.get_dtype(conf, "pr2", range_correction.DEFAULT_DTYPE),
+        )
 
     # Summary of instrument message
     # ------------------------------------------------------------------------
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from tools.allocation import Allocator
+
+
+class TestAllocator(unittest.TestCase):
+    def test_count(self):
+        alloc = Allocator()
+
+        values = alloc.full((10, 4), -999.0, np.float32)
+        flags = alloc.full(10, -9, np.int8)
+        alloc.empty(5, np.float64)
+
+        self.assertEqual(values.dtype, np.float32)
+        self.assertTrue(np.all(values == -999.0))
+        self.assertTrue(np.all(flags == -9))
+        self.assertEqual(alloc.n_arrays, 3)
+        self.assertEqual(alloc.nbytes, 10 * 4 * 4 + 10 + 5 * 8)
+
+    def test_fill_value_out_of_range(self):
+        alloc = Allocator()
+
+        with self.assertRaises(ValueError):
+            alloc.full(3, -999, np.int8)
+        self.assertEqual(alloc.n_arrays, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+import logging
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import tools.ancillary_cache as ac
+from tools.read_overlap import parse_overlap, read_overlap
+
+OVERLAP_FILE = "test/input/jenoptik_chm15k/lufft_chm15k_nimbus_overlap_sirta.txt"
+
+
+class TestAncillaryCache(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("dummy")
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.old_env = os.environ.get(ac.CACHE_DIR_ENV)
+        os.environ[ac.CACHE_DIR_ENV] = self.cache_dir.name
+        ac.clear_memory()
+
+    def tearDown(self):
+        if self.old_env is None:
+            del os.environ[ac.CACHE_DIR_ENV]
+        else:
+            os.environ[ac.CACHE_DIR_ENV] = self.old_env
+        ac.clear_memory()
+        self.cache_dir.cleanup()
+
+    def test_same_values_as_parser(self):
+        ref = parse_overlap(OVERLAP_FILE, self.logger)
+        np.testing.assert_array_equal(read_overlap(OVERLAP_FILE, self.logger), ref)
+
+    def test_npy_file_reused(self):
+        read_overlap(OVERLAP_FILE, self.logger)
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 1)
+
+        # a new process only has the file on disk
+        ac.clear_memory()
+        calls = []
+
+        def parser(fname, logger):
+            calls.append(fname)
+            return parse_overlap(fname, logger)
+
+        parser.__qualname__ = "parse_overlap"
+        parser.__module__ = parse_overlap.__module__
+        ac.load(OVERLAP_FILE, parser, self.logger)
+
+        self.assertEqual(calls, [])
+
+    def test_memoization(self):
+        first = read_overlap(OVERLAP_FILE, self.logger)
+        second = read_overlap(OVERLAP_FILE, self.logger)
+
+        self.assertIs(first, second)
+        self.assertFalse(first.flags.writeable)
+
+    def test_mtime_invalidates_cache(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f_id:
+            f_id.write("15 0.1\n30 0.5\n")
+        self.addCleanup(os.remove, f_id.name)
+
+        np.testing.assert_allclose(read_overlap(f_id.name, self.logger), [0.1, 0.5])
+
+        with open(f_id.name, "w") as f_upd:
+            f_upd.write("15 0.2\n30 0.6\n45 1.0\n")
+        stat = os.stat(f_id.name)
+        os.utime(f_id.name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        np.testing.assert_allclose(
+            read_overlap(f_id.name, self.logger), [0.2, 0.6, 1.0]
+        )
+
+    def test_missing_file(self):
+        self.assertRaises(OSError, read_overlap, "not_a_file.txt", self.logger)
+
+
+if __name__ == "__main__":
+    unittest.main()
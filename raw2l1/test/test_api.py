@@ -0,0 +1,88 @@
+"""Test of the library functions of raw2l1."""
+
+import configparser
+import datetime as dt
+import subprocess
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+import xarray as xr
+
+import raw2l1
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+TEST_DIR = MAIN_DIR / "test"
+TEST_IN_DIR = TEST_DIR / "input" / "vaisala_cl61"
+CONF_FILE = TEST_IN_DIR / "conf" / "conf_vaisala_cl61_eprofile.ini"
+PRGM = MAIN_DIR / "raw2l1.py"
+
+DATE = dt.date(2022, 9, 12)
+INPUT_FILES = sorted(TEST_IN_DIR.glob("T3250605*.nc"))
+
+
+def test_read():
+    """The data read are returned without writing any file."""
+    data = raw2l1.read(CONF_FILE, INPUT_FILES, DATE)
+
+    assert len(data["time"]) > 0
+    assert data["rcs_0"].shape[0] == len(data["time"])
+
+
+def test_to_dataset_same_as_cli(tmp_path):
+    """The dataset in memory is the one written by the command line."""
+    out_file = tmp_path / "cli.nc"
+    subprocess.check_call(
+        [
+            PRGM,
+            DATE.strftime("%Y%m%d"),
+            CONF_FILE,
+            TEST_IN_DIR / "T3250605*.nc",
+            out_file,
+        ]
+    )
+
+    # configuration given as a dictionnary
+    conf = configparser.RawConfigParser()
+    conf.optionxform = str
+    conf.read(CONF_FILE)
+    conf_dict = {section: dict(conf.items(section)) for section in conf.sections()}
+
+    dataset = raw2l1.to_dataset(conf_dict, INPUT_FILES, DATE)
+    with xr.open_dataset(out_file) as ref:
+        for ds in [dataset, ref]:
+            ds.attrs.pop("history", None)
+        xr.testing.assert_identical(dataset, ref)
+
+    with raw2l1.to_dataset(CONF_FILE, INPUT_FILES, DATE, engine="netcdf4") as nc_id:
+        with nc.Dataset(out_file) as ref:
+            assert set(nc_id.variables) == set(ref.variables)
+            np.testing.assert_array_equal(nc_id["time"][:], ref["time"][:])
+
+    assert not (MAIN_DIR / raw2l1.MEMORY_OUTPUT).exists()
+
+
+def test_errors_raised():
+    """Errors raise exceptions instead of quitting."""
+    with pytest.raises(raw2l1.Raw2l1Error, match="102"):
+        raw2l1.read(CONF_FILE, [], DATE)
+
+    with pytest.raises(raw2l1.Raw2l1Error, match="107"):
+        raw2l1.read(CONF_FILE.with_name("missing.ini"), INPUT_FILES, DATE)
+
+    # reader which does not exist
+    with pytest.raises(raw2l1.Raw2l1Error, match="107 unable to load"):
+        raw2l1.read(
+            {
+                "conf": {
+                    "reader_dir": "reader",
+                    "reader": "no_reader",
+                    "netcdf_format": "NETCDF4",
+                },
+                "reader_conf": {},
+                "global": {},
+            },
+            INPUT_FILES,
+            DATE,
+        )
@@ -51,10 +51,21 @@ class TestArgParser(unittest.TestCase):
             "log_level": "info",
             "log": "logs/raw2l1.log",
             "verbose": "info",
+            "log_async": False,
+            "products": [],
+            "outputs": [],
+            "log_queue_size": 10_000,
             "input_min_size": 0,
             "input_check_time": False,
             "input_max_age": dt.timedelta(hours=2),
             "filter_day": False,
+            "split_minutes": 0,
+            "input_patterns": ["test/input/rpg_hatpro/hatpro_0a_z1Imwrad-TPB_v01_*.nc"],
+            "input_date_filter": None,
+            "watch": False,
+            "watch_interval": 10,
+            "watch_settle_time": 10,
+            "watch_grace": dt.timedelta(hours=1),
         }
 
         inputs = ag.get_input_args(argv)
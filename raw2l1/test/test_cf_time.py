@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+import datetime as dt
+import unittest
+
+import netCDF4 as nc
+import numpy as np
+
+import tools.cf_time as cf_time
+
+UNITS = [
+    "seconds since 1970-01-01 00:00:00",
+    "days since 1970-01-01",
+    "hours since 2001-01-01T00:00:00Z",
+    "milliseconds since 2001-01-01 00:00:00",
+    "minutes since 2000-1-1 12:30",
+]
+
+
+def cftime_num2date(values, units, calendar="standard"):
+    dates = nc.num2date(values, units, calendar, only_use_cftime_datetimes=False)
+    return np.array(dates, dtype="datetime64[us]")
+
+
+class TestCFTime(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = [
+            rng.uniform(0, 1e5, 10_000),
+            rng.uniform(0, 1e5, 10_000).astype("f4"),
+            rng.integers(0, 100_000, 10_000),
+        ]
+
+    def test_parse_units(self):
+        factor, epoch = cf_time.parse_units("sec since 2001-01-01 00:00:00.5")
+
+        self.assertEqual(factor, 1_000_000)
+        self.assertEqual(epoch, np.datetime64("2001-01-01T00:00:00.500000"))
+        self.assertIsNone(cf_time.parse_units("months since 2001-01-01"))
+        self.assertIsNone(cf_time.parse_units("days since 2001-01-01", "noleap"))
+        self.assertIsNone(cf_time.parse_units("days since 1500-01-01"))
+
+    def test_num2date_same_as_cftime(self):
+        for units in UNITS:
+            for values in self.values:
+                np.testing.assert_array_equal(
+                    cf_time.num2date(values, units), cftime_num2date(values, units)
+                )
+
+    def test_date2num_same_as_cftime(self):
+        for units in UNITS:
+            for values in self.values:
+                dates = cf_time.num2date(values, units)
+                ref = nc.date2num(dates.astype(object), units)
+
+                for dates_in in [dates, dates.astype(object), list(dates)]:
+                    result = cf_time.date2num(dates_in, units)
+                    self.assertEqual(result.dtype, ref.dtype)
+                    np.testing.assert_array_equal(result, ref)
+
+    def test_fallback(self):
+        units = "days since 2000-01-01"
+        dates = [dt.datetime(2000, 1, 2)]
+
+        self.assertEqual(cf_time.date2num(dates, units, "noleap"), [1])
+        # julian dates of the standard calendar
+        old_dates = [dt.datetime(1500, 1, 1)]
+        self.assertEqual(
+            cf_time.date2num(old_dates, units),
+            nc.date2num(old_dates, units, calendar="standard"),
+        )
+        self.assertEqual(
+            list(cf_time.num2date(np.ma.masked_array([1, 2], [0, 1]), units)),
+            [dt.datetime(2000, 1, 2), np.ma.masked],
+        )
+
+    def test_to_datetime64(self):
+        dates = np.array([dt.datetime(2020, 1, 1, 0, 0, 0, 1), None])
+
+        self.assertEqual(
+            cf_time.to_datetime64(dates[:1])[0],
+            np.datetime64("2020-01-01T00:00:00.000001"),
+        )
+        self.assertIsNone(cf_time.to_datetime64(dates))
+
+    def test_components(self):
+        dates = cf_time.num2date(self.values[2], "minutes since 2016-01-01")
+        ref = [d.astype(object) for d in dates]
+
+        fields = cf_time.to_components(dates)
+        for field in ["year", "month", "day", "hour", "minute", "second"]:
+            self.assertEqual(list(fields[field]), [getattr(d, field) for d in ref])
+
+        # float fields are truncated
+        float_fields = [fields[field].astype("f4") for field in list(fields)[:5]]
+        float_fields.append(fields["second"] + 0.9)
+        np.testing.assert_array_equal(cf_time.from_components(*float_fields), dates)
+
+    def test_components_out_of_range(self):
+        with self.assertRaises(ValueError):
+            cf_time.from_components([2021], [2], [29])
+        with self.assertRaises(ValueError):
+            cf_time.from_components([2021], [1], [1], [24])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from tools.column_buffer import ColumnBuffer
+
+
+class TestColumnBuffer(unittest.TestCase):
+    def test_grow_and_finalize(self):
+        data = ColumnBuffer(capacity=2)
+        data["range"] = np.arange(3)
+        data.add_column("cbh", np.int32, -9, (2,))
+        data.add_column("flag", "S1", b"")
+
+        for ind in range(5):
+            data.reserve(ind + 1)
+            data["cbh"][ind, 0] = ind
+            data["flag"][ind] = b"a"
+
+        self.assertEqual(data.capacity, 8)
+
+        result = data.finalize(5)
+
+        self.assertIsInstance(result, dict)
+        np.testing.assert_array_equal(result["range"], np.arange(3))
+        np.testing.assert_array_equal(result["cbh"][:, 0], np.arange(5))
+        np.testing.assert_array_equal(result["cbh"][:, 1], -9)
+        self.assertEqual(result["cbh"].dtype, np.int32)
+        self.assertEqual(list(result["flag"]), [b"a"] * 5)
+        self.assertTrue(result["cbh"].flags.c_contiguous)
+
+    def test_finalize_missing_rows(self):
+        data = ColumnBuffer(capacity=1)
+        data.add_column("rcs", np.float32, np.nan, (4,))
+
+        result = data.finalize(3)
+
+        self.assertEqual(result["rcs"].shape, (3, 4))
+        self.assertTrue(np.all(np.isnan(result["rcs"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
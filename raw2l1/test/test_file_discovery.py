@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+import datetime as dt
+import glob
+import os
+import tempfile
+import unittest
+
+import tools.arg_parser as ag
+import tools.file_discovery as fd
+
+NAMES = [
+    "cl31_0a_z1R10mF30s_v01_20200830_000009_1440.asc",
+    "cl31_0a_z1R10mF30s_v01_20200831_000009_1440.asc",
+    "cl31_0a_z1R10mF30s_v01_20200901_000009_1440.asc",
+    "cl31_0a_z1R10mF30s_v01_20200905_000009_1440.asc",
+    "cl31_0a_z1R10mF30s_v01_99999999_000009_1440.asc",
+    "cl31_readme.asc",
+    ".cl31_hidden.asc",
+]
+
+
+class TestFileDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        for ind, name in enumerate(NAMES):
+            with open(os.path.join(self.tmp_dir.name, name), "w") as file_id:
+                file_id.write("x" * ind)
+        os.mkdir(os.path.join(self.tmp_dir.name, "cl31_dir.asc"))
+        self.pattern = os.path.join(self.tmp_dir.name, "cl31*.asc")
+
+    def test_same_as_glob(self):
+        for pattern in [self.pattern, os.path.join(self.tmp_dir.name, "*")]:
+            list_files = fd.find_files(pattern)
+
+            ref = sorted(f for f in glob.glob(pattern) if os.path.isfile(f))
+            self.assertEqual([f for f, _ in list_files], ref)
+            self.assertEqual(
+                [s for _, s in list_files], [os.path.getsize(f) for f in ref]
+            )
+
+        self.assertEqual(fd.find_files(os.path.join(self.tmp_dir.name, "no*.asc")), [])
+
+    def test_date_filter(self):
+        date_filter = fd.DateFilter("%Y%m%d", dt.datetime(2020, 8, 31))
+
+        list_files = fd.find_files(self.pattern, date_filter)
+
+        # files without date are kept
+        self.assertEqual(
+            [os.path.basename(f) for f, _ in list_files],
+            sorted(NAMES[:3] + NAMES[4:6]),
+        )
+
+        date_filter = fd.DateFilter(
+            "v01_%Y%m%d_%H%M%S", dt.datetime(2020, 8, 31), dt.timedelta(0)
+        )
+        self.assertTrue(date_filter(NAMES[1]))
+        self.assertFalse(date_filter(NAMES[0]))
+        self.assertFalse(date_filter(NAMES[2]))
+
+    def test_wrong_date_format(self):
+        with self.assertRaises(ValueError):
+            fd.DateFilter("%Y%B", dt.datetime(2020, 8, 31))
+
+    def test_index(self):
+        index_file = os.path.join(self.tmp_dir.name, "index.json")
+        index = fd.load_index(index_file)
+        self.assertEqual(index, {})
+
+        # directory too recent to be indexed
+        ref = fd.find_files(self.pattern, index=index)
+        self.assertEqual(index, {})
+
+        mtime_ns = os.stat(self.tmp_dir.name).st_mtime_ns - 10 * fd.INDEX_MIN_AGE
+        os.utime(self.tmp_dir.name, ns=(mtime_ns, mtime_ns))
+        self.assertEqual(fd.find_files(self.pattern, index=index), ref)
+        fd.save_index(index_file, index)
+
+        index = fd.load_index(index_file)
+        listing = index[os.path.abspath(self.tmp_dir.name)]
+        self.assertEqual(listing["mtime_ns"], mtime_ns)
+        self.assertNotIn("cl31_dir.asc", listing["names"])
+        self.assertEqual(fd.find_files(self.pattern, index=index), ref)
+
+        # directory modified: listed again
+        os.remove(os.path.join(self.tmp_dir.name, NAMES[0]))
+        self.assertEqual(fd.find_files(self.pattern, index=index), ref[1:])
+
+    def test_input_args(self):
+        argv = [
+            "20200831",
+            "test/conf/conf_dummy.ini",
+            self.pattern,
+            "test/output/dummy.nc",
+            "-input_date_format",
+            "%Y%m%d",
+            "-input_date_margin",
+            "0",
+            "-file_min_size",
+            "0",
+        ]
+
+        input_args = ag.get_input_args(argv)
+
+        self.assertEqual(
+            [os.path.basename(f) for f in input_args["input"]],
+            [NAMES[1], NAMES[4], NAMES[5]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+import bz2
+import gzip
+import logging
+import lzma
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+import netCDF4
+
+import tools.file_io as fio
+
+MAIN_DIR = os.path.dirname(os.path.dirname(__file__)) + os.sep
+TEST_DIR = os.path.join(MAIN_DIR, "test")
+CONF_DIR = os.path.join(TEST_DIR, "conf")
+TEST_IN_DIR = os.path.join(TEST_DIR, "input")
+TEST_OUT_DIR = os.path.join(TEST_DIR, "output")
+PRGM = "raw2l1.py"
+
+CS135_FILE = os.path.join(
+    TEST_IN_DIR, "campbell_cs135", "cs135-20150213-message006.txt"
+)
+CONTENT = "line 1\nline 2\n"
+
+
+class TestFileIO(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("dummy")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.addCleanup(fio.close_archives)
+
+    def tmp_file(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_compressed_files(self):
+        for ext, open_fcn in [
+            (".gz", gzip.open),
+            (".bz2", bz2.open),
+            (".xz", lzma.open),
+        ]:
+            fname = self.tmp_file("data.txt" + ext)
+            with open_fcn(fname, "wt") as f_id:
+                f_id.write(CONTENT)
+
+            with fio.open_file(fname, encoding="utf8") as f_id:
+                self.assertEqual(f_id.readlines(), ["line 1\n", "line 2\n"], ext)
+
+    def test_plain_file(self):
+        fname = self.tmp_file("data.txt")
+        with open(fname, "w") as f_id:
+            f_id.write(CONTENT)
+
+        self.assertEqual(fio.read_bytes(fname), CONTENT.encode())
+
+    def test_tar_members(self):
+        fname = self.tmp_file("data.tar.gz")
+        with tarfile.open(fname, "w:gz") as tar:
+            for member in ["b.txt", "a.txt"]:
+                path = self.tmp_file(member)
+                with open(path, "w") as f_id:
+                    f_id.write(member)
+                tar.add(path, arcname=member)
+
+        list_files = fio.expand_archives([fname], self.logger)
+        self.assertEqual(list_files, [fname + "::a.txt", fname + "::b.txt"])
+
+        with fio.open_file(list_files[1], encoding="utf8") as f_id:
+            self.assertEqual(f_id.read(), "b.txt")
+
+    def test_zip_members(self):
+        fname = self.tmp_file("data.zip")
+        with zipfile.ZipFile(fname, "w") as arch:
+            arch.writestr("dir/a.txt.gz", gzip.compress(CONTENT.encode()))
+
+        list_files = fio.expand_archives([fname], self.logger)
+        self.assertEqual(list_files, [fname + "::dir/a.txt.gz"])
+        self.assertEqual(fio.read_bytes(list_files[0]), CONTENT.encode())
+
+    def test_missing_member(self):
+        fname = self.tmp_file("data.zip")
+        with zipfile.ZipFile(fname, "w") as arch:
+            arch.writestr("a.txt", CONTENT)
+
+        self.assertRaises(OSError, fio.open_file, fname + "::b.txt")
+
+    def test_prefetch_keep_order(self):
+        list_files = [str(i) for i in range(5)]
+
+        result = list(fio.iter_prefetched(list_files, lambda f: int(f) * 2))
+
+        self.assertEqual(result, [(str(i), i * 2) for i in range(5)])
+
+        for depth in [0, 1, 4, 10]:
+            result = list(fio.iter_prefetched(list_files, lambda f: int(f), depth))
+            self.assertEqual(result, [(str(i), i) for i in range(5)], depth)
+
+    def test_prefetch_depth(self):
+        self.assertEqual(fio.get_prefetch_depth({}), fio.DEFAULT_PREFETCH_DEPTH)
+        self.assertEqual(fio.get_prefetch_depth({fio.PREFETCH_KEY: "0"}), 0)
+        # partial reading: opt-in
+        self.assertEqual(fio.get_prefetch_depth({}, partial=True), 0)
+        self.assertEqual(fio.get_prefetch_depth({fio.PREFETCH_KEY: "3"}, True), 3)
+
+    def test_netcdf_from_memory(self):
+        fname = self.tmp_file("data.nc")
+        with netCDF4.Dataset(fname, "w") as nc_id:
+            nc_id.createDimension("time", 3)
+            nc_id.createVariable("time", "f8", ("time",))[:] = [1, 2, 3]
+
+        content = fio.load_content(fname)
+        self.assertIsNone(fio.load_content(self.tmp_file("missing.nc")))
+
+        for data in [content, None]:
+            with fio.open_netcdf(fname, data) as nc_id:
+                self.assertEqual(list(nc_id["time"][:]), [1, 2, 3])
+
+
+class TestCompressedInput(unittest.TestCase):
+    conf_file = os.path.join(CONF_DIR, "conf_campbell_cs135_eprofile.ini")
+
+    def test_cs135_gzip_in_tar(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            gz_file = os.path.join(tmp_dir, os.path.basename(CS135_FILE) + ".gz")
+            with open(CS135_FILE, "rb") as f_in, gzip.open(gz_file, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            tar_file = os.path.join(tmp_dir, "cs135.tar")
+            with tarfile.open(tar_file, "w") as tar:
+                tar.add(gz_file, arcname=os.path.basename(gz_file))
+
+            resp = subprocess.check_call(
+                [
+                    os.path.join(MAIN_DIR, PRGM),
+                    "20150213",
+                    self.conf_file,
+                    tar_file,
+                    os.path.join(TEST_OUT_DIR, "test_cs135_tar_20150213.nc"),
+                    "-log_level",
+                    "debug",
+                ]
+            )
+
+        self.assertEqual(resp, 0, "CS135 gzip file in tar archive")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 
+import logging
+import logging.handlers
 import os
 import subprocess
+import tempfile
 import unittest
 
+from tools import log
+
 MAIN_DIR = os.path.dirname(os.path.dirname(__file__)) + os.sep
 CONF_DIR = MAIN_DIR + "conf" + os.sep
 TEST_DIR = MAIN_DIR + "test" + os.sep
@@ -36,3 +41,67 @@ class TestLogs(unittest.TestCase):
         )
 
         self.assertEqual(resp, 0)
+
+    def test_root_level_from_handlers(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+
+        def restore():
+            for handler in root.handlers:
+                handler.close()
+            root.handlers = handlers
+            root.setLevel(level)
+
+        self.addCleanup(restore)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            opt = {
+                "log": os.path.join(tmp_dir, "raw2l1.log"),
+                "log_level": "warning",
+                "verbose": "info",
+            }
+            logger = log.init(opt, "test")
+
+            # debug records are not created when no handler uses them
+            self.assertEqual(root.level, logging.INFO)
+            self.assertFalse(logger.isEnabledFor(logging.DEBUG))
+
+    def test_async_log(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+
+        def restore():
+            for handler in root.handlers:
+                handler.close()
+            root.handlers = handlers
+            root.setLevel(level)
+
+        self.addCleanup(restore)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            opt = {
+                "log": os.path.join(tmp_dir, "raw2l1.log"),
+                "log_level": "debug",
+                "verbose": "critical",
+                "log_async": True,
+                "log_queue_size": 10,
+            }
+            logger = log.init(opt, "test")
+            listener = root.handlers[0].listener
+            self.addCleanup(listener.stop)
+
+            for i in range(100):
+                logger.debug("message %d", i)
+            logger.error("102 No usable data in %s", "file.DAT")
+            listener.stop()
+
+            with open(opt["log"]) as f_log:
+                lines = f_log.read().splitlines()
+
+        self.assertIsInstance(root.handlers[0], logging.handlers.QueueHandler)
+        self.assertEqual(len(lines), 102)
+        self.assertTrue(lines[0].endswith(" - test - DEBUG - asynchronous logging"))
+        self.assertTrue(lines[1].endswith(" - test - DEBUG - message 0"))
+        self.assertTrue(
+            lines[-1].endswith(" - test - ERROR - 102 No usable data in file.DAT")
+        )
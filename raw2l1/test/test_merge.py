@@ -0,0 +1,153 @@
+"""Test of the merge of raw2l1 output files."""
+
+import configparser
+import logging
+import shutil
+import subprocess
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+
+import tools.merge as merge
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+TEST_DIR = MAIN_DIR / "test"
+TEST_IN_DIR = TEST_DIR / "input" / "vaisala_cl61"
+CONF_FILE = TEST_IN_DIR / "conf" / "conf_vaisala_cl61_eprofile.ini"
+PRGM = MAIN_DIR / "raw2l1.py"
+MERGE_PRGM = MAIN_DIR / "merge_l1.py"
+
+DATE = "20220912"
+INPUT_FILES = TEST_IN_DIR / "T3250605*.nc"
+
+
+def test_time_order():
+    """Time steps sorted, first file kept for duplicates."""
+    list_times = [np.array([3.0, 4.0, 5.0]), np.array([1.0, 2.0, 3.0])]
+
+    file_index, time_index = merge.get_time_order(list_times)
+
+    np.testing.assert_array_equal(file_index, [1, 1, 0, 0, 0])
+    np.testing.assert_array_equal(time_index, [0, 1, 0, 1, 2])
+
+
+def test_merge_split_files(tmp_path):
+    """Files of 10 minutes merged into the file of the day."""
+    day_file = tmp_path / "day.nc"
+    subprocess.check_call([PRGM, DATE, CONF_FILE, INPUT_FILES, day_file])
+
+    split_dir = tmp_path / "split"
+    split_dir.mkdir()
+    subprocess.check_call(
+        [
+            PRGM,
+            DATE,
+            CONF_FILE,
+            INPUT_FILES,
+            split_dir / "cl61.nc",
+            "-split_minutes",
+            "10",
+        ]
+    )
+    split_files = sorted(split_dir.glob("*.nc"))
+    # overlapping files
+    shutil.copy(split_files[1], split_dir / "a_copy.nc")
+
+    merged_file = tmp_path / "merged.nc"
+    resp = subprocess.check_call(
+        [MERGE_PRGM, CONF_FILE, split_dir / "*.nc", merged_file, "-block_size", "7"]
+    )
+    assert resp == 0
+
+    with nc.Dataset(day_file) as day, nc.Dataset(merged_file) as merged:
+        assert merged.dimensions["time"].isunlimited()
+        assert set(merged.variables) == set(day.variables)
+        for var in day.variables:
+            np.testing.assert_array_equal(
+                np.ma.getdata(merged.variables[var][:]),
+                np.ma.getdata(day.variables[var][:]),
+            )
+        assert merged.title == day.title
+
+
+def test_merge_packed_files(tmp_path):
+    """Files packed with different scale_factor and add_offset merged."""
+    conf = configparser.RawConfigParser()
+    conf.optionxform = str
+    conf.read(CONF_FILE)
+    # packing computed from the data of each file
+    conf.set("temperature_laser", "pack_type", "$short$")
+    conf.set("temperature_laser", "pack_precision", "1e-7")
+    conf_file = tmp_path / "conf_packed.ini"
+    with open(conf_file, "w") as f_id:
+        conf.write(f_id)
+
+    day_file = tmp_path / "day.nc"
+    subprocess.check_call([PRGM, DATE, CONF_FILE, INPUT_FILES, day_file])
+    split_dir = tmp_path / "split"
+    split_dir.mkdir()
+    subprocess.check_call(
+        [
+            PRGM,
+            DATE,
+            conf_file,
+            INPUT_FILES,
+            split_dir / "cl61.nc",
+            "-split_minutes",
+            "10",
+        ]
+    )
+
+    merged_file = tmp_path / "merged.nc"
+    subprocess.check_call([MERGE_PRGM, conf_file, split_dir / "*.nc", merged_file])
+
+    with nc.Dataset(day_file) as day, nc.Dataset(merged_file) as merged:
+        merged_var = merged.variables["temperature_laser"]
+        assert merged_var.dtype == np.int16
+        values = merged_var[:]
+        assert np.ma.count_masked(values) == 0
+        np.testing.assert_array_less(
+            np.abs(values - day.variables["temperature_laser"][:]),
+            merged_var.scale_factor,
+        )
+
+
+def test_value_range(tmp_path):
+    """Range of the values read by blocks of time steps."""
+    values = np.ma.masked_invalid([[1.0, np.nan], [-3.0, 2.0], [5.0, 0.0]])
+    with nc.Dataset(tmp_path / "range.nc", "w") as nc_id:
+        nc_id.createDimension("time", None)
+        nc_id.createDimension("range", 2)
+        nc_var = nc_id.createVariable("rcs_0", "f8", ("time", "range"))
+        nc_var[:] = values
+
+        assert merge.get_value_range(nc_var, "time", 2) == (-3.0, 5.0)
+        assert merge.get_value_range(nc_var, "other", 2) == (-3.0, 5.0)
+
+
+def test_skip_other_files(tmp_path):
+    """Files with another structure are not merged."""
+    logger = logging.getLogger("dummy")
+    conf = configparser.RawConfigParser()
+    conf.optionxform = str
+    conf.read(CONF_FILE)
+    conf.set("conf", "conf", str(CONF_FILE))
+    conf.set("conf", "version", "test")
+
+    day_file = tmp_path / "day.nc"
+    subprocess.check_call([PRGM, DATE, CONF_FILE, INPUT_FILES, day_file])
+    other_file = tmp_path / "other.nc"
+    with nc.Dataset(other_file, "w") as nc_id:
+        nc_id.createDimension("time", None)
+        nc_id.createVariable("time", "f8", ("time",))[:] = [0.0]
+
+    n_time = merge.merge_files(
+        conf,
+        [str(day_file), str(other_file), str(tmp_path / "missing.nc")],
+        str(tmp_path / "merged.nc"),
+        logger,
+    )
+
+    with nc.Dataset(day_file) as day:
+        assert n_time == len(day.dimensions["time"])
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+
+import configparser
+import logging
+import os
+import tempfile
+import unittest
+
+import netCDF4 as nc
+import numpy as np
+
+import tools.create_netcdf as cnc
+
+
+def get_conf(conf_opts, var_opts=None):
+    """configuration with storage options for a rcs_0 variable"""
+
+    conf = configparser.RawConfigParser()
+    conf.read_dict(
+        {
+            "conf": {"conf": "test.ini", **conf_opts},
+            "rcs_0": {"dim": "time, range", "type": "$float$", **(var_opts or {})},
+        }
+    )
+
+    return conf
+
+
+class TestNC4Storage(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("dummy")
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.nc_id = nc.Dataset(os.path.join(tmp_dir.name, "test.nc"), "w")
+        self.addCleanup(self.nc_id.close)
+        self.nc_id.createDimension("time", None)
+        self.nc_id.createDimension("range", 1000)
+
+    def get_storage(self, conf):
+        return cnc.get_storage_options(
+            conf, "rcs_0", np.float32, self.nc_id, self.logger
+        )
+
+    def test_no_compression(self):
+        storage = self.get_storage(get_conf({"netcdf4_compression": "false"}))
+
+        self.assertEqual(storage, {})
+
+    def test_variable_overrides_conf(self):
+        conf = get_conf(
+            {
+                "netcdf4_compression": "true",
+                "netcdf4_compression_level": "1",
+                "netcdf4_chunks": "time: 60, range: 512",
+            },
+            {"netcdf4_compression_level": "6", "netcdf4_shuffle": "false"},
+        )
+
+        storage = self.get_storage(conf)
+
+        self.assertEqual(storage["compression"], "zlib")
+        self.assertEqual(storage["complevel"], 6)
+        self.assertFalse(storage["shuffle"])
+        self.assertEqual(storage["chunksizes"], [60, 512])
+
+    def test_chunksizes(self):
+        chunks = cnc.get_chunks("range: 2000")
+
+        # fixed dimensions are limited to their size
+        self.assertIsNone(cnc.get_var_chunksizes(chunks, ("time", "range"), self.nc_id))
+        self.assertEqual(cnc.get_var_chunksizes(chunks, ("range",), self.nc_id), [1000])
+        self.assertRaises(ValueError, cnc.get_chunks, "time 60")
+
+    def test_quantization(self):
+        conf = get_conf({}, {"netcdf4_significant_digits": "3"})
+
+        self.assertEqual(self.get_storage(conf), {"significant_digits": 3})
+
+    def test_unavailable_codec(self):
+        conf = get_conf({"netcdf4_compression": "true", "netcdf4_codec": "blosc_lz4"})
+
+        storage = self.get_storage(conf)
+
+        if not self.nc_id.has_blosc_filter():
+            self.assertEqual(storage["compression"], cnc.DEFAULT_CODEC)
+        else:
+            self.assertEqual(storage["compression"], "blosc_lz4")
+
+    def test_invalid_options(self):
+        conf = get_conf(
+            {"netcdf4_compression": "true", "netcdf4_compression_level": "x"},
+            {"netcdf4_codec": "lz4", "netcdf4_significant_digits": "3.5"},
+        )
+
+        # invalid values of variables sections are ignored
+        with self.assertLogs(self.logger, "ERROR") as logs:
+            storage = self.get_storage(conf)
+
+        self.assertEqual(storage["compression"], cnc.DEFAULT_CODEC)
+        self.assertEqual(storage["complevel"], 4)
+        self.assertNotIn("significant_digits", storage)
+        self.assertEqual(len(logs.records), 3)
+
+    def test_storage_options_not_attributes(self):
+        conf = get_conf({}, {"netcdf4_shuffle": "false", "units": "m"})
+        nc_var = self.nc_id.createVariable("rcs_0", "f4", ("time", "range"))
+
+        cnc.add_attr_to_var(nc_var, {}, conf, "rcs_0", self.logger)
+
+        self.assertEqual(nc_var.ncattrs(), ["units"])
+
+
+class TestPacking(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("dummy")
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.filename = os.path.join(tmp_dir.name, "test.nc")
+        rng = np.random.default_rng(0)
+        self.values = rng.normal(1e-6, 1e-5, (20, 100)).astype(np.float32)
+        self.values[0, :10] = np.nan
+        self.values[1, :10] = -999.0
+        self.data = {"time": np.arange(20.0), "range": np.arange(100.0)}
+        self.data["rcs_0"] = self.values
+
+    def write(self, var_opts, filename=None):
+        filename = filename or self.filename
+        conf = configparser.RawConfigParser()
+        conf.optionxform = str
+        conf.read_dict(
+            {
+                "conf": {
+                    "conf": "test.ini",
+                    "output": filename,
+                    "netcdf_format": "NETCDF4",
+                },
+                "reader_conf": {},
+                "global": {},
+                "time": {
+                    "dim": "time",
+                    "type": "$double$",
+                    "value": "$reader_data$, time",
+                },
+                "range": {
+                    "dim": "range",
+                    "type": "$double$",
+                    "value": "$reader_data$, range",
+                },
+                "rcs_0": {
+                    "dim": "time, range",
+                    "type": "$float$",
+                    "value": "$reader_data$, rcs_0",
+                    "units": "m-1 sr-1",
+                    "missing_value": "-999.0",
+                    "_FillValue": "-999.0",
+                    **var_opts,
+                },
+            }
+        )
+        with nc.Dataset(filename, "w") as nc_id:
+            cnc.create_netcdf_dim(conf, self.data, nc_id, self.logger)
+            cnc.create_netcdf_variables(conf, self.data, nc_id, self.logger)
+
+        return nc.Dataset(filename)
+
+    def check_unpacked(self, nc_var, precision):
+        values = nc_var[:]
+        invalid = ~np.isfinite(self.values) | (self.values == -999.0)
+        np.testing.assert_array_equal(np.ma.getmaskarray(values), invalid)
+        np.testing.assert_array_less(
+            np.abs(values - self.values).max(), precision / 2 * 1.001
+        )
+
+    def test_precision(self):
+        with self.write({"pack_type": "$short$", "pack_precision": "1e-10"}) as nc_id:
+            nc_var = nc_id["rcs_0"]
+            self.assertEqual(nc_var.dtype, np.int16)
+            self.assertEqual(nc_var.scale_factor.dtype, np.float32)
+            self.assertEqual(nc_var.missing_value, nc_var._FillValue)
+            self.assertNotIn("pack_type", nc_var.ncattrs())
+            # range too large for int16 with this precision
+            self.assertGreater(nc_var.scale_factor, 1e-10)
+            self.check_unpacked(nc_var, nc_var.scale_factor)
+
+        with self.write({"pack_type": "$integer$", "pack_precision": "1e-9"}) as nc_id:
+            nc_var = nc_id["rcs_0"]
+            self.assertEqual(nc_var.dtype, np.int32)
+            self.assertAlmostEqual(float(nc_var.scale_factor), 1e-9)
+            self.check_unpacked(nc_var, 1e-9)
+
+    def test_scale_factor(self):
+        var_opts = {
+            "pack_type": "$integer$",
+            "scale_factor": "1e-9",
+            "add_offset": "1e-6",
+        }
+        with self.write(var_opts) as nc_id:
+            nc_var = nc_id["rcs_0"]
+            self.assertAlmostEqual(float(nc_var.add_offset), 1e-6)
+            self.check_unpacked(nc_var, 1e-9)
+
+        # values out of the range of int16 are missing
+        var_opts["pack_type"] = "$short$"
+        with self.write(var_opts) as nc_id:
+            values = nc_id["rcs_0"][:]
+            out_range = np.abs(self.values - 1e-6) > 32767e-9
+            self.assertTrue(np.all(np.ma.getmaskarray(values)[out_range]))
+
+    def test_not_packed(self):
+        with self.write({"pack_type": "$double$", "pack_precision": "1e-9"}) as nc_id:
+            self.assertEqual(nc_id["rcs_0"].dtype, np.float32)
+
+        with self.write({"pack_type": "$short$"}) as nc_id:
+            self.assertEqual(nc_id["rcs_0"].dtype, np.float32)
+
+        with self.write({"pack_type": "$short$", "pack_precision": "x"}) as nc_id:
+            self.assertEqual(nc_id["rcs_0"].dtype, np.float32)
+
+    def copy(self, var_opts):
+        """write the data of a second file in the variable of the first file"""
+
+        self.write(var_opts).close()
+        new_file = self.filename.replace(".nc", "_new.nc")
+        self.values = np.where(self.values == -999.0, -999.0, self.values + 5e-5)
+        self.data["rcs_0"] = self.values
+        self.write(var_opts, new_file).close()
+
+        with nc.Dataset(new_file) as new_id, nc.Dataset(self.filename, "a") as nc_id:
+            nc_id["rcs_0"][:] = cnc.get_values_to_write(
+                new_id["rcs_0"], nc_id["rcs_0"], self.logger
+            )
+
+        return nc.Dataset(self.filename)
+
+    def test_copy_same_packing(self):
+        var_opts = {"pack_type": "$integer$", "scale_factor": "1e-9"}
+        with self.copy(var_opts) as nc_id:
+            self.check_unpacked(nc_id["rcs_0"], 1e-9)
+
+    def test_copy_other_packing(self):
+        # offset computed from the data: different in each file
+        with self.copy({"pack_type": "$short$", "pack_precision": "1e-9"}) as nc_id:
+            nc_var = nc_id["rcs_0"]
+            values = nc_var[:]
+            # values out of the range of the first file are missing
+            out_range = np.abs(self.values - nc_var.add_offset) > (
+                32766 * nc_var.scale_factor
+            )
+            self.assertTrue(np.any(out_range))
+            self.assertTrue(np.all(np.ma.getmaskarray(values)[out_range]))
+            # other values are rounded with both packings
+            valid = ~np.ma.getmaskarray(values)
+            np.testing.assert_array_less(
+                np.abs(values[valid] - self.values[valid]).max(),
+                nc_var.scale_factor * 1.001,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
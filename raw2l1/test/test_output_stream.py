@@ -0,0 +1,119 @@
+"""Test of the output files sent to stdout, a socket or a function."""
+
+import datetime as dt
+import logging
+import socket
+import subprocess
+import threading
+from pathlib import Path
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+import raw2l1
+import tools.output_stream as output_stream
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+TEST_DIR = MAIN_DIR / "test"
+TEST_IN_DIR = TEST_DIR / "input" / "vaisala_cl61"
+CONF_FILE = TEST_IN_DIR / "conf" / "conf_vaisala_cl61_eprofile.ini"
+PRGM = MAIN_DIR / "raw2l1.py"
+
+DATE = "20220912"
+INPUT_FILES = str(TEST_IN_DIR / "T3250605*.nc")
+
+
+class SocketServer(threading.Thread):
+    """Unix socket server receiving one file."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(str(path))
+        self.sock.listen(1)
+        self.sock.settimeout(60)
+        self.content = b""
+
+    def run(self):
+        conn, _ = self.sock.accept()
+        with conn:
+            while chunk := conn.recv(65536):
+                self.content += chunk
+        self.sock.close()
+
+
+def assert_same_file(content, filename):
+    """Check that a file in memory has the data of a file."""
+    with nc.Dataset("memory.nc", memory=content) as mem, nc.Dataset(filename) as ref:
+        assert set(mem.variables) == set(ref.variables)
+        for var in ref.variables:
+            np.testing.assert_array_equal(
+                np.ma.getdata(mem.variables[var][:]),
+                np.ma.getdata(ref.variables[var][:]),
+            )
+
+
+@pytest.fixture(scope="module")
+def ref_file(tmp_path_factory):
+    """Output file written on disk."""
+    out_file = tmp_path_factory.mktemp("ref") / "ref.nc"
+    subprocess.check_call([PRGM, DATE, CONF_FILE, INPUT_FILES, out_file])
+
+    return out_file
+
+
+def test_stdout(ref_file):
+    """Only the netCDF file is written on stdout."""
+    result = subprocess.run(
+        [PRGM, DATE, CONF_FILE, INPUT_FILES, "-", "-v", "debug"],
+        capture_output=True,
+        check=True,
+    )
+
+    assert result.stdout.startswith(b"\x89HDF")
+    assert b"end of processing" in result.stderr
+    assert_same_file(result.stdout, ref_file)
+
+
+def test_unix_socket(ref_file, tmp_path):
+    """The netCDF file is sent to a socket."""
+    server = SocketServer(tmp_path / "raw2l1.sock")
+    server.start()
+
+    subprocess.check_call(
+        [PRGM, DATE, CONF_FILE, INPUT_FILES, f"unix:{tmp_path / 'raw2l1.sock'}"]
+    )
+    server.join(60)
+
+    assert_same_file(server.content, ref_file)
+
+
+def test_unix_socket_error(tmp_path):
+    """No server listening: error and exit status."""
+    logger = logging.getLogger("dummy")
+
+    with pytest.raises(SystemExit):
+        output_stream.send(b"data", f"unix:{tmp_path / 'none.sock'}", logger)
+
+
+def test_callback(ref_file):
+    """The netCDF file is given to a function."""
+    received = []
+
+    content = raw2l1.to_bytes(
+        CONF_FILE,
+        sorted(TEST_IN_DIR.glob("T3250605*.nc")),
+        dt.date(2022, 9, 12),
+        output=received.append,
+    )
+
+    assert received == [content]
+    assert_same_file(content, ref_file)
+
+
+def test_is_stream():
+    assert output_stream.is_stream("-")
+    assert output_stream.is_stream("unix:/tmp/raw2l1.sock")
+    assert output_stream.is_stream(print)
+    assert not output_stream.is_stream("output/unix.nc")
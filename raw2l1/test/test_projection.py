@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+import configparser
+import datetime as dt
+import glob
+import logging
+import os
+import unittest
+
+import numpy as np
+
+import reader.vaisala_cl61 as cl61
+import tools.create_netcdf as cnc
+import tools.projection as proj
+
+MAIN_DIR = os.path.dirname(os.path.dirname(__file__)) + os.sep
+TEST_DIR = os.path.join(MAIN_DIR, "test")
+CL61_DIR = os.path.join(TEST_DIR, "input", "vaisala_cl61")
+CL61_CONF = os.path.join(CL61_DIR, "conf", "conf_vaisala_cl61_eprofile.ini")
+
+
+class TestRequiredKeys(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("dummy")
+
+    def test_keys_from_conf(self):
+        conf = configparser.RawConfigParser()
+        conf.optionxform = str
+        conf.read(CL61_CONF)
+
+        required = cnc.get_required_data_keys(conf, self.logger)
+
+        for key in ["time", "range", "rcs_0", "cbh", "instrument_id", "station_lat"]:
+            self.assertIn(key, required)
+        self.assertNotIn("status_receiver_overall", required)
+        self.assertNotIn("missing_float", required)
+
+    def test_types_from_conf(self):
+        conf = configparser.RawConfigParser()
+        conf.optionxform = str
+        conf.read(CL61_CONF)
+
+        data_types = cnc.get_data_types(conf, self.logger)
+
+        self.assertEqual(data_types["rcs_0"], np.float64)
+        self.assertEqual(data_types["cbh"], np.float32)
+        self.assertNotIn("time", data_types)
+        self.assertEqual(
+            proj.get_dtype({proj.DATA_TYPES_KEY: data_types}, "rcs_0", np.float32),
+            np.float64,
+        )
+        self.assertEqual(proj.get_dtype({}, "rcs_0", np.float64), np.float64)
+
+    def test_dependencies(self):
+        conf = {proj.REQUIRED_DATA_KEY: {"rcs_0"}}
+
+        required = proj.get_required(conf, {"rcs_0": ("rcs_1", "rcs_2")})
+
+        self.assertEqual(required, {"rcs_0", "rcs_1", "rcs_2"})
+        self.assertIsNone(proj.get_required({}))
+        self.assertTrue(proj.is_required(None, "rcs_0"))
+
+
+class TestCL61Projection(unittest.TestCase):
+    def read_cl61(self, required):
+        conf = {
+            "date": dt.datetime(2022, 9, 12),
+            "missing_int": -9,
+            "missing_float": -999.0,
+        }
+        if required is not None:
+            conf[proj.REQUIRED_DATA_KEY] = required
+        list_files = sorted(glob.glob(os.path.join(CL61_DIR, "T3250605*.nc")))
+
+        return cl61.read_data(list_files, conf, logging.getLogger("dummy"))
+
+    def test_only_required_vars_read(self):
+        full = self.read_cl61(None)
+        data = self.read_cl61({"time", "cbh", "rcs_0"})
+
+        for key in ["cbh", "rcs_0", "rcs_1", "rcs_2"]:
+            np.testing.assert_array_equal(data[key], full[key])
+        for key in [
+            "beta",
+            "linear_depol_ratio",
+            "hkd_temp_int",
+            "status_device_overall",
+        ]:
+            self.assertIn(key, full)
+            self.assertNotIn(key, data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+import tools.range_correction as range_correction
+
+
+class TestRangeCorrection(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.signal = rng.uniform(-10, 1000, (20, 50)).astype(np.float32)
+        self.range = np.arange(1, 51) * 15.0
+
+    def test_float32(self):
+        result = range_correction.range_correct(self.signal, self.range, 1e-8)
+
+        self.assertEqual(result.dtype, np.float32)
+        # same values as the former computation cast when written
+        np.testing.assert_array_equal(
+            result, (self.signal * 1e-8 * self.range**2).astype(np.float32)
+        )
+
+    def test_output_type(self):
+        result = range_correction.range_correct(
+            self.signal, self.range, dtype=np.float64
+        )
+
+        self.assertEqual(result.dtype, np.float64)
+        np.testing.assert_array_equal(result, self.signal * np.square(self.range))
+
+    def test_in_place(self):
+        signal = self.signal.copy()
+
+        result = range_correction.range_correct(signal, self.range, out=signal)
+
+        self.assertIs(result, signal)
+        np.testing.assert_array_equal(
+            signal, (self.signal * self.range**2).astype(np.float32)
+        )
+
+    def test_wrong_output_type(self):
+        with self.assertRaises(ValueError):
+            range_correction.range_correct(
+                self.signal, self.range, dtype=np.float64, out=self.signal
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,16 @@
 #!/usr/bin/env python
 
+import logging
 import os
 import subprocess
 import unittest
+from unittest import mock
+
+import netCDF4 as nc
+import numpy as np
+
+from reader import libhatpro
+from tools import file_io
 
 MAIN_DIR = os.path.dirname(os.path.dirname(__file__)) + os.sep
 CONF_DIR = MAIN_DIR + "conf" + os.sep
@@ -190,6 +198,115 @@ class TestRunHatPro(unittest.TestCase):
 
         self.assertEqual(resp, 0)
 
+    def test_rpg_hatpro_several_products(self):
+        date = "20150901"
+        test_ifile = self.IN_DIR + "hatpro_0a_z1Imwrad-BRT_v01_20150901*.nc"
+        test_afile_met = self.IN_DIR + "hatpro_0a_z1Imwrad-MET_v01_20150901_*.nc"
+        test_afile_irt = self.IN_DIR + "hatpro_0a_z1Imwrad-IRT_v01_20150901_*.nc"
+        test_ofile = TEST_OUT_DIR + "products_mwr00_l1_tb_v01_20150901.nc"
+        test_cfile = CONF_DIR + "conf_rpg_hatpro_l1-tb_toprof_netcdf4.ini"
+        bl_ifile = self.IN_DIR + "hatpro_0a_z1Imwrad-BLB_v01_20150901_*.nc"
+        bl_ofiles = [
+            TEST_OUT_DIR + "products_mwrBL00_l1_tb_v01_20150901.nc",
+            TEST_OUT_DIR + "products_mwrBL00_l1_tb_v01_20150901_alone.nc",
+        ]
+        bl_cfile = CONF_DIR + "conf_rpg_hatpro_bl00-l1-tb_toprof_netcdf4.ini"
+
+        resp = subprocess.check_call(
+            [
+                MAIN_DIR + PRGM,
+                date,
+                test_cfile,
+                test_ifile,
+                test_ofile,
+                "-anc",
+                test_afile_met,
+                "-anc",
+                test_afile_irt,
+                "-product",
+                bl_cfile,
+                bl_ifile,
+                bl_ofiles[0],
+            ]
+        )
+        self.assertEqual(resp, 0)
+
+        # same file as the one created alone
+        resp = subprocess.check_call(
+            [
+                MAIN_DIR + PRGM,
+                date,
+                bl_cfile,
+                bl_ifile,
+                bl_ofiles[1],
+                "-anc",
+                test_afile_met,
+            ]
+        )
+        self.assertEqual(resp, 0)
+
+        with nc.Dataset(bl_ofiles[0]) as multi, nc.Dataset(bl_ofiles[1]) as alone:
+            for var in ["time", "tb", "ta", "pa", "hur"]:
+                np.testing.assert_array_equal(
+                    multi.variables[var][:], alone.variables[var][:]
+                )
+
+
+class TestHatProCache(unittest.TestCase):
+    IN_DIR = TEST_IN_DIR + "rpg_hatpro" + os.sep
+
+    def setUp(self):
+        libhatpro.clear_cache()
+        self.addCleanup(libhatpro.clear_cache)
+
+    def test_read_file_once(self):
+        logger = logging.getLogger("dummy")
+        filename = self.IN_DIR + "hatpro_0a_z1Imwrad-MET_v01_20150901_000243_717.nc"
+
+        with mock.patch.object(libhatpro.nc, "Dataset", wraps=nc.Dataset) as dataset:
+            rpg_data = libhatpro.read_file(filename, ["env_temperature"], logger)
+            cached = libhatpro.read_file(filename, ["env_temperature"], logger)
+            self.assertIs(cached, rpg_data)
+            self.assertEqual(dataset.call_count, 1)
+
+            # only the missing variable is read
+            libhatpro.read_file(filename, ["env_pressure"], logger)
+            self.assertEqual(dataset.call_count, 2)
+
+        self.assertEqual(rpg_data["time"].size, rpg_data["dims"]["time"])
+        self.assertIn("env_pressure", rpg_data)
+
+    def test_failed_read_not_cached(self):
+        logger = logging.getLogger("dummy")
+        filename = self.IN_DIR + "hatpro_0a_z1Imwrad-MET_v01_20150901_000243_717.nc"
+
+        with self.assertRaises(KeyError):
+            libhatpro.read_file(filename, ["env_temperature", "unknown"], logger)
+
+        self.assertEqual(libhatpro.FILE_CACHE, {})
+
+    def test_only_last_version_cached(self):
+        logger = logging.getLogger("dummy")
+        filename = self.IN_DIR + "hatpro_0a_z1Imwrad-MET_v01_20150901_000243_717.nc"
+
+        libhatpro.read_file(filename, ["env_temperature"], logger)
+        # file rewritten with another size
+        key = libhatpro.get_file_key(filename)
+        new_key = (key[0], key[1] + 1, key[2] + 1)
+        with mock.patch.object(libhatpro, "get_file_key", return_value=new_key):
+            libhatpro.read_file(filename, ["env_temperature"], logger)
+
+        self.assertEqual(list(libhatpro.FILE_CACHE), [new_key])
+
+    def test_cache_cleared_at_end_of_run(self):
+        logger = logging.getLogger("dummy")
+        filename = self.IN_DIR + "hatpro_0a_z1Imwrad-MET_v01_20150901_000243_717.nc"
+
+        libhatpro.read_file(filename, ["env_temperature"], logger)
+        file_io.clear_caches()
+
+        self.assertEqual(libhatpro.FILE_CACHE, {})
+
 
 if __name__ == "__main__":
     unittest.main()
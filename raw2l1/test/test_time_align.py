@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+import datetime as dt
+import unittest
+
+import numpy as np
+
+import tools.time_align as time_align
+
+T0 = np.datetime64("2015-09-01T00:00:00", "us")
+
+
+def seconds(values):
+    return T0 + (np.asarray(values) * 1e6).astype("timedelta64[us]")
+
+
+class TestTimeAlign(unittest.TestCase):
+    def test_exact(self):
+        time = seconds([0, 1, 2, 3, 4])
+        aux_time = seconds([4, 2, 0.3, 0, 10])
+
+        ind, stats = time_align.align_time(time, aux_time)
+
+        np.testing.assert_array_equal(ind, [3, -1, 1, -1, 0])
+        self.assertEqual(stats["n_time"], 5)
+        self.assertEqual(stats["n_aux"], 5)
+        self.assertEqual(stats["n_matched"], 3)
+        self.assertEqual(stats["n_unmatched"], 2)
+        self.assertEqual(stats["max_diff"], 0.0)
+
+    def test_same_as_intersect1d(self):
+        rng = np.random.default_rng(0)
+        time = seconds(np.sort(rng.choice(100_000, 5_000, replace=False)))
+        aux_time = seconds(rng.choice(100_000, 20_000, replace=False))
+
+        ind, _ = time_align.align_time(time, aux_time)
+        _, time_ind, aux_ind = np.intersect1d(time, aux_time, return_indices=True)
+
+        np.testing.assert_array_equal(np.flatnonzero(ind >= 0), time_ind)
+        np.testing.assert_array_equal(ind[ind >= 0], aux_ind)
+
+    def test_nearest(self):
+        time = seconds([0, 1, 2, 3, 10])
+        aux_time = seconds([0.2, 1.7, 2.4, 5])
+
+        ind, stats = time_align.align_time(
+            time,
+            aux_time,
+            mode=time_align.MODE_NEAREST,
+            tolerance=dt.timedelta(seconds=0.5),
+        )
+
+        np.testing.assert_array_equal(ind, [0, -1, 1, -1, -1])
+        self.assertEqual(stats["n_matched"], 2)
+        self.assertAlmostEqual(stats["max_diff"], 0.3)
+
+        ind, stats = time_align.align_time(time, aux_time, mode="nearest")
+
+        np.testing.assert_array_equal(ind, [0, 1, 1, 2, 3])
+        self.assertEqual(stats["max_diff"], 5.0)
+
+    def test_datetime_and_missing(self):
+        time = np.array([dt.datetime(2015, 9, 1), None, dt.datetime(2015, 9, 2)])
+        aux_time = np.array([None, dt.datetime(2015, 9, 2), dt.datetime(2015, 9, 1)])
+
+        ind, stats = time_align.align_time(time, aux_time)
+
+        np.testing.assert_array_equal(ind, [2, -1, 1])
+        self.assertEqual(stats["n_aux"], 2)
+
+    def test_empty_aux(self):
+        ind, stats = time_align.align_time(seconds([0, 1]), seconds([]))
+
+        np.testing.assert_array_equal(ind, [-1, -1])
+        self.assertEqual(stats["n_unmatched"], 2)
+
+    def test_wrong_mode(self):
+        with self.assertRaises(ValueError):
+            time_align.align_time(seconds([0]), seconds([0]), mode="linear")
+
+
+if __name__ == "__main__":
+    unittest.main()
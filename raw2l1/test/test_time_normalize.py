@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+import datetime as dt
+import logging
+import unittest
+
+import numpy as np
+
+import tools.time_normalize as time_normalize
+
+T0 = np.datetime64("2022-09-12T00:00:00", "us")
+
+
+def seconds(values):
+    return T0 + (np.asarray(values) * 1e6).astype("timedelta64[us]")
+
+
+class TestTimeNormalize(unittest.TestCase):
+    def test_sorted_unique(self):
+        index, stats = time_normalize.get_time_order(seconds([0, 1, 2, 3]))
+
+        np.testing.assert_array_equal(index, [0, 1, 2, 3])
+        self.assertEqual(stats["n_duplicated"], 0)
+        self.assertEqual(stats["n_unsorted"], 0)
+
+    def test_sort_and_duplicates(self):
+        # overlapping files: second file repeats time steps of the first one
+        time = seconds([0, 1, 2, 3, 2, 3, 4, 5])
+
+        index, stats = time_normalize.get_time_order(time)
+
+        np.testing.assert_array_equal(index, [0, 1, 2, 3, 6, 7])
+        self.assertEqual(stats["n_time"], 8)
+        self.assertEqual(stats["n_kept"], 6)
+        self.assertEqual(stats["n_duplicated"], 2)
+        self.assertEqual(stats["n_unsorted"], 1)
+
+    def test_tolerance(self):
+        time = seconds([0, 10, 10.4, 20, 19.8])
+
+        index, stats = time_normalize.get_time_order(time, tolerance=0.5)
+
+        np.testing.assert_array_equal(index, [0, 1, 4])
+        self.assertEqual(stats["n_duplicated"], 2)
+
+    def test_tolerance_last_kept(self):
+        # each time step is close to the previous one, not to the last kept
+        time = seconds([0, 0.6, 1.2, 1.8, 2.4, 3.0])
+
+        index, stats = time_normalize.get_time_order(time, tolerance=1.0)
+
+        np.testing.assert_array_equal(index, [0, 2, 4])
+        self.assertEqual(stats["n_duplicated"], 3)
+
+    def test_missing_dates(self):
+        time = [dt.datetime(2022, 9, 12, 0, 1), None, dt.datetime(2022, 9, 12)]
+
+        index, stats = time_normalize.get_time_order(time)
+
+        np.testing.assert_array_equal(index, [2, 0, 1])
+        self.assertEqual(stats["n_missing"], 1)
+
+    def test_gaps(self):
+        time = seconds([0, 10, 20, 100, 110, 400])
+
+        index, length = time_normalize.find_gaps(time)
+        np.testing.assert_array_equal(index, [2, 4])
+        np.testing.assert_array_equal(length, [80, 290])
+
+        index, length = time_normalize.find_gaps(time, max_gap=100)
+        np.testing.assert_array_equal(index, [4])
+
+    def test_normalize(self):
+        logger = logging.getLogger("dummy")
+        data = {
+            "time": seconds([2, 0, 1, 2]),
+            "rcs_0": np.arange(8).reshape(4, 2),
+            "range": np.arange(2),
+            "profile": np.arange(8).reshape(2, 4),
+            "constant": 1,
+        }
+        time_axes = {"time": 0, "rcs_0": 0, "profile": 1, "constant": 0}
+
+        norm = time_normalize.normalize(data, "time", time_axes, {}, logger)
+
+        np.testing.assert_array_equal(norm["time"], seconds([0, 1, 2]))
+        np.testing.assert_array_equal(norm["rcs_0"], [[2, 3], [4, 5], [0, 1]])
+        np.testing.assert_array_equal(norm["profile"], [[1, 2, 0], [5, 6, 4]])
+        self.assertIs(norm["range"], data["range"])
+        self.assertEqual(norm["constant"], 1)
+        # data read are not modified
+        self.assertEqual(len(data["time"]), 4)
+
+    def test_normalize_disabled(self):
+        logger = logging.getLogger("dummy")
+        data = {"time": seconds([1, 0])}
+
+        norm = time_normalize.normalize(
+            data, "time", {"time": 0}, {"normalize_time": "false"}, logger
+        )
+
+        self.assertIs(norm, data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+import datetime as dt
+import os
+import subprocess
+import tempfile
+import unittest
+
+import netCDF4 as nc
+import numpy as np
+
+import tools.time_window as tw
+
+MAIN_DIR = os.path.dirname(os.path.dirname(__file__)) + os.sep
+TEST_DIR = os.path.join(MAIN_DIR, "test")
+TEST_IN_DIR = os.path.join(TEST_DIR, "input")
+PRGM = "raw2l1.py"
+
+CL61_DIR = os.path.join(TEST_IN_DIR, "vaisala_cl61")
+CL61_FILE = os.path.join(CL61_DIR, "cl61-v1.1_20220623_082940.nc")
+CL61_CONF = os.path.join(CL61_DIR, "conf", "conf_vaisala_cl61_eprofile.ini")
+
+
+class TestTimeWindow(unittest.TestCase):
+    def test_no_filter(self):
+        self.assertIsNone(tw.get_time_window(dt.datetime(2022, 6, 23), False))
+        self.assertTrue(tw.is_in_window(dt.datetime(1900, 1, 1), None))
+
+    def test_day_window(self):
+        window = tw.get_time_window(dt.datetime(2022, 6, 23), True)
+
+        self.assertTrue(tw.is_in_window(dt.datetime(2022, 6, 23), window))
+        self.assertTrue(tw.is_in_window(dt.datetime(2022, 6, 23, 23, 59, 59), window))
+        self.assertFalse(tw.is_in_window(dt.datetime(2022, 6, 24), window))
+        self.assertFalse(tw.is_in_window(dt.datetime(2022, 6, 22, 23, 59), window))
+
+    def test_mask_to_selection(self):
+        sel = tw.mask_to_selection(np.array([False, True, True, False]))
+        self.assertEqual(sel, slice(1, 3))
+
+        sel = tw.mask_to_selection(np.array([True, False, True]))
+        np.testing.assert_array_equal(sel, [0, 2])
+        self.assertEqual(tw.get_selection_size(sel, 3), 2)
+
+        sel = tw.mask_to_selection(np.zeros(4, dtype=bool))
+        self.assertEqual(tw.get_selection_size(sel, 4), 0)
+
+    def test_nc_time_selection(self):
+        window = (dt.datetime(2022, 6, 23, 8, 25), dt.datetime(2022, 6, 23, 8, 27))
+        with nc.Dataset(CL61_FILE) as nc_id:
+            time_var = nc_id.variables["time"]
+            self.assertEqual(tw.get_nc_time_selection(time_var, None), slice(None))
+
+            sel = tw.get_nc_time_selection(time_var, window)
+            times = nc.num2date(
+                time_var[sel], time_var.units, only_use_cftime_datetimes=False
+            )
+
+        self.assertEqual(tw.get_selection_size(sel, 5), 2)
+        for time in times:
+            self.assertTrue(tw.is_in_window(time, window))
+
+
+class TestFilterDayReader(unittest.TestCase):
+    def run_cl61(self, date, out_file):
+        return subprocess.check_call(
+            [
+                os.path.join(MAIN_DIR, PRGM),
+                date,
+                CL61_CONF,
+                os.path.join(CL61_DIR, "cl61-v1.1_*.nc"),
+                out_file,
+                "--filter-day",
+            ]
+        )
+
+    def test_cl61_filter_day(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_file = os.path.join(tmp_dir, "cl61_filter_day.nc")
+            resp = self.run_cl61("20220623", out_file)
+
+            self.assertEqual(resp, 0, "CL61 with --filter-day")
+            with nc.Dataset(out_file) as nc_id:
+                self.assertEqual(nc_id.dimensions["time"].size, 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
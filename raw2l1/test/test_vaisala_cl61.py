@@ -1,10 +1,17 @@
 """Test for VAISALA CL61 ceilometer."""
 
+import configparser
+import datetime as dt
+import logging
 import subprocess
 from pathlib import Path
 
+import netCDF4 as nc
+import numpy as np
 import pytest
 
+import tools.create_netcdf as cnc
+
 MAIN_DIR = Path(__file__).resolve().parent.parent
 TEST_DIR = MAIN_DIR / "test"
 TEST_IN_DIR = TEST_DIR / "input" / "vaisala_cl61"
@@ -87,3 +94,141 @@ def test_vaisala_cl61(date, input_file, conf_file, test_msg):
     )
 
     assert resp == 0, test_msg
+
+
+def test_vaisala_cl61_several_outputs(tmp_path):
+    """
+    Test creation of several output files from one reading of the files.
+
+    The main configuration does not write the profiles: the data needed by the
+    additional output have to be read anyway.
+
+    """
+    date = "20220912"
+    in_file = TEST_IN_DIR / "T3250605*.nc"
+    conf_file = CONF_DIR / "conf_vaisala_cl61_eprofile.ini"
+
+    conf = configparser.RawConfigParser()
+    conf.optionxform = str
+    conf.read(conf_file)
+    for section in ["rcs_0", "rcs_1", "rcs_2"]:
+        conf.remove_section(section)
+    small_conf_file = tmp_path / "conf_small.ini"
+    with open(small_conf_file, "w") as file_id:
+        conf.write(file_id)
+
+    out_files = [tmp_path / name for name in ["small.nc", "fanout.nc", "alone.nc"]]
+    resp = subprocess.check_call(
+        [
+            PRGM,
+            date,
+            small_conf_file,
+            in_file,
+            out_files[0],
+            "-output",
+            conf_file,
+            out_files[1],
+        ]
+    )
+    assert resp == 0
+
+    resp = subprocess.check_call([PRGM, date, conf_file, in_file, out_files[2]])
+    assert resp == 0
+
+    with nc.Dataset(out_files[0]) as small:
+        assert "rcs_0" not in small.variables
+    with nc.Dataset(out_files[1]) as fanout, nc.Dataset(out_files[2]) as alone:
+        assert set(fanout.variables) == set(alone.variables)
+        for var in fanout.variables:
+            np.testing.assert_array_equal(
+                np.ma.getdata(fanout.variables[var][:]),
+                np.ma.getdata(alone.variables[var][:]),
+            )
+
+
+def test_vaisala_cl61_outputs_other_reader_conf(tmp_path):
+    """Additional outputs must use the same reader configuration."""
+    resp = subprocess.call(
+        [
+            PRGM,
+            "20220912",
+            CONF_DIR / "conf_vaisala_cl61_eprofile.ini",
+            TEST_IN_DIR / "T3250605*.nc",
+            tmp_path / "main.nc",
+            "-output",
+            CONF_DIR / "conf_vaisala_cl61_eprofile_force-loc.ini",
+            tmp_path / "other.nc",
+        ]
+    )
+
+    assert resp != 0
+    assert not (tmp_path / "main.nc").exists()
+
+
+def test_vaisala_cl61_split_output(tmp_path):
+    """Output split in files of 10 minutes from one reading of the files."""
+    date = "20220912"
+    in_file = TEST_IN_DIR / "T3250605*.nc"
+    conf_file = CONF_DIR / "conf_vaisala_cl61_eprofile.ini"
+
+    resp = subprocess.check_call([PRGM, date, conf_file, in_file, tmp_path / "day.nc"])
+    assert resp == 0
+
+    (tmp_path / "split").mkdir()
+    resp = subprocess.check_call(
+        [
+            PRGM,
+            date,
+            conf_file,
+            in_file,
+            tmp_path / "split" / "cl61_%H%M.nc",
+            "-split_minutes",
+            "10",
+        ]
+    )
+    assert resp == 0
+
+    split_files = sorted((tmp_path / "split").glob("*.nc"))
+    assert [f.name for f in split_files] == [
+        "cl61_1310.nc",
+        "cl61_1320.nc",
+        "cl61_1810.nc",
+        "cl61_1820.nc",
+    ]
+
+    with nc.Dataset(tmp_path / "day.nc") as day:
+        parts = [nc.Dataset(f) for f in split_files]
+        for var in day.variables:
+            if "time" in day.variables[var].dimensions:
+                axis = day.variables[var].dimensions.index("time")
+                values = np.concatenate(
+                    [np.ma.getdata(part.variables[var][:]) for part in parts],
+                    axis=axis,
+                )
+            else:
+                values = np.ma.getdata(parts[0].variables[var][:])
+            np.testing.assert_array_equal(values, np.ma.getdata(day.variables[var][:]))
+        for part in parts:
+            part.close()
+
+
+def test_split_data_invalid_dates():
+    """Time steps without valid date are not in any period."""
+    conf = configparser.RawConfigParser()
+    conf.optionxform = str
+    conf.read(CONF_DIR / "conf_vaisala_cl61_eprofile.ini")
+    conf.set("conf", "date", dt.datetime(2022, 9, 12))
+    time = np.array(
+        ["2022-09-12T00:05", "NaT", "2022-09-12T00:15", "2022-09-12T00:01"],
+        dtype="datetime64[us]",
+    )
+    data = {"time": time, "hkd_temp_laser": np.arange(4.0)}
+
+    parts = cnc.split_data(conf, data, 10, logging.getLogger("dummy"))
+
+    assert [start for start, _ in parts] == [
+        dt.datetime(2022, 9, 12, 0, 0),
+        dt.datetime(2022, 9, 12, 0, 10),
+    ]
+    np.testing.assert_array_equal(parts[0][1]["hkd_temp_laser"], [0.0, 3.0])
+    np.testing.assert_array_equal(parts[1][1]["hkd_temp_laser"], [2.0])
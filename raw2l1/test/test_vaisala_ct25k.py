@@ -1,10 +1,14 @@
 """Test for VAISALA CT25k ceilometer."""
 
+import logging
 import subprocess
 from pathlib import Path
 
+import numpy as np
 import pytest
 
+import reader.vaisala_ct25k as ct25k
+
 MAIN_DIR = Path(__file__).resolve().parent.parent
 TEST_DIR = MAIN_DIR / "test"
 TEST_IN_DIR = TEST_DIR / "input" / "vaisala_ct25k"
@@ -55,3 +59,68 @@ def test_vaisala_cl61(date, input_file, conf_file, msg):
     )
 
     assert resp == 0, f"failed: vaisala CT25k {date}:  {msg}"
+
+
+def get_rcs_data(profiles):
+    """Data dictionary with raw rcs lines of profiles of 16-bit samples."""
+    data = {
+        "msg_type": 2,
+        "range": np.arange(240),
+        "scale": np.full(len(profiles), ct25k.OK_SCALE_VALUE),
+    }
+    data["rcs_raw"] = np.zeros((len(profiles), 16), dtype="S68")
+    data["rcs_0"] = np.full((len(profiles), 240), -999.0, dtype=np.float32)
+    for ind, samples in enumerate(profiles):
+        hex_str = "".join(f"{s & 0xFFFF:04X}" for s in samples)
+        msg = ["", "", "", ""] + [
+            f"{i * 16:03d}" + hex_str[i * 64 : (i + 1) * 64] for i in range(16)
+        ]
+        ct25k.read_rcs_var(data, ind, msg, logging.getLogger("dummy"))
+
+    return data
+
+
+def test_decode_rcs():
+    """Decoding of 16-bit two's complement samples of several profiles."""
+    samples = np.arange(256) * 37 - 5000
+    data = get_rcs_data([samples, samples[::-1]])
+    conf = {"check_scale": True, "missing_float": -999.0}
+
+    data = ct25k.decode_rcs(data, conf, logging.getLogger("dummy"))
+
+    assert "rcs_raw" not in data
+    np.testing.assert_array_equal(data["rcs_0"][0], samples[:240] * 10)
+    np.testing.assert_array_equal(data["rcs_0"][1], samples[::-1][:240] * 10)
+
+
+def test_decode_rcs_bad_layout():
+    """Profiles with wrong offsets or non hexadecimal samples are ignored."""
+    samples = np.ones(256, dtype=int)
+    data = get_rcs_data([samples, samples, samples])
+    data["rcs_raw"][1, 3] = b"999" + data["rcs_raw"][1, 3][3:]
+    data["rcs_raw"][2, 0] = data["rcs_raw"][2, 0][:10] + b"G"
+    conf = {"check_scale": False, "missing_float": -999.0}
+
+    data = ct25k.decode_rcs(data, conf, logging.getLogger("dummy"))
+
+    np.testing.assert_array_equal(data["rcs_0"][0], 10)
+    np.testing.assert_array_equal(data["rcs_0"][1:], -999.0)
+
+
+def test_log_error_msg(caplog):
+    """Instrument messages logged with their count at each level."""
+    data = {
+        "list_errors": {
+            "Receiver warning": {"level": "STATUS", "count": 1},
+            "Window contamination": {"level": "WARNING", "count": 20},
+            "Laser failure": {"level": "ALARM", "count": 3},
+        }
+    }
+
+    with caplog.at_level(logging.INFO):
+        ct25k.log_error_msg(data, logging.getLogger("dummy"))
+
+    messages = [(r.levelname, r.getMessage()) for r in caplog.records]
+    assert ("INFO", "Receiver warning : 1 message(s)") in messages
+    assert ("WARNING", "Window contamination : 20 message(s)") in messages
+    assert ("ERROR", "Laser failure : 3 message(s)") in messages
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+import configparser
+import logging
+import os
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import netCDF4 as nc
+import numpy as np
+
+import tools.create_netcdf as create_netcdf
+import tools.watch as watch
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+TEST_DIR = os.path.join(MAIN_DIR, "test")
+CL61_DIR = os.path.join(TEST_DIR, "input", "vaisala_cl61")
+CL61_CONF = os.path.join(CL61_DIR, "conf", "conf_vaisala_cl61_eprofile.ini")
+PRGM = os.path.join(MAIN_DIR, "raw2l1.py")
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.watcher = watch.FileWatcher(
+            [os.path.join(self.tmp_dir.name, "*.txt")],
+            min_size=2,
+            settle_time=5,
+            use_inotify=False,
+        )
+        self.addCleanup(self.watcher.close)
+
+    def write(self, name, content):
+        filename = os.path.join(self.tmp_dir.name, name)
+        with open(filename, "a") as file_id:
+            file_id.write(content)
+
+        return filename
+
+    def test_complete_files(self):
+        now = time.time()
+        small = self.write("a.txt", "ab")
+        growing = self.write("b.txt", "abc")
+
+        # files modified less than settle_time ago
+        self.assertEqual(self.watcher.scan(now), [])
+        self.assertEqual(self.watcher.scan(now + 10), [growing])
+        # reported once
+        self.assertEqual(self.watcher.scan(now + 20), [])
+
+        # big enough now, but has grown since the previous scan
+        self.write("a.txt", "c")
+        self.assertEqual(self.watcher.scan(now + 30), [])
+        self.assertEqual(self.watcher.scan(now + 40), [small])
+        self.assertEqual(self.watcher.pending, {})
+
+    def test_old_files(self):
+        filename = self.write("a.txt", "abc")
+        old = time.time() - 60
+        os.utime(filename, (old, old))
+
+        self.assertEqual(self.watcher.scan(), [filename])
+
+
+class TestWatchMode(unittest.TestCase):
+    def test_append(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pattern = os.path.join(CL61_DIR, "cl61-v1.1_*.nc")
+            first_file = os.path.join(CL61_DIR, "cl61-v1.1_20220623_082940.nc")
+            watch_file = os.path.join(tmp_dir, "watch.nc")
+            ref_file = os.path.join(tmp_dir, "ref.nc")
+
+            # the day is over: each run does one scan. The first file is
+            # processed twice and its data are only appended once
+            for input_file in [first_file, pattern]:
+                resp = subprocess.check_call(
+                    [
+                        PRGM,
+                        "20220623",
+                        CL61_CONF,
+                        input_file,
+                        watch_file,
+                        "--watch",
+                        "-watch_settle",
+                        "0",
+                    ]
+                )
+                self.assertEqual(resp, 0)
+
+            resp = subprocess.check_call(
+                [PRGM, "20220623", CL61_CONF, pattern, ref_file]
+            )
+            self.assertEqual(resp, 0)
+
+            with nc.Dataset(watch_file) as watch_id, nc.Dataset(ref_file) as ref_id:
+                self.assertEqual(
+                    watch_id.dimensions["time"].size, ref_id.dimensions["time"].size
+                )
+                for name, var in ref_id.variables.items():
+                    np.testing.assert_array_equal(
+                        np.ma.getdata(watch_id.variables[name][:]),
+                        np.ma.getdata(var[:]),
+                    )
+
+    def test_append_error(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, "watch.nc")
+            conf = configparser.RawConfigParser()
+            conf.add_section("conf")
+            conf.set("conf", "output", output_file)
+
+            # the temporary file is removed when the creation of the file fails
+            with (
+                mock.patch.object(
+                    create_netcdf, "create_netcdf", side_effect=SystemExit(1)
+                ),
+                self.assertRaises(SystemExit),
+            ):
+                create_netcdf.append_netcdf(conf, {}, logging.getLogger("dummy"))
+
+            self.assertEqual(os.listdir(tmp_dir), [])
+            self.assertEqual(conf.get("conf", "output"), output_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Allocation of the data arrays of the readers.
+
+The arrays are created with `numpy.full` (or `numpy.empty` when all the
+values are written afterwards) in one allocation and with the requested
+type. The `Allocator` counts the memory allocated so that each reader can
+report it.
+"""
+
+import numpy as np
+
+MIB = 1024**2
+
+
+class Allocator:
+    """
+    Create arrays and count the memory allocated.
+
+    Attributes
+    ----------
+    nbytes : int
+        Number of bytes allocated.
+    n_arrays : int
+        Number of arrays allocated.
+
+    """
+
+    def __init__(self):
+        self.nbytes = 0
+        self.n_arrays = 0
+
+    def _count(self, array):
+        self.nbytes += array.nbytes
+        self.n_arrays += 1
+
+        return array
+
+    def full(self, shape, fill_value, dtype):
+        """
+        Create an array filled with a value.
+
+        Parameters
+        ----------
+        shape : int or tuple of int
+            Shape of the array.
+        fill_value : scalar
+            Value of all the elements (usually the missing value).
+        dtype : data-type
+            Type of the array.
+
+        Returns
+        -------
+        numpy.ndarray
+            The array.
+
+        Raises
+        ------
+        ValueError
+            If the value can not be stored in an integer array (e.g. a
+            missing value of -999 in int8) instead of silently wrapping it.
+
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind in "iu":
+            info = np.iinfo(dtype)
+            if not info.min <= fill_value <= info.max:
+                raise ValueError(f"fill value {fill_value} out of range of {dtype}")
+
+        return self._count(np.full(shape, fill_value, dtype=dtype))
+
+    def empty(self, shape, dtype):
+        """
+        Create an array without initializing its values.
+
+        Parameters
+        ----------
+        shape : int or tuple of int
+            Shape of the array.
+        dtype : data-type
+            Type of the array.
+
+        Returns
+        -------
+        numpy.ndarray
+            The array.
+
+        """
+        return self._count(np.empty(shape, dtype=dtype))
+
+    def log_summary(self, logger):
+        """
+        Log the memory allocated.
+
+        Parameters
+        ----------
+        logger : logging.Logger
+            The logger.
+
+        """
+        logger.info(
+            "%.1f MiB allocated for %d data arrays", self.nbytes / MIB, self.n_arrays
+        )
@@ -0,0 +1,206 @@
+"""
+Cache for parsed ancillary files (overlap functions, ...).
+
+Ancillary files rarely change so once parsed their content is stored as a
+`.npy` file in a cache directory. The cache key is built from the absolute
+path, the modification time and the size of the file so any change of the
+file invalidates the cached version. Parsed arrays are also memoized in the
+process to avoid reading the `.npy` file several times in batch mode.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+# environment variable to define the cache directory
+CACHE_DIR_ENV = "RAW2L1_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "raw2l1")
+CACHE_EXT = ".npy"
+
+# in-process memoization of parsed files
+_MEMORY_CACHE = {}
+
+
+def get_cache_dir():
+    """
+    Return the directory where parsed ancillary files are stored.
+
+    Returns
+    -------
+    str
+        The cache directory. Defined by the `RAW2L1_CACHE_DIR` environment
+        variable or `~/.cache/raw2l1` by default. An empty environment
+        variable disables the cache on disk.
+
+    """
+    return os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+
+
+def get_cache_key(filename, parser_name):
+    """
+    Build the key identifying a parsed version of an ancillary file.
+
+    Parameters
+    ----------
+    filename : str
+        The ancillary file.
+    parser_name : str
+        Name of the parser used. The same file can be parsed differently by
+        two readers.
+
+    Returns
+    -------
+    tuple
+        (absolute path, parser name, modification time in ns, size in bytes)
+
+    Raises
+    ------
+    OSError
+        If the file does not exist.
+
+    """
+    stat = os.stat(filename)
+
+    return (os.path.abspath(filename), parser_name, stat.st_mtime_ns, stat.st_size)
+
+
+def get_cache_file(cache_dir, key):
+    """
+    Return the name of the `.npy` file storing the parsed data for a key.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The cache directory.
+    key : tuple
+        Key returned by `get_cache_key`.
+
+    Returns
+    -------
+    str
+        Path of the cache file.
+
+    """
+    key_hash = hashlib.sha1(repr(key).encode("utf8")).hexdigest()
+
+    return os.path.join(cache_dir, key_hash + CACHE_EXT)
+
+
+def load_from_disk(cache_file, logger):
+    """
+    Load a parsed ancillary file from the cache directory.
+
+    Parameters
+    ----------
+    cache_file : str
+        Path of the cache file.
+    logger : logging.Logger
+        Logger object.
+
+    Returns
+    -------
+    numpy.ndarray or None
+        The cached data or None if not available.
+
+    """
+    if not os.path.isfile(cache_file):
+        return None
+
+    try:
+        data = np.load(cache_file, allow_pickle=False)
+    except (OSError, ValueError) as err:
+        logger.debug("unable to load cache file %s: %r", cache_file, err)
+        return None
+
+    logger.debug("ancillary data loaded from cache %s", cache_file)
+
+    return data
+
+
+def save_to_disk(cache_file, data, logger):
+    """
+    Store a parsed ancillary file in the cache directory.
+
+    The file is first written in a temporary file and then renamed so
+    concurrent runs never read a partially written cache file.
+
+    Parameters
+    ----------
+    cache_file : str
+        Path of the cache file.
+    data : numpy.ndarray
+        The parsed data.
+    logger : logging.Logger
+        Logger object.
+
+    """
+    cache_dir = os.path.dirname(cache_file)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=CACHE_EXT)
+        with os.fdopen(fd, "wb") as f_id:
+            np.save(f_id, data, allow_pickle=False)
+        os.replace(tmp_file, cache_file)
+    except (OSError, ValueError) as err:
+        logger.debug("unable to store ancillary data in cache: %r", err)
+        return
+
+    logger.debug("ancillary data stored in cache %s", cache_file)
+
+
+def load(filename, parser, logger):
+    """
+    Return the content of an ancillary file parsed by `parser` using the cache.
+
+    Parameters
+    ----------
+    filename : str
+        The ancillary file to read.
+    parser : callable
+        Function called as `parser(filename, logger)` returning a
+        numpy.ndarray or None if the file could not be parsed. Errors raised
+        by the parser are propagated.
+    logger : logging.Logger
+        Logger object.
+
+    Returns
+    -------
+    numpy.ndarray or None
+        The parsed data (read-only).
+
+    """
+    parser_name = parser.__module__ + "." + parser.__qualname__
+    key = get_cache_key(filename, parser_name)
+
+    if key in _MEMORY_CACHE:
+        logger.debug("ancillary data of %s already loaded", filename)
+        return _MEMORY_CACHE[key]
+
+    cache_dir = get_cache_dir()
+    cache_file = None
+    data = None
+    if cache_dir:
+        cache_file = get_cache_file(cache_dir, key)
+        data = load_from_disk(cache_file, logger)
+
+    if data is None:
+        data = parser(filename, logger)
+        if data is None:
+            return None
+        if cache_file is not None:
+            save_to_disk(cache_file, data, logger)
+
+    # the same array is shared between all users of the cache
+    data.setflags(write=False)
+    _MEMORY_CACHE[key] = data
+
+    return data
+
+
+def clear_memory():
+    """
+    Empty the in-process cache.
+    """
+    _MEMORY_CACHE.clear()
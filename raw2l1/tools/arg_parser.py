@@ -5,11 +5,11 @@
 
 import argparse
 import datetime as dt
-import glob
 import os
 import sys
 from itertools import chain
 
+from . import file_discovery, output_stream, watch
 from .utils import check_dir
 
 PROG_DESC = "Raw LIDAR data to netCDF converter"
@@ -31,6 +31,21 @@ def check_date_format(input_date):
     return dt_date
 
 
+def check_split_minutes(value):
+    """
+    Check the duration of the output files split
+    """
+
+    try:
+        minutes = int(value)
+    except ValueError:
+        minutes = 0
+    if minutes <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number of minutes")
+
+    return minutes
+
+
 def check_anc_lists_files(input_files):
     """
     Check input files lists and return a list of each input.
@@ -57,21 +72,25 @@ def check_input_files(input_files):
     check if the input files exist and return a list of the input files found
     """
 
-    list_files = glob.glob(input_files)
+    list_files = file_discovery.find_files(input_files)
 
     if len(list_files) == 0:
         msg = "No input files found corresponding to the file pattern "
         msg += input_files
         raise argparse.ArgumentTypeError(msg)
 
-    return sorted(list_files)
+    return [filename for filename, _ in list_files]
 
 
 def check_output_dir(output_file):
     """
-    check if the directory provided for the output file is writable
+    check if the directory provided for the output file is writable. Outputs
+    sent to stdout or to a socket are not checked
     """
 
+    if output_stream.is_stream(output_file):
+        return output_file
+
     output_file = os.path.abspath(output_file)
     out_dir = os.path.dirname(output_file)
 
@@ -83,19 +102,31 @@ def check_output_dir(output_file):
     return output_file
 
 
-def check_input_file_size(list_files, size_limit):
+def find_input_files(patterns, size_limit, date_filter=None, index=None):
     """
-    check size of input files. If files have a lower size they are rejected
+    find the input files corresponding to the patterns. Files with a size lower
+    than the size limit are rejected. Files can be selected by the date in
+    their name (date_filter) and the directory listings can be read from an
+    index (see file_discovery module)
     """
 
     err_msg = "WARNING -102 No Usable data in the input file '{}'"
 
     final_list = []
-    for f in list_files:
-        if os.path.getsize(f) > size_limit:
-            final_list.append(f)
-        else:
-            print(err_msg.format(f))
+    for pattern in patterns:
+        list_files = file_discovery.find_files(pattern, date_filter, index)
+
+        if len(list_files) == 0:
+            msg = "No input files found corresponding to the file pattern "
+            msg += pattern
+            raise argparse.ArgumentTypeError(msg)
+
+        # sizes come from the directory listing
+        for filename, size in list_files:
+            if size > size_limit:
+                final_list.append(filename)
+            else:
+                print(err_msg.format(filename))
 
     return final_list
 
@@ -119,14 +150,14 @@ def init_args_parser():
     )
     parser.add_argument(
         "input_file",
-        type=check_input_files,
         nargs="*",
         help="Name or pattern of the file(s) to convert",
     )
     parser.add_argument(
         "output_file",
         type=check_output_dir,
-        help="Name of the output file (.nc extension)",
+        help="Name of the output file (.nc extension). Use '-' to write the file "
+        "on stdout or 'unix:PATH' to send it to a Unix socket",
     )
 
     # additional input files
@@ -140,7 +171,59 @@ def init_args_parser():
         help="Name or pattern of the ancillary file(s) needed to do the conversion",
     )
 
+    # additional products processed in the same run
+    parser.add_argument(
+        "-product",
+        "--product",
+        action="append",
+        nargs=3,
+        default=[],
+        dest="products",
+        metavar=("CONF_FILE", "INPUT_FILE", "OUTPUT_FILE"),
+        help="Configuration file, name or pattern of the file(s) to convert and "
+        "output file of an additional product to create in the same run. "
+        "Can be used several times",
+    )
+
+    # additional output files created from the same data read
+    parser.add_argument(
+        "-output",
+        "--output",
+        action="append",
+        nargs=2,
+        default=[],
+        dest="outputs",
+        metavar=("CONF_FILE", "OUTPUT_FILE"),
+        help="Configuration file and output file of an additional output created "
+        "from the data read for the main configuration. The configuration must "
+        "use the same reader and [reader_conf] section. Can be used several times",
+    )
+
     # Real time related argument
+    parser.add_argument(
+        "-input_date_format",
+        required=False,
+        default=None,
+        help="Format of the date in the names of the input files (e.g. %%Y%%m%%d). "
+        "Files dated outside of the day to process and the margin defined by "
+        "'-input_date_margin' are ignored without being read",
+    )
+    parser.add_argument(
+        "-input_date_margin",
+        required=False,
+        type=int,
+        default=24,
+        help="Margin in hours before and after the day to process of the input "
+        "files selected with '-input_date_format'. Default value is 24 hours",
+    )
+    parser.add_argument(
+        "-input_index",
+        required=False,
+        default=None,
+        help="File where the listings of the directories of the input files are "
+        "saved between runs. Directories not modified since the previous run "
+        "are not listed again",
+    )
     parser.add_argument(
         "-file_min_size",
         required=False,
@@ -166,6 +249,42 @@ def init_args_parser():
         "Default value is 2 hours. Option only for realtime processing",
     )
 
+    # near real time processing
+    parser.add_argument(
+        "--watch",
+        required=False,
+        action="store_true",
+        default=False,
+        help="Near real time mode: watch the input directories and process the "
+        "input files of the day as they arrive. The data are appended to the "
+        "output file. Files are processed once their size is larger than "
+        "'-file_min_size' and has not changed for '-watch_settle' seconds",
+    )
+    parser.add_argument(
+        "-watch_interval",
+        required=False,
+        type=int,
+        default=watch.DEFAULT_INTERVAL,
+        help="Maximum time in seconds between two scans of the input directories "
+        "in watch mode",
+    )
+    parser.add_argument(
+        "-watch_settle",
+        required=False,
+        type=int,
+        default=watch.DEFAULT_SETTLE_TIME,
+        help="Time in seconds without modification of an input file before it is "
+        "processed in watch mode",
+    )
+    parser.add_argument(
+        "-watch_grace",
+        required=False,
+        type=int,
+        default=60,
+        help="Time in minutes after the end of the day during which the input "
+        "files are still watched. Default value is 60 minutes",
+    )
+
     # reprocessing filter dates
     parser.add_argument(
         "--filter-day",
@@ -174,6 +293,16 @@ def init_args_parser():
         default=False,
         help="Only keep timesteps of the processed day in output file",
     )
+    parser.add_argument(
+        "-split_minutes",
+        required=False,
+        type=check_split_minutes,
+        default=0,
+        help="Split the output into files of SPLIT_MINUTES minutes of data from "
+        "midnight of the processed day. The name of each file is the output file "
+        "name formatted with the start time of its data (strftime format, e.g. "
+        "cl61_%%Y%%m%%d_%%H%%M.nc)",
+    )
 
     # logs related arguments
     parser.add_argument(
@@ -196,6 +325,21 @@ def init_args_parser():
         default="info",
         help="Level of verbose in the terminal",
     )
+    parser.add_argument(
+        "--async-log",
+        required=False,
+        action="store_true",
+        default=False,
+        help="Write logs in a background thread. Useful when the log file is "
+        "on a network filesystem",
+    )
+    parser.add_argument(
+        "-log_queue_size",
+        required=False,
+        type=int,
+        default=10_000,
+        help="Maximum number of log records waiting to be written with --async-log",
+    )
 
     return parser
 
@@ -215,17 +359,81 @@ def get_input_args(argv):
         print("\n", exc.argument)
         sys.exit(1)
 
-    # check input file
-    list_input = check_input_file_size(
-        [f for f in chain.from_iterable(parse_args.input_file)],
-        parse_args.file_min_size,
-    )
+    # select input files by the date in their name
+    date_filter = None
+    if parse_args.input_date_format is not None:
+        try:
+            date_filter = file_discovery.DateFilter(
+                parse_args.input_date_format,
+                parse_args.date,
+                dt.timedelta(hours=parse_args.input_date_margin),
+            )
+        except ValueError as exc:
+            parser.error(f"argument -input_date_format: {exc}")
+
+    # listing of the directories saved between runs
+    index = None
+    if parse_args.input_index is not None:
+        index = file_discovery.load_index(parse_args.input_index)
+
+    # in watch mode the input files are found while they arrive
+    if parse_args.watch and parse_args.products:
+        parser.error("argument --watch: not allowed with argument -product")
+    if parse_args.watch and output_stream.is_stream(parse_args.output_file):
+        parser.error("argument --watch: the output has to be a file")
 
-    if len(list_input) == 0:
+    # check input file
+    list_input = []
+    if not parse_args.watch:
+        try:
+            list_input = find_input_files(
+                parse_args.input_file, parse_args.file_min_size, date_filter, index
+            )
+        except argparse.ArgumentTypeError as exc:
+            parser.error(f"argument input_file: {exc}")
+
+    if len(list_input) == 0 and not parse_args.watch:
         err_msg = "CRITICAL - 102 No Usable data in any file. Quitting raw2l1"
         print(err_msg)
         sys.exit(1)
 
+    # check additional products
+    list_products = []
+    for conf_file, input_files, output_file in parse_args.products:
+        try:
+            product = {
+                "conf": argparse.FileType("r")(conf_file),
+                "input": find_input_files(
+                    [input_files], parse_args.file_min_size, date_filter, index
+                ),
+                "output": check_output_dir(output_file),
+            }
+        except argparse.ArgumentTypeError as exc:
+            print("\n", exc)
+            sys.exit(1)
+
+        list_products.append(product)
+
+    if index is not None:
+        try:
+            file_discovery.save_index(parse_args.input_index, index)
+        except OSError as exc:
+            print("WARNING - unable to save index of input directories:", exc)
+
+    # check additional outputs
+    list_outputs = []
+    for conf_file, output_file in parse_args.outputs:
+        try:
+            output = {
+                "conf": argparse.FileType("r")(conf_file),
+                "output": check_output_dir(output_file),
+            }
+        except argparse.ArgumentTypeError as exc:
+            print("\n", exc)
+            sys.exit(1)
+
+        list_outputs.append(output)
+
     # check ancillary files
     print("parse : ", parse_args.ancillary)
     list_anc = []
@@ -239,14 +447,25 @@ def get_input_args(argv):
     input_args["input"] = list_input
     input_args["output"] = parse_args.output_file
     input_args["ancillary"] = list_anc
+    input_args["products"] = list_products
+    input_args["outputs"] = list_outputs
     input_args["log"] = parse_args.log
     input_args["log_level"] = parse_args.log_level
     input_args["verbose"] = parse_args.v
+    input_args["log_async"] = parse_args.async_log
+    input_args["log_queue_size"] = parse_args.log_queue_size
     input_args["filter_day"] = parse_args.filter_day
+    input_args["split_minutes"] = parse_args.split_minutes
 
     # real time
     input_args["input_min_size"] = parse_args.file_min_size
     input_args["input_check_time"] = parse_args.check_timeliness
     input_args["input_max_age"] = dt.timedelta(hours=parse_args.file_max_age)
+    input_args["input_patterns"] = parse_args.input_file
+    input_args["input_date_filter"] = date_filter
+    input_args["watch"] = parse_args.watch
+    input_args["watch_interval"] = parse_args.watch_interval
+    input_args["watch_settle_time"] = parse_args.watch_settle
+    input_args["watch_grace"] = dt.timedelta(minutes=parse_args.watch_grace)
 
     return input_args
@@ -0,0 +1,374 @@
+"""
+Vectorized conversion between CF time values and dates.
+
+For the standard, gregorian and proleptic_gregorian calendars, time values
+expressed in days, hours, minutes, seconds, milliseconds or microseconds since
+a reference date are converted using numpy datetime64 arithmetic on the whole
+array. The other cases (other calendars, dates before the gregorian
+reform, masked values, ...) are converted by cftime through the netCDF4
+module.
+
+Dates are handled with a precision of one microsecond.
+
+The module also composes dates from broken-down time fields (year, month,
+day, ...) as stored by some instruments.
+"""
+
+import datetime as dt
+import re
+
+import netCDF4 as nc
+import numpy as np
+
+# calendars handled with numpy arithmetic
+STANDARD_CALENDARS = ("standard", "gregorian", "proleptic_gregorian")
+
+# first day of the gregorian calendar. Before it, the standard calendar is julian
+GREGORIAN_START = np.datetime64("1582-10-15", "us")
+
+DATE_UNIT = "us"
+ONE_US = dt.timedelta(microseconds=1)
+UNIX_EPOCH = np.datetime64("1970-01-01", DATE_UNIT)
+
+# number of microseconds in each time unit
+UNITS_US = {
+    "days": 86_400_000_000,
+    "hours": 3_600_000_000,
+    "minutes": 60_000_000,
+    "seconds": 1_000_000,
+    "milliseconds": 1_000,
+    "microseconds": 1,
+}
+
+UNITS_ALIASES = {
+    "day": "days",
+    "d": "days",
+    "hour": "hours",
+    "hr": "hours",
+    "h": "hours",
+    "minute": "minutes",
+    "min": "minutes",
+    "second": "seconds",
+    "sec": "seconds",
+    "s": "seconds",
+    "millisecond": "milliseconds",
+    "msec": "milliseconds",
+    "ms": "milliseconds",
+    "microsecond": "microseconds",
+    "usec": "microseconds",
+    "us": "microseconds",
+}
+
+UNITS_RE = re.compile(
+    r"^\s*(?P<unit>\w+)\s+since\s+"
+    r"(?P<year>\d{1,4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})"
+    r"(?:[T\s]+(?P<hour>\d{1,2}):(?P<minute>\d{1,2})"
+    r"(?::(?P<second>\d{1,2})(?:\.(?P<fraction>\d{1,6})\d*)?)?)?"
+    r"\s*(?P<tz>Z|UTC|[+-]00:?00|[+-]0)?\s*$",
+    re.IGNORECASE,
+)
+
+
+def parse_units(units, calendar="standard"):
+    """
+    Analyse CF time units.
+
+    Parameters
+    ----------
+    units : str
+        The CF time units (e.g. 'seconds since 1970-01-01 00:00:00').
+    calendar : str, optional
+        The CF calendar.
+
+    Returns
+    -------
+    int
+        Number of microseconds in the time unit.
+    numpy.datetime64
+        Reference date.
+
+    None is returned if the units or the calendar can not be converted with
+    numpy arithmetic.
+
+    """
+    if calendar.lower() not in STANDARD_CALENDARS:
+        return None
+
+    match = UNITS_RE.match(units)
+    if match is None:
+        return None
+
+    unit = match.group("unit").lower()
+    unit = UNITS_ALIASES.get(unit, unit)
+    if unit not in UNITS_US:
+        return None
+
+    fields = {
+        key: int(match.group(key) or 0)
+        for key in ["year", "month", "day", "hour", "minute", "second"]
+    }
+    fields["microsecond"] = int((match.group("fraction") or "0").ljust(6, "0"))
+
+    try:
+        epoch = np.datetime64(dt.datetime(**fields), DATE_UNIT)
+    except ValueError:
+        return None
+
+    if calendar.lower() != "proleptic_gregorian" and epoch < GREGORIAN_START:
+        return None
+
+    return UNITS_US[unit], epoch
+
+
+def get_offsets(dates, epoch):
+    """
+    Compute the number of microseconds between dates and a reference date.
+
+    Parameters
+    ----------
+    dates : array_like of datetime.datetime or numpy.datetime64
+        The dates.
+    epoch : numpy.datetime64
+        The reference date.
+
+    Returns
+    -------
+    numpy.ndarray of int64 or None
+        The offsets. None if some dates can not be converted (missing dates,
+        dates with a timezone, ...).
+
+    """
+    if np.ma.is_masked(dates):
+        return None
+
+    dates = np.asarray(np.ma.getdata(dates))
+
+    if dates.dtype.kind == "M":
+        dates = dates.astype(f"datetime64[{DATE_UNIT}]")
+        if np.any(np.isnat(dates)):
+            return None
+
+        return (dates - epoch).astype(np.int64)
+
+    # arithmetic on the datetime objects is faster than a conversion of the
+    # array to datetime64
+    try:
+        offsets = (dates.astype(object) - epoch.astype(object)) // ONE_US
+        return np.asarray(offsets).astype(np.int64)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def to_datetime64(dates):
+    """
+    Convert dates to numpy.datetime64.
+
+    Parameters
+    ----------
+    dates : array_like of datetime.datetime or numpy.datetime64
+        The dates to convert.
+
+    Returns
+    -------
+    numpy.ndarray of datetime64[us] or None
+        The converted dates. None if some dates can not be converted.
+
+    """
+    offsets = get_offsets(dates, UNIX_EPOCH)
+    if offsets is None:
+        return None
+
+    return UNIX_EPOCH + offsets.astype(f"timedelta64[{DATE_UNIT}]")
+
+
+def date2num(dates, units, calendar="standard"):
+    """
+    Convert dates to CF time values.
+
+    Parameters
+    ----------
+    dates : array_like of datetime.datetime or numpy.datetime64
+        The dates to convert.
+    units : str
+        The CF time units.
+    calendar : str, optional
+        The CF calendar.
+
+    Returns
+    -------
+    numpy.ndarray
+        The time values. Integers are returned when all values are integers
+        as done by cftime.
+
+    """
+    parsed = parse_units(units, calendar)
+    if parsed is None:
+        return nc.date2num(dates, units=units, calendar=calendar)
+
+    factor, epoch = parsed
+    offsets = get_offsets(dates, epoch)
+    if offsets is None or (
+        calendar.lower() != "proleptic_gregorian"
+        and offsets.size > 0
+        and epoch + np.timedelta64(offsets.min(), DATE_UNIT) < GREGORIAN_START
+    ):
+        return nc.date2num(dates, units=units, calendar=calendar)
+
+    if np.all(offsets % factor == 0):
+        return offsets // factor
+
+    return offsets / factor
+
+
+def num2date(values, units, calendar="standard"):
+    """
+    Convert CF time values to dates.
+
+    Parameters
+    ----------
+    values : array_like of int or float
+        The time values.
+    units : str
+        The CF time units.
+    calendar : str, optional
+        The CF calendar.
+
+    Returns
+    -------
+    numpy.ndarray
+        The dates as datetime64[us]. When the values can not be converted
+        with numpy arithmetic, the datetime.datetime (or cftime dates for
+        non standard calendars) returned by cftime.
+
+    """
+    parsed = parse_units(units, calendar)
+    if parsed is None or np.ma.is_masked(values):
+        return nc.num2date(
+            values, units=units, calendar=calendar, only_use_cftime_datetimes=False
+        )
+
+    factor, epoch = parsed
+    values = np.asarray(np.ma.getdata(values))
+    if np.issubdtype(values.dtype, np.integer):
+        offsets = values.astype(np.int64) * factor
+    elif not np.all(np.isfinite(values)):
+        return nc.num2date(
+            values, units=units, calendar=calendar, only_use_cftime_datetimes=False
+        )
+    else:
+        # same rounding as cftime: scaling in extended precision and values
+        # at 1 microsecond of a second are rounded to the second
+        scaled = values.astype(np.longdouble) * factor
+        offsets = np.rint(scaled).astype(np.int64)
+        if factor > UNITS_US["milliseconds"]:
+            offsets = np.where(
+                offsets % 1_000_000 == 1, np.floor(scaled).astype(np.int64), offsets
+            )
+            offsets = np.where(
+                offsets % 1_000_000 == 999_999,
+                np.ceil(scaled).astype(np.int64),
+                offsets,
+            )
+
+    dates = epoch + offsets.astype(f"timedelta64[{DATE_UNIT}]")
+
+    if (
+        calendar.lower() != "proleptic_gregorian"
+        and dates.size > 0
+        and dates.min() < GREGORIAN_START
+    ):
+        return nc.num2date(
+            values, units=units, calendar=calendar, only_use_cftime_datetimes=False
+        )
+
+    return dates
+
+
+def from_components(year, month, day, hour=0, minute=0, second=0, microsecond=0):
+    """
+    Compose dates from broken-down time fields.
+
+    Parameters
+    ----------
+    year, month, day : array_like of int or float
+        The date fields.
+    hour, minute, second, microsecond : array_like of int or float, optional
+        The time fields.
+
+    Returns
+    -------
+    numpy.ndarray of datetime64[us]
+        The dates. Float fields are truncated as done by `int`.
+
+    Raises
+    ------
+    ValueError
+        If a field is outside of its valid range (e.g. 31 for the day in
+        June) as done by datetime.datetime.
+
+    """
+    fields = np.broadcast_arrays(
+        *[
+            np.asarray(np.ma.getdata(field)).astype(np.int64)
+            for field in [year, month, day, hour, minute, second, microsecond]
+        ]
+    )
+    year, month, day, hour, minute, second, microsecond = fields
+
+    if not (
+        np.all((year >= 1) & (year <= 9999))
+        and np.all((month >= 1) & (month <= 12))
+        and np.all((hour >= 0) & (hour <= 23))
+        and np.all((minute >= 0) & (minute <= 59))
+        and np.all((second >= 0) & (second <= 59))
+        and np.all((microsecond >= 0) & (microsecond <= 999_999))
+    ):
+        raise ValueError("time field out of range")
+
+    months = (year - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (
+        month - 1
+    ).astype("timedelta64[M]")
+    days_in_month = ((months + 1).astype("datetime64[D]") - months).astype(np.int64)
+    if not np.all((day >= 1) & (day <= days_in_month)):
+        raise ValueError("day is out of range for month")
+
+    return (
+        months.astype(f"datetime64[{DATE_UNIT}]")
+        + (day - 1).astype("timedelta64[D]")
+        + hour.astype("timedelta64[h]")
+        + minute.astype("timedelta64[m]")
+        + second.astype("timedelta64[s]")
+        + microsecond.astype(f"timedelta64[{DATE_UNIT}]")
+    )
+
+
+def to_components(dates):
+    """
+    Split dates into broken-down time fields.
+
+    Parameters
+    ----------
+    dates : array_like of datetime.datetime or numpy.datetime64
+        The dates.
+
+    Returns
+    -------
+    dict of numpy.ndarray of int64
+        The year, month, day, hour, minute, second and microsecond fields.
+
+    """
+    dates = np.asarray(dates, dtype=f"datetime64[{DATE_UNIT}]")
+
+    months = dates.astype("datetime64[M]")
+    days = dates.astype("datetime64[D]")
+    time_of_day = (dates - days).astype(np.int64)
+
+    return {
+        "year": dates.astype("datetime64[Y]").astype(np.int64) + 1970,
+        "month": months.astype(np.int64) % 12 + 1,
+        "day": (days - months).astype(np.int64) + 1,
+        "hour": time_of_day // UNITS_US["hours"],
+        "minute": time_of_day % UNITS_US["hours"] // UNITS_US["minutes"],
+        "second": time_of_day % UNITS_US["minutes"] // UNITS_US["seconds"],
+        "microsecond": time_of_day % UNITS_US["seconds"],
+    }
@@ -53,7 +53,7 @@ def check_nc4_compression_option(conf, section, logger):
             " authorized values for %s option in %s section is %s. Option set to false"
         )
         logger.error(msg % (opt, section, repr(common.ALLOW_NC4_COMP)))
-        conf.set(opt, section, "false")
+        conf.set(section, opt, "false")
 
     # check if compression level is present
     opt = "netcdf4_compression_level"
@@ -65,14 +65,24 @@ def check_nc4_compression_option(conf, section, logger):
     try:
         val = conf.getint(section, opt)
     except ValueError:
-        logger.error(
-            err_msg % (conf_file, opt, section, repr(common.ALLOW_NC4_COMP_LEVEL))
-        )
+        val = None
 
     if val not in common.ALLOW_NC4_COMP_LEVEL:
         logger.error(
             err_msg % (conf_file, opt, section, repr(common.ALLOW_NC4_COMP_LEVEL))
         )
+        conf.set(section, opt, "4")
+
+    # check codec and shuffle filter values
+    for opt, allowed, default in [
+        ("netcdf4_codec", common.ALLOW_NC4_CODEC, "zlib"),
+        ("netcdf4_shuffle", common.ALLOW_NC4_SHUFFLE, "true"),
+    ]:
+        if conf.has_option(section, opt) and conf.get(section, opt) not in allowed:
+            msg = "107 Error Reading config file '%s' authorized values for %s "
+            msg += "option in %s section are %s. Option set to %s"
+            logger.error(msg, conf_file, opt, section, repr(allowed), default)
+            conf.set(section, opt, default)
 
 
 def check_conf_options(conf, logger):
@@ -114,3 +124,32 @@ def check_conf(conf, logger):
         sys.exit(3)
 
     return conf
+
+
+def check_same_reader(conf, output_conf, logger):
+    """
+    Check that the configuration of an additional output file uses the same
+    reader and reader configuration as the main configuration
+    """
+
+    conf_file = output_conf.get("conf", "conf").name
+
+    for option in ["reader_dir", "reader"]:
+        if conf.get("conf", option) != output_conf.get("conf", option):
+            logger.critical(
+                "107 %s option in [conf] section of '%s' is not the one of the "
+                "main configuration file",
+                option,
+                conf_file,
+            )
+            sys.exit(3)
+
+    if dict(conf.items("reader_conf")) != dict(output_conf.items("reader_conf")):
+        logger.critical(
+            "107 [reader_conf] section of '%s' is not the one of the main "
+            "configuration file",
+            conf_file,
+        )
+        sys.exit(3)
+
+    return output_conf
@@ -0,0 +1,101 @@
+"""
+Growable arrays for readers decoding data messages in a single pass.
+
+The readers of text files do not know the number of data messages before
+decoding the files. Instead of counting the messages in a first reading of
+the files, the time dependent variables are stored in a `ColumnBuffer`. Its
+arrays grow along the time dimension (amortized doubling) and the new rows are
+filled with the missing value of the variable. Once all the files are decoded,
+`finalize` returns the arrays with the number of time steps read.
+
+A `ColumnBuffer` is a dict: the readers keep writing the data in the arrays
+with `data[name][ind] = value` and can store other values (scalars, dimensions)
+in it.
+"""
+
+import numpy as np
+
+# number of time steps allocated at first
+DEFAULT_CAPACITY = 1024
+
+
+class ColumnBuffer(dict):
+    """
+    Dict of arrays growing along their first (time) dimension.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Number of time steps allocated at first.
+
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        super().__init__()
+        self.capacity = max(int(capacity), 1)
+        self.columns = {}
+
+    def add_column(self, name, dtype, fill_value, shape=()):
+        """
+        Add a time dependent variable.
+
+        Parameters
+        ----------
+        name : str
+            Name of the variable.
+        dtype : data-type
+            Type of the array.
+        fill_value : scalar
+            Value of the rows not written.
+        shape : tuple of int, optional
+            Shape of one time step of the variable.
+
+        """
+        self.columns[name] = (tuple(shape), dtype, fill_value)
+        self[name] = np.full((self.capacity, *shape), fill_value, dtype=dtype)
+
+    def reserve(self, size):
+        """
+        Make sure the arrays have at least `size` time steps.
+
+        Parameters
+        ----------
+        size : int
+            Number of time steps needed.
+
+        """
+        if size <= self.capacity:
+            return
+
+        new_capacity = max(size, 2 * self.capacity)
+        for name, (shape, dtype, fill_value) in self.columns.items():
+            array = np.full((new_capacity, *shape), fill_value, dtype=dtype)
+            array[: self.capacity] = self[name]
+            self[name] = array
+
+        self.capacity = new_capacity
+
+    def finalize(self, size):
+        """
+        Get the data read.
+
+        Parameters
+        ----------
+        size : int
+            Number of time steps read.
+
+        Returns
+        -------
+        dict
+            All the values of the buffer. The arrays of the time dependent
+            variables are contiguous and have `size` time steps.
+
+        """
+        self.reserve(size)
+
+        data = dict(self)
+        for name in self.columns:
+            # copy to release the memory allocated in advance
+            data[name] = self[name][:size].copy()
+
+        return data
@@ -21,6 +21,26 @@ CONF_OPTIONS = ["reader_dir", "reader", "netcdf_format"]
 ALLOW_NC_FMT = ["NETCDF3_CLASSIC", "NETCDF4"]
 ALLOW_NC4_COMP = ["true", "false"]
 ALLOW_NC4_COMP_LEVEL = list(range(1, 10))
+ALLOW_NC4_CODEC = [
+    "zlib",
+    "zstd",
+    "bzip2",
+    "szip",
+    "blosc_lz",
+    "blosc_lz4",
+    "blosc_lz4hc",
+    "blosc_zlib",
+    "blosc_zstd",
+]
+ALLOW_NC4_SHUFFLE = ["true", "false"]
+
+# options of variables sections starting with this prefix are netCDF4
+# storage options and not attributes
+NC4_OPTION_PREFIX = "netcdf4_"
+
+# options of variables sections starting with this prefix define the packing
+# of the variable into integers and are not attributes
+PACK_OPTION_PREFIX = "pack_"
 
 # Default value for missing and _FillValue if not define in reader_conf section
 MISSING_FLOAT = -999.0
@@ -4,6 +4,7 @@
 
 import configparser
 import logging
+import os
 
 
 def add(conf, input_args, version, logger):
@@ -23,14 +24,30 @@ def add(conf, input_args, version, logger):
     return conf
 
 
-def init(input_args, version, logger):
+def read(conf_file):
     """
-    Load and check the INI configuration file
+    Read the INI configuration from an opened file, a filename or a dictionnary
+    of sections
     """
 
     conf = configparser.RawConfigParser()
     conf.optionxform = str
-    conf.read(input_args["conf"].name)
+    if isinstance(conf_file, dict):
+        conf.read_dict(conf_file)
+    elif isinstance(conf_file, str | os.PathLike):
+        conf.read(conf_file)
+    else:
+        conf.read(conf_file.name)
+
+    return conf
+
+
+def init(input_args, version, logger):
+    """
+    Load and check the INI configuration file
+    """
+
+    conf = read(input_args["conf"])
 
     # TODO: Add a function to check available values once format is fixed
 
@@ -43,7 +60,7 @@ def init(input_args, version, logger):
         logger.debug("raw2l1 configuration")
         for section in conf.sections():
             for key, value in conf.items(section):
-                logger.debug("[" + section + "] " + key + " : " + repr(value))
+                logger.debug("[%s] %s : %r", section, key, value)
         logger.debug("end of configuration")
 
     return conf
@@ -3,6 +3,7 @@
 
 import configparser
 import datetime as dt
+import os
 import sys
 import tempfile
 from ast import literal_eval
@@ -11,7 +12,7 @@ import netCDF4 as nc
 import numpy as np
 import xarray as xr
 
-from tools import common
+from tools import cf_time, common
 from tools.read_overlap import read_overlap
 
 KEY_READERDATA = "$reader_data$"
@@ -28,9 +29,24 @@ KEYS_VALTYPE = {
     "default": np.float64,
 }
 
+# compression codec used if none is defined
+DEFAULT_CODEC = "zlib"
+
 ALMOST_ONE_dAY = dt.timedelta(hours=23, minutes=59, seconds=59)
 DATE_FMT = "%Y-%m-%d"
 
+# integer types of the packed variables
+PACK_TYPES = [np.int16, np.int32]
+# attributes defined by the packing of a variable
+PACK_ATTR = ["scale_factor", "add_offset", "missing_value"]
+
+# added to the output file name when the files are split and the name has no
+# date format
+SPLIT_DATE_FMT = "_%Y%m%d_%H%M"
+
+# initial size (bytes) of the netCDF files created in memory
+MEMORY_INITIAL_SIZE = 1024 * 1024
+
 
 def dim_to_tuple(dim):
     """
@@ -97,6 +113,66 @@ def filter_conf_sections(conf, logger):
     return list_sec
 
 
+def get_required_data_keys(conf, logger):
+    """
+    Get the keys of the data read which are used to create the netCDF file
+    """
+
+    conf_sections = common.CONF_SECTIONS + common.SPEC_SECTIONS
+    list_sec = [sec for sec in conf.sections() if sec not in conf_sections]
+
+    # dimensions, time and string variables can use the data of their name
+    required = set(list_sec)
+
+    for section in list_sec + ["global"]:
+        if not conf.has_section(section):
+            continue
+
+        for _, value in conf.items(section):
+            if isinstance(value, str) and KEY_READERDATA in value:
+                required.add(get_data_key(value))
+
+    logger.debug("%d data keys required to create netCDF file", len(required))
+
+    return required
+
+
+def get_data_types(conf, logger, data_types=None):
+    """
+    Get the numpy types of the netCDF variables written from the data read.
+    Types already found in other configurations can be given in data_types
+    """
+
+    conf_sections = common.CONF_SECTIONS + common.SPEC_SECTIONS
+
+    data_types = {} if data_types is None else dict(data_types)
+    for section in conf.sections():
+        if section in conf_sections:
+            continue
+        has_value = conf.has_option(section, "value")
+        if not (has_value and conf.has_option(section, "type")):
+            continue
+
+        value = conf.get(section, "value")
+        type_str = conf.get(section, "type")
+        if KEY_READERDATA not in value or type_str in ["$string$", "$time$"]:
+            continue
+        # unknown types are reported when the variable is created
+        val_type = KEYS_VALTYPE.get(type_str)
+        if val_type is None:
+            continue
+
+        # data written in several variables: use the most precise type
+        key = get_data_key(value)
+        if key in data_types:
+            val_type = np.promote_types(data_types[key], val_type).type
+        data_types[key] = val_type
+
+    logger.debug("types of %d data keys found in configuration", len(data_types))
+
+    return data_types
+
+
 def get_var_type(type_str, conf, logger):
     """
     Get numpy type based on type given conf file
@@ -125,8 +201,7 @@ def convert_attribute(value, logger):
 
     try:
         value = literal_eval(value)
-        msg = "converting attribute to %s"
-        logger.debug(msg % type(value))
+        logger.debug("converting attribute to %s", type(value))
     except (ValueError, SyntaxError):
         pass
 
@@ -213,7 +288,7 @@ def create_netcdf_dim(conf, data, nc_id, logger):
             pass
 
         if section not in common.CONF_SECTIONS and name == dim:
-            logger.debug("dimension found: " + section)
+            logger.debug("dimension found: %s", section)
 
             # case where dimensions have no values
             if conf.has_option(section, "size"):
@@ -273,9 +348,9 @@ def create_netcdf_time_var(conf, var_name, data, nc_id, logger):
         tmp_var_name = var_name
 
     if has_calendar:
-        nc_var[:] = nc.date2num(data[tmp_var_name], units=units, calendar=calendar)
+        nc_var[:] = cf_time.date2num(data[tmp_var_name], units, calendar)
     else:
-        nc_var[:] = nc.date2num(data[tmp_var_name], units=units)
+        nc_var[:] = cf_time.date2num(data[tmp_var_name], units)
 
     logger.debug("adding attributes to time variable")
     add_attr_to_var(nc_var, data, conf, var_name, logger)
@@ -283,17 +358,21 @@ def create_netcdf_time_var(conf, var_name, data, nc_id, logger):
     return None
 
 
-def add_data_to_var(nc_var, var_name, conf, data, logger):
+def add_data_to_var(nc_var, var_name, conf, data, logger, packing=None):
     """
-    add the values to a variables
+    add the values to a variables. Data of packed variables are converted
+    into integers
     """
 
     data_val = conf.get(var_name, "value")
     data_type = get_var_type(conf.get(var_name, "type"), conf, logger)
 
-    logger.debug("adding data to " + var_name)
-    logger.debug(str(data_type))
-    logger.debug(conf.get("conf", "netcdf_format"))
+    logger.debug(
+        "adding data to %s (%s, %s)",
+        var_name,
+        data_type,
+        conf.get("conf", "netcdf_format"),
+    )
     if KEY_READERDATA in data_val:
         # prevent problem with netCDF3 and strings
         if (
@@ -309,7 +388,10 @@ def add_data_to_var(nc_var, var_name, conf, data, logger):
         else:
             try:
                 data_key = get_data_key(data_val)
-                nc_var[:] = data[data_key]
+                if packing is None:
+                    nc_var[:] = data[data_key]
+                else:
+                    nc_var[:] = pack_values(data[data_key], packing, var_name, logger)
             except KeyError:
                 msg = "107 Error creating netCDF file '{}'".format(
                     format(conf.get("conf", "output"))
@@ -344,14 +426,19 @@ def add_data_to_var(nc_var, var_name, conf, data, logger):
     return None
 
 
-def add_attr_to_var(nc_var, data, conf, section, logger):
+def add_attr_to_var(nc_var, data, conf, section, logger, packing=None):
     """
-    add attribute to the variable of the netCDF file
+    add attribute to the variable of the netCDF file. The packing attributes
+    and the missing value of packed variables come from their packing
     """
 
     logger.debug("adding attributes to %s variable", section)
     for option, value in conf.items(section):
-        if option not in common.RESERV_ATTR:
+        if packing is not None and option in PACK_ATTR:
+            continue
+        if option not in common.RESERV_ATTR and not option.startswith(
+            (common.NC4_OPTION_PREFIX, common.PACK_OPTION_PREFIX)
+        ):
             # special case for missing value and _FillValue
             data_type = get_var_type(conf.get(section, "type"), conf, logger)
             if option == "missing_value" or option == "_FillValue":
@@ -391,9 +478,412 @@ def add_attr_to_var(nc_var, data, conf, section, logger):
             logger.debug("adding %s attribute %s", option, repr(value))
             setattr(nc_var, option, value)
 
+    # attributes of packed variables have the type of the data they apply to
+    if packing is not None:
+        nc_var.scale_factor = packing["scale_factor"]
+        nc_var.add_offset = packing["add_offset"]
+        if conf.has_option(section, "missing_value"):
+            nc_var.missing_value = packing["fill_value"]
+
     return None
 
 
+def get_nc4_option(conf, section, option):
+    """
+    Get the value of a netCDF4 storage option. Value defined in the section
+    of the variable overrides the one defined in the [conf] section
+    """
+
+    for sec in [section, "conf"]:
+        if conf.has_option(sec, option):
+            return conf.get(sec, option)
+
+    return None
+
+
+def get_chunks(value):
+    """
+    convert chunks option (`dim: size, dim: size`) into a dictionary
+    """
+
+    chunks = {}
+    for elt in value.split(","):
+        dim, size = elt.split(":")
+        chunks[dim.strip()] = int(size)
+
+    return chunks
+
+
+def codec_available(codec, nc_id):
+    """
+    check if the netCDF library used has the filter needed by a codec.
+    Unknown codecs are not available
+    """
+
+    if codec not in common.ALLOW_NC4_CODEC:
+        return False
+    if codec == "zlib":
+        return True
+
+    # blosc codecs are named blosc_lz4, blosc_zstd, ...
+    filter_name = codec.split("_")[0]
+    has_filter = getattr(nc_id, f"has_{filter_name}_filter", None)
+
+    return has_filter is not None and has_filter()
+
+
+def get_nc4_int_option(conf, section, option, allowed, logger):
+    """
+    Get an integer netCDF4 storage option of a variable. None is returned if
+    the option is not defined or if its value is not allowed (error logged)
+    """
+
+    value = get_nc4_option(conf, section, option)
+    if value is None:
+        return None
+
+    try:
+        value = int(value)
+    except ValueError:
+        value = None
+    if value is None or (allowed is not None and value not in allowed):
+        logger.error(
+            "107 Error Reading config file '%s' authorized values for %s option "
+            "are %s. Option ignored for %s",
+            conf.get("conf", "conf"),
+            option,
+            repr(allowed) if allowed is not None else "integers",
+            section,
+        )
+        # error is only logged once when the option is set in [conf]
+        opt_sec = section if conf.has_option(section, option) else "conf"
+        conf.remove_option(opt_sec, option)
+        return None
+
+    return value
+
+
+def get_var_chunksizes(chunks, var_dims, nc_id):
+    """
+    Define the chunk sizes of a variable. Dimensions without chunk size use
+    their full size. None is returned if an unlimited dimension has no chunk
+    size (the netCDF library default chunking is used)
+    """
+
+    if not any(dim in chunks for dim in var_dims):
+        return None
+
+    chunksizes = []
+    for dim in var_dims:
+        nc_dim = nc_id.dimensions[dim]
+        if dim in chunks:
+            size = chunks[dim]
+            if not nc_dim.isunlimited():
+                size = min(size, nc_dim.size)
+        elif nc_dim.isunlimited():
+            return None
+        else:
+            size = nc_dim.size
+        chunksizes.append(max(size, 1))
+
+    return chunksizes
+
+
+def get_storage_options(conf, section, val_type, nc_id, logger):
+    """
+    Define compression, chunking and quantization options of a netCDF4
+    variable
+    """
+
+    storage = {}
+    conf_file = conf.get("conf", "conf")
+
+    # compression
+    if get_nc4_option(conf, section, "netcdf4_compression") == "true":
+        codec = get_nc4_option(conf, section, "netcdf4_codec") or DEFAULT_CODEC
+        if not codec_available(codec, nc_id):
+            logger.error(
+                "107 Error Reading config file '%s' codec %s is unknown or not "
+                "available in netCDF library. Using %s for %s",
+                conf_file,
+                codec,
+                DEFAULT_CODEC,
+                section,
+            )
+            codec = DEFAULT_CODEC
+            # error is only logged once when the codec is set in [conf]
+            codec_sec = section if conf.has_option(section, "netcdf4_codec") else "conf"
+            conf.set(codec_sec, "netcdf4_codec", codec)
+        storage["compression"] = codec
+        level = get_nc4_int_option(
+            conf,
+            section,
+            "netcdf4_compression_level",
+            common.ALLOW_NC4_COMP_LEVEL,
+            logger,
+        )
+        storage["complevel"] = level if level is not None else 4
+        storage["shuffle"] = get_nc4_option(conf, section, "netcdf4_shuffle") != "false"
+
+    # chunking
+    chunks = get_nc4_option(conf, section, "netcdf4_chunks")
+    dim = conf.get(section, "dim")
+    if chunks is not None and dim != KEY_NODIM:
+        try:
+            chunksizes = get_var_chunksizes(
+                get_chunks(chunks), dim_to_tuple(dim), nc_id
+            )
+        except ValueError:
+            logger.error(
+                "107 Error Reading config file '%s' netcdf4_chunks has to be "
+                "defined as 'dim: size, dim: size'. Option ignored for %s",
+                conf_file,
+                section,
+            )
+            chunksizes = None
+        if chunksizes is not None:
+            storage["chunksizes"] = chunksizes
+
+    # quantization of floats
+    if val_type in [np.float32, np.float64]:
+        for option in ["significant_digits", "least_significant_digit"]:
+            value = get_nc4_int_option(conf, section, "netcdf4_" + option, None, logger)
+            if value is not None:
+                storage[option] = value
+
+    logger.debug("storage options of %s: %r", section, storage)
+
+    return storage
+
+
+def get_missing_values(conf, section):
+    """
+    Get the _FillValue and missing_value of a float variable
+    """
+
+    missing = []
+    for option in ["_FillValue", "missing_value"]:
+        if conf.has_option(section, option):
+            try:
+                missing.append(float(conf.get(section, option)))
+            except ValueError:
+                continue
+
+    return missing
+
+
+def get_invalid_values(values, missing):
+    """
+    Get the mask of the values which are missing: masked, not finite or equal
+    to one of the missing values
+    """
+
+    invalid = np.ma.getmaskarray(values) | ~np.isfinite(np.ma.getdata(values))
+    for value in missing:
+        invalid |= np.ma.getdata(values) == value
+
+    return invalid
+
+
+def fit_packing(v_min, v_max, precision, pack_type):
+    """
+    Get the scale_factor and add_offset packing the values from v_min to
+    v_max into the integer type with the given precision. The precision is
+    reduced if the range of values is too large
+    """
+
+    info = np.iinfo(pack_type)
+    # values from info.min + 1 to info.max are available
+    n_steps = int(info.max) - int(info.min) - 1
+    scale_factor = max(precision, (v_max - v_min) / n_steps)
+
+    return scale_factor, (v_min + v_max) / 2
+
+
+def get_packing(conf, section, val_type, data, logger):
+    """
+    Define the packing of a float variable into integers (pack_type option).
+
+    The scale_factor and add_offset are read in the section of the variable.
+    Otherwise they are computed from the range of the data so the precision
+    of the packed values is the one defined by the pack_precision option.
+    The lowest value of the integer type is the fill value of the variable.
+
+    Returns None if the variable is not packed
+    """
+
+    if not conf.has_option(section, "pack_type"):
+        return None
+
+    conf_file = conf.get("conf", "conf")
+    pack_type = KEYS_VALTYPE.get(conf.get(section, "pack_type"))
+    value = conf.get(section, "value") if conf.has_option(section, "value") else ""
+    if pack_type not in PACK_TYPES or val_type not in [np.float32, np.float64]:
+        logger.error(
+            "107 Error Reading config file '%s' only $float$ or $double$ variables "
+            "can be packed into $short$ or $integer$. %s is not packed",
+            conf_file,
+            section,
+        )
+        return None
+    if KEY_READERDATA not in value:
+        logger.error(
+            "107 Error Reading config file '%s' only data read can be packed. "
+            "%s is not packed",
+            conf_file,
+            section,
+        )
+        return None
+
+    info = np.iinfo(pack_type)
+    packing = {
+        "type": pack_type,
+        "fill_value": pack_type(info.min),
+        "missing": get_missing_values(conf, section),
+    }
+
+    if conf.has_option(section, "scale_factor"):
+        try:
+            scale_factor = float(conf.get(section, "scale_factor"))
+            add_offset = 0.0
+            if conf.has_option(section, "add_offset"):
+                add_offset = float(conf.get(section, "add_offset"))
+        except ValueError:
+            logger.error(
+                "107 Error Reading config file '%s' scale_factor and add_offset "
+                "of %s have to be numbers. %s is not packed",
+                conf_file,
+                section,
+                section,
+            )
+            return None
+    elif conf.has_option(section, "pack_precision"):
+        try:
+            scale_factor = float(conf.get(section, "pack_precision"))
+        except ValueError:
+            logger.error(
+                "107 Error Reading config file '%s' pack_precision of %s has to "
+                "be a number. %s is not packed",
+                conf_file,
+                section,
+                section,
+            )
+            return None
+        try:
+            values = data[get_data_key(value)]
+        except KeyError:
+            # error reported when the data are added to the variable
+            return None
+        invalid = get_invalid_values(values, packing["missing"])
+        valid = np.ma.getdata(values)[~invalid]
+        add_offset = 0.0
+        if valid.size > 0:
+            precision = scale_factor
+            scale_factor, add_offset = fit_packing(
+                float(valid.min()), float(valid.max()), precision, pack_type
+            )
+            if scale_factor > precision:
+                logger.warning(
+                    "107 range of %s too large to be packed with a precision of "
+                    "%s. Precision used: %g",
+                    section,
+                    conf.get(section, "pack_precision"),
+                    scale_factor,
+                )
+    else:
+        logger.error(
+            "107 Error Reading config file '%s' scale_factor or pack_precision "
+            "option needed to pack %s. %s is not packed",
+            conf_file,
+            section,
+            section,
+        )
+        return None
+
+    # attributes have the type of the unpacked data
+    packing["scale_factor"] = val_type(scale_factor)
+    packing["add_offset"] = val_type(add_offset)
+    logger.debug("packing of %s: %r", section, packing)
+
+    return packing
+
+
+def pack_values(values, packing, section, logger):
+    """
+    Convert float values into the integers of a packed variable. Values which
+    cannot be represented get the fill value
+    """
+
+    info = np.iinfo(packing["type"])
+    invalid = get_invalid_values(values, packing["missing"])
+    # computed in double precision to keep the precision of int32 values
+    values = np.ma.getdata(values).astype(np.float64)
+    packed = np.round((values - packing["add_offset"]) / packing["scale_factor"])
+    with np.errstate(invalid="ignore"):
+        out_range = ~invalid & ((packed <= info.min) | (packed > info.max))
+    if np.any(out_range):
+        logger.warning(
+            "107 %d values of %s out of the range of packed values are missing",
+            np.count_nonzero(out_range),
+            section,
+        )
+
+    packed[invalid | out_range] = packing["fill_value"]
+
+    return packed.astype(packing["type"])
+
+
+def get_var_packing(nc_var):
+    """
+    Get the packing of a variable of a netCDF file from its attributes, as
+    defined by get_packing. None if the variable is not packed
+    """
+
+    attrs = nc_var.ncattrs()
+    if not np.issubdtype(nc_var.dtype, np.integer) or not (
+        "scale_factor" in attrs or "add_offset" in attrs
+    ):
+        return None
+
+    pack_type = nc_var.dtype.type
+    fill_value = np.iinfo(pack_type).min
+    if "_FillValue" in attrs:
+        fill_value = nc_var.getncattr("_FillValue")
+
+    return {
+        "type": pack_type,
+        "fill_value": pack_type(fill_value),
+        "missing": [],
+        "scale_factor": float(getattr(nc_var, "scale_factor", 1.0)),
+        "add_offset": float(getattr(nc_var, "add_offset", 0.0)),
+    }
+
+
+def get_values_to_write(in_var, out_var, logger, index=Ellipsis):
+    """
+    Get the values of a netCDF variable (or of the part selected by `index`)
+    to copy in the variable of another file. If the output variable is
+    packed, its masking and scaling are disabled and the values are returned
+    as its integers: the integers of the input variable if the packing is
+    the same, otherwise the values packed again with the packing of the
+    output variable
+    """
+
+    out_packing = get_var_packing(out_var)
+    if out_packing is None:
+        return in_var[index]
+
+    out_var.set_auto_maskandscale(False)
+    if get_var_packing(in_var) == out_packing:
+        in_var.set_auto_maskandscale(False)
+        values = in_var[index]
+        in_var.set_auto_maskandscale(True)
+        return values
+
+    logger.debug("%s packed again with the packing of the file", in_var.name)
+    return pack_values(in_var[index], out_packing, in_var.name, logger)
+
+
 def create_netcdf_variables(conf, data, nc_id, logger):
     """
     create netCDF variable and add attributes found in
@@ -403,15 +893,14 @@ def create_netcdf_variables(conf, data, nc_id, logger):
     # loop only over sections concerning the netCDf file
     for section in filter_conf_sections(conf, logger):
         var_name = section
-        logger.debug("variable " + var_name)
         dim = conf.get(section, "dim")
-        logger.debug("dimension " + dim)
+        logger.debug("variable %s, dimension %s", var_name, dim)
 
         # if variable has no type is it only a dimension
         # so we don't create the variable
         try:
             val_type = get_var_type(conf.get(section, "type"), conf, logger)
-            logger.debug("type " + repr(val_type))
+            logger.debug("type %r", val_type)
         except configparser.NoOptionError:
             continue
 
@@ -421,13 +910,11 @@ def create_netcdf_variables(conf, data, nc_id, logger):
         else:
             fill_value = None
 
-        # define variable in case user chose compression:
+        # define compression, chunking and quantization of the variable
         if conf.get("conf", "netcdf_format") == "NETCDF4" and val_type != "string":
-            comp = conf.get("conf", "netcdf4_compression")
-            comp_level = conf.getint("conf", "netcdf4_compression_level")
+            storage = get_storage_options(conf, section, val_type, nc_id, logger)
         else:
-            comp = False
-            comp_level = 0
+            storage = {}
 
         # create time variable
         if conf.get(section, "type") == "$time$":
@@ -464,27 +951,34 @@ def create_netcdf_variables(conf, data, nc_id, logger):
                 logger.critical(msg % var_name)
                 sys.exit(1)
 
+        # packing of float variables into integers
+        packing = get_packing(conf, section, val_type, data, logger)
+        if packing is not None:
+            val_type = packing["type"]
+            fill_value = packing["fill_value"]
+            # quantization only applies to floats
+            for option in ["significant_digits", "least_significant_digit"]:
+                storage.pop(option, None)
+
         if dim == KEY_NODIM:
             nc_var = nc_id.createVariable(
                 var_name,
                 val_type,
-                zlib=comp,
-                complevel=comp_level,
                 fill_value=fill_value,
+                **storage,
             )
         else:
             nc_var = nc_id.createVariable(
                 var_name,
                 val_type,
                 dim_to_tuple(dim),
-                zlib=comp,
-                complevel=comp_level,
                 fill_value=fill_value,
+                **storage,
             )
 
         # Add values to the variable
         if conf.has_option(var_name, "value"):
-            add_data_to_var(nc_var, var_name, conf, data, logger)
+            add_data_to_var(nc_var, var_name, conf, data, logger, packing)
         else:
             msg = "107 Error creating netCDF file '{}'".format(
                 conf.get("conf", "output")
@@ -494,7 +988,145 @@ def create_netcdf_variables(conf, data, nc_id, logger):
             logger.error(msg)
 
         # add attributes to the variable
-        add_attr_to_var(nc_var, data, conf, section, logger)
+        add_attr_to_var(nc_var, data, conf, section, logger, packing)
+
+    return None
+
+
+def get_time_section(conf, logger):
+    """
+    Get the section of the time variable, which is also the unlimited
+    dimension. None if there is none
+    """
+
+    for section in filter_conf_sections(conf, logger):
+        if (
+            conf.has_option(section, "type")
+            and conf.get(section, "type") == "$time$"
+            and conf.get(section, "dim") == section
+        ):
+            return section
+
+    return None
+
+
+def get_time_axes(conf, data, logger):
+    """
+    Get the data key of the time and the axis of the time dimension of the
+    data written in each variable depending on time.
+
+    Returns (None, {}) if there is no time dimension in the configuration
+    """
+
+    time_section = get_time_section(conf, logger)
+    if time_section is None:
+        return None, {}
+
+    time_axes = {}
+    for section in filter_conf_sections(conf, logger):
+        if not (conf.has_option(section, "value") and conf.has_option(section, "dim")):
+            continue
+        value = conf.get(section, "value")
+        dims = dim_to_tuple(conf.get(section, "dim"))
+        if KEY_READERDATA in value and time_section in dims:
+            time_axes.setdefault(get_data_key(value), dims.index(time_section))
+    time_key = time_section
+    if time_key not in data:
+        time_key = get_data_key(conf.get(time_section, "value"))
+    time_axes[time_key] = 0
+
+    return time_key, time_axes
+
+
+def get_split_filename(output_file, start):
+    """
+    Name of the output file containing the data from `start`. The date format
+    SPLIT_DATE_FMT is added before the extension if the name has none
+    """
+
+    if "%" not in os.path.basename(output_file):
+        root, ext = os.path.splitext(output_file)
+        output_file = root + SPLIT_DATE_FMT + ext
+
+    return start.strftime(output_file)
+
+
+def split_data(conf, data, minutes, logger):
+    """
+    Split the data read in periods of `minutes` minutes from midnight of the
+    processed day.
+
+    The data written in variables depending on the time dimension are sliced
+    along this dimension. The other data are shared by all periods.
+
+    Returns a list of (start of the period, data of the period). Periods
+    without data are skipped
+    """
+
+    time_key, time_axes = get_time_axes(conf, data, logger)
+    if time_key is None:
+        logger.error("107 no time dimension in configuration. Output is not split")
+        return [(conf.get("conf", "date"), data)]
+
+    # index of the period of each time step. Time steps without valid date
+    # are not in any period
+    date = np.datetime64(conf.get("conf", "date"), cf_time.DATE_UNIT)
+    time = np.asarray(data[time_key], dtype=f"datetime64[{cf_time.DATE_UNIT}]")
+    valid = np.flatnonzero(~np.isnat(time))
+    if valid.size < time.size:
+        logger.warning(
+            "107 %d time steps without valid date not written in split files",
+            time.size - valid.size,
+        )
+    periods = (time[valid] - date) // np.timedelta64(minutes, "m")
+    sort_ind = np.argsort(periods, kind="stable")
+    order = valid[sort_ind]
+    list_periods, first = np.unique(periods[sort_ind], return_index=True)
+
+    parts = []
+    for period, index in zip(list_periods, np.split(order, first[1:]), strict=True):
+        part = dict(data)
+        for key, axis in time_axes.items():
+            if key not in data:
+                # error reported when the file is created
+                continue
+            values = data[key]
+            shape = np.shape(values)
+            if len(shape) <= axis or shape[axis] != time.size:
+                # broadcasted along the time dimension
+                logger.debug("%s not split: shape %r", key, shape)
+                continue
+            part[key] = np.take(values, index, axis=axis)
+
+        start = conf.get("conf", "date") + dt.timedelta(minutes=int(period) * minutes)
+        parts.append((start, part))
+
+    logger.info("data split in %d files of %d minutes", len(parts), minutes)
+
+    return parts
+
+
+def write_netcdf(conf, data, nc_id, logger):
+    """
+    Write the global attributes, dimensions and variables defined in the
+    configuration in an opened netCDF file
+    """
+
+    # write global attributes in netCDF file
+    # -------------------------------------------------------------------------
+    logger.info("adding global attributes")
+    create_netcdf_global(conf, nc_id, data, logger)
+
+    # write dimension of the netCDF file
+    # -------------------------------------------------------------------------
+    logger.info("creating dimensions")
+    create_netcdf_dim(conf, data, nc_id, logger)
+
+    # write variables in netCDf file
+    # -------------------------------------------------------------------------
+    logger.info("creating variables")
+    logger.debug("creating time variable")
+    create_netcdf_variables(conf, data, nc_id, logger)
 
     return None
 
@@ -524,21 +1156,7 @@ def create_netcdf(conf, data, logger):
         logger.critical("quitting raw2l1")
         sys.exit(1)
 
-    # write global attributes in netCDF file
-    # -------------------------------------------------------------------------
-    logger.info("adding global attributes")
-    create_netcdf_global(conf, nc_id, data, logger)
-
-    # write dimension of the netCDF file
-    # -------------------------------------------------------------------------
-    logger.info("creating dimensions")
-    create_netcdf_dim(conf, data, nc_id, logger)
-
-    # write variables in netCDf file
-    # -------------------------------------------------------------------------
-    logger.info("creating variables")
-    logger.debug("creating time variable")
-    create_netcdf_variables(conf, data, nc_id, logger)
+    write_netcdf(conf, data, nc_id, logger)
 
     nc_id.close()
 
@@ -556,3 +1174,137 @@ def create_netcdf(conf, data, logger):
         data.close()
 
     return status
+
+
+def create_netcdf_memory(conf, data, logger):
+    """
+    Create the netCDF file in memory instead of on disk and return its content
+    (bytes). The output option of the configuration is only used as the name
+    of the file in the messages
+    """
+
+    output_file = conf.get("conf", "output")
+
+    logger.info("create netCDF file %s in memory", output_file)
+    try:
+        nc_id = nc.Dataset(
+            output_file,
+            "w",
+            format=conf.get("conf", "netcdf_format"),
+            memory=MEMORY_INITIAL_SIZE,
+        )
+    except OSError as err:
+        logger.critical("107 Error trying to create the netCDF file '%s'", output_file)
+        logger.critical(err)
+        logger.critical("quitting raw2l1")
+        sys.exit(1)
+
+    write_netcdf(conf, data, nc_id, logger)
+
+    content = bytes(nc_id.close())
+
+    # filter data if needed
+    # -------------------------------------------------------------------------
+    if conf.get("conf", "filter_day"):
+        date_start = conf.get("conf", "date")
+        logger.info("filtering data for %s", date_start.strftime(DATE_FMT))
+
+        # the netCDF file in memory is closed with the xarray dataset
+        nc_id = nc.Dataset(output_file, memory=content)
+        data = xr.open_dataset(xr.backends.NetCDF4DataStore(nc_id))
+        data = data.sel(time=slice(date_start, date_start + ALMOST_ONE_dAY))
+        content = bytes(data.to_netcdf())
+        data.close()
+
+    return content
+
+
+def append_netcdf(conf, data, logger):
+    """
+    Append the data read to an existing netCDF file along its unlimited (time)
+    dimension. The data are first written in a temporary file with the same
+    configuration
+    """
+
+    output_file = conf.get("conf", "output")
+    tmp_file = tempfile.NamedTemporaryFile(
+        suffix=".nc", dir=os.path.dirname(output_file), delete=False
+    ).name
+
+    logger.info("appending data to netCDF file %s", output_file)
+    try:
+        # the temporary file is removed even if its creation fails
+        conf.set("conf", "output", tmp_file)
+        try:
+            create_netcdf(conf, data, logger)
+        finally:
+            conf.set("conf", "output", output_file)
+
+        with nc.Dataset(tmp_file) as new_id, nc.Dataset(output_file, "a") as nc_id:
+            time_dims = [
+                name for name, dim in nc_id.dimensions.items() if dim.isunlimited()
+            ]
+            if len(time_dims) != 1:
+                logger.critical(
+                    "107 unable to append data to '%s': no unlimited dimension",
+                    output_file,
+                )
+                sys.exit(1)
+            time_dim = time_dims[0]
+
+            # other dimensions have to be the same
+            for name, dim in new_id.dimensions.items():
+                if name != time_dim and len(dim) != len(nc_id.dimensions[name]):
+                    logger.critical(
+                        "107 unable to append data to '%s': size of dimension %s "
+                        "is %d instead of %d",
+                        output_file,
+                        name,
+                        len(dim),
+                        len(nc_id.dimensions[name]),
+                    )
+                    sys.exit(1)
+
+            # time steps already in the file (files processed again) are skipped
+            keep = np.ones(len(new_id.dimensions[time_dim]), dtype=bool)
+            n_late = 0
+            if time_dim in nc_id.variables and time_dim in new_id.variables:
+                new_time = new_id.variables[time_dim][:]
+                old_time = nc_id.variables[time_dim][:]
+                keep = ~np.isin(new_time, old_time)
+                if old_time.size > 0:
+                    n_late = int(np.count_nonzero(new_time[keep] < old_time.max()))
+
+            n_old = len(nc_id.dimensions[time_dim])
+            n_new = int(np.count_nonzero(keep))
+            if n_late > 0:
+                # the file has to be sorted afterwards (e.g. with merge_l1.py)
+                logger.warning(
+                    "107 %d time steps appended to '%s' are older than the last "
+                    "time step of the file: time is not sorted",
+                    n_late,
+                    output_file,
+                )
+            for name, var in new_id.variables.items():
+                if time_dim not in var.dimensions or n_new == 0:
+                    continue
+
+                # packed values are appended with the packing of the file
+                out_var = nc_id.variables[name]
+                values = get_values_to_write(var, out_var, logger)
+                axis = var.dimensions.index(time_dim)
+                index = [slice(None)] * var.ndim
+                index[axis] = slice(n_old, n_old + n_new)
+                out_var[tuple(index)] = np.ma.compress(keep, values, axis=axis)
+
+            logger.info(
+                "%d time steps appended to %d time steps (%d already in file)",
+                n_new,
+                n_old,
+                keep.size - n_new,
+            )
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    return 0
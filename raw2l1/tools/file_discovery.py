@@ -0,0 +1,249 @@
+"""
+Discovery of the input files.
+
+The patterns of the input files are expanded by listing their directory with
+`os.scandir` instead of `glob.glob`. When the names of the files contain their
+date, the files outside of the day to process (plus a margin) are discarded
+before any `stat` call, and the sizes of the remaining files come from the
+`DirEntry` objects of the listing.
+
+The listings of the directories can be saved in an index file (JSON) between
+runs. The listing of a directory is reused as long as the modification time of
+the directory does not change.
+"""
+
+import datetime as dt
+import fnmatch
+import glob
+import json
+import os
+import re
+import time
+
+# regular expressions of the strftime directives allowed in the date format
+DATE_DIRECTIVES = {
+    "%Y": r"\d{4}",
+    "%y": r"\d{2}",
+    "%m": r"\d{2}",
+    "%d": r"\d{2}",
+    "%j": r"\d{3}",
+    "%H": r"\d{2}",
+    "%M": r"\d{2}",
+    "%S": r"\d{2}",
+    "%%": "%",
+}
+
+# files of the day before and after the date to process which are kept
+DEFAULT_MARGIN = dt.timedelta(days=1)
+
+# listings of directories modified less than this time (ns) before being
+# listed are not saved in the index: files added in the same clock tick would
+# not change the modification time of the directory
+INDEX_MIN_AGE = 2_000_000_000
+
+INDEX_VERSION = 1
+
+
+def date_regex(date_format):
+    """
+    Convert a strftime date format into a regular expression.
+
+    Parameters
+    ----------
+    date_format : str
+        Format of the date in the file names (e.g. ``%Y%m%d_%H%M%S``).
+
+    Returns
+    -------
+    re.Pattern
+
+    Raises
+    ------
+    ValueError
+        If the format uses a directive which is not supported.
+
+    """
+    regex = ""
+    for token in re.split(r"(%.)", date_format):
+        if token.startswith("%"):
+            try:
+                regex += DATE_DIRECTIVES[token]
+            except KeyError:
+                raise ValueError(f"unsupported directive {token} in {date_format}")
+        else:
+            regex += re.escape(token)
+
+    return re.compile(regex)
+
+
+class DateFilter:
+    """
+    Select file names by the date they contain.
+
+    Parameters
+    ----------
+    date_format : str
+        Format of the date in the file names.
+    date : datetime.datetime
+        Day to process.
+    margin : datetime.timedelta, optional
+        Files dated up to `margin` before or after the day are kept.
+
+    """
+
+    def __init__(self, date_format, date, margin=DEFAULT_MARGIN):
+        self.date_format = date_format
+        self.regex = date_regex(date_format)
+        self.start = date - margin
+        self.end = date + dt.timedelta(days=1) + margin
+
+    def file_date(self, name):
+        """
+        Get the date in a file name. None if no date is found.
+        """
+        for match in self.regex.finditer(name):
+            try:
+                return dt.datetime.strptime(match.group(0), self.date_format)
+            except ValueError:
+                continue
+
+        return None
+
+    def __call__(self, name):
+        """
+        Check if a file has to be kept. Files without a date are kept.
+        """
+        file_date = self.file_date(name)
+
+        return file_date is None or self.start <= file_date < self.end
+
+
+def load_index(filename):
+    """
+    Load an index of directory listings. An empty index is returned if the
+    file does not exist or can not be used.
+    """
+    try:
+        with open(filename) as file_id:
+            index = json.load(file_id)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return {}
+
+    return index.get("dirs", {})
+
+
+def save_index(filename, index):
+    """
+    Save an index of directory listings (atomic replacement of the file).
+    """
+    tmp_file = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as file_id:
+        json.dump({"version": INDEX_VERSION, "dirs": index}, file_id)
+    os.replace(tmp_file, filename)
+
+
+def list_dir(directory, index=None):
+    """
+    List the files of a directory.
+
+    Parameters
+    ----------
+    directory : str
+        The directory.
+    index : dict, optional
+        Index of directory listings. It is used if the directory has not been
+        modified since it was listed and updated otherwise.
+
+    Returns
+    -------
+    dict
+        The `os.DirEntry` of the files by name. The values are None for
+        listings coming from the index.
+
+    """
+    key = os.path.abspath(directory)
+    mtime_ns = os.stat(directory).st_mtime_ns
+
+    if index is not None:
+        listing = index.get(key)
+        if listing is not None and listing["mtime_ns"] == mtime_ns:
+            return dict.fromkeys(listing["names"])
+
+    listed_ns = time.time_ns()
+    with os.scandir(directory) as it:
+        entries = {entry.name: entry for entry in it if entry.is_file()}
+
+    if index is not None:
+        if mtime_ns < listed_ns - INDEX_MIN_AGE:
+            index[key] = {"mtime_ns": mtime_ns, "names": sorted(entries)}
+        else:
+            index.pop(key, None)
+
+    return entries
+
+
+def find_files(pattern, date_filter=None, index=None):
+    """
+    Find the files corresponding to a pattern.
+
+    Parameters
+    ----------
+    pattern : str
+        Name or pattern (glob syntax) of the files.
+    date_filter : callable, optional
+        Function returning True for the file names to keep (e.g. a
+        `DateFilter`).
+    index : dict, optional
+        Index of directory listings (see `list_dir`).
+
+    Returns
+    -------
+    list of (str, int)
+        The names of the files, sorted, and their sizes.
+
+    """
+    directory, basename = os.path.split(pattern)
+
+    if not glob.has_magic(pattern):
+        # glob syntax: the name is returned if it exists
+        if not os.path.lexists(pattern):
+            return []
+        return [(pattern, os.path.getsize(pattern))]
+
+    if glob.has_magic(directory):
+        # patterns on directories are rare: use glob and stat the files kept
+        list_files = glob.glob(pattern)
+        if date_filter is not None:
+            list_files = [f for f in list_files if date_filter(os.path.basename(f))]
+        return [(f, os.path.getsize(f)) for f in sorted(list_files)]
+
+    try:
+        entries = list_dir(directory or os.curdir, index)
+    except OSError:
+        return []
+
+    # as glob, hidden files only match patterns starting with a dot
+    names = fnmatch.filter(entries, basename)
+    if not basename.startswith("."):
+        names = [name for name in names if not name.startswith(".")]
+    if date_filter is not None:
+        names = [name for name in names if date_filter(name)]
+
+    list_files = []
+    for name in sorted(names):
+        filename = os.path.join(directory, name)
+        entry = entries[name]
+        try:
+            if entry is None:
+                size = os.path.getsize(filename)
+            else:
+                size = entry.stat().st_size
+        except OSError:
+            # removed since the listing
+            continue
+        list_files.append((filename, size))
+
+    return list_files
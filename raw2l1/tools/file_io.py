@@ -0,0 +1,396 @@
+"""
+Opening of raw data files with transparent decompression.
+
+Compressed files (gzip, bz2, xz and zstd) are decompressed on the fly while
+they are read. Files stored inside tar or zip archives are referred to using
+the syntax `archive.tar.gz::member` and are listed using `expand_archives`.
+
+Readers iterate over their files with `iter_prefetched`: the next files are
+loaded by background threads while the current one is decoded. The netCDF
+files are loaded as bytes and opened from memory in the thread of the reader
+(`open_netcdf`) as the netCDF library is not thread safe.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tarfile
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import netCDF4 as nc
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# separator between archive name and name of the member
+ARCHIVE_SEP = "::"
+
+# option of the reader configuration defining the number of files loaded in
+# advance by the readers
+PREFETCH_KEY = "prefetch_files"
+DEFAULT_PREFETCH_DEPTH = 2
+
+TAR_EXT = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ZIP_EXT = (".zip",)
+
+
+def open_zstd(filename, mode="rb"):
+    """
+    Open a zstd compressed file as a binary stream.
+    """
+
+    if zstandard is None:
+        raise OSError(f"zstandard module is required to read '{filename}'")
+
+    return zstandard.open(filename, mode)
+
+
+COMPRESSED_EXT = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".zst": open_zstd,
+}
+
+# errors which can be raised while reading (truncated or corrupted files)
+READ_ERRORS = (OSError, EOFError, lzma.LZMAError, zipfile.BadZipFile)
+
+# archives already opened and lock to read their members
+_ARCHIVES = {}
+_ARCHIVES_LOCK = threading.Lock()
+
+# functions clearing the data of the files kept by the readers during a run
+_CACHES = []
+
+
+def split_member(filename):
+    """
+    Split a filename into archive name and member name.
+
+    Parameters
+    ----------
+    filename : str
+        A path or `archive::member`.
+
+    Returns
+    -------
+    tuple of str
+        Name of the archive (or file) and name of the member (None if the
+        file is not inside an archive).
+
+    """
+    if ARCHIVE_SEP in filename:
+        archive, member = filename.split(ARCHIVE_SEP, 1)
+        return archive, member
+
+    return filename, None
+
+
+def is_tar(filename):
+    """check if a file is a tar archive based on its extension"""
+
+    return filename.lower().endswith(TAR_EXT)
+
+
+def is_zip(filename):
+    """check if a file is a zip archive based on its extension"""
+
+    return filename.lower().endswith(ZIP_EXT)
+
+
+def get_archive(archive):
+    """
+    Return the opened tar or zip archive. Archives are opened only once.
+    """
+
+    if archive not in _ARCHIVES:
+        if is_zip(archive):
+            try:
+                _ARCHIVES[archive] = zipfile.ZipFile(archive, "r")
+            except zipfile.BadZipFile as err:
+                raise OSError(f"unable to open archive '{archive}': {err}")
+        else:
+            try:
+                _ARCHIVES[archive] = tarfile.open(archive, "r:*")
+            except tarfile.TarError as err:
+                raise OSError(f"unable to open archive '{archive}': {err}")
+
+    return _ARCHIVES[archive]
+
+
+def list_archive_members(archive):
+    """
+    List the regular files stored in a tar or zip archive.
+
+    Parameters
+    ----------
+    archive : str
+        The archive.
+
+    Returns
+    -------
+    list of str
+        Sorted names of the members.
+
+    """
+    with _ARCHIVES_LOCK:
+        arch = get_archive(archive)
+        if isinstance(arch, zipfile.ZipFile):
+            members = [m.filename for m in arch.infolist() if not m.is_dir()]
+        else:
+            members = [m.name for m in arch.getmembers() if m.isfile()]
+
+    return sorted(members)
+
+
+def expand_archives(list_files, logger):
+    """
+    Replace tar and zip archives in a list of files by their members.
+
+    Parameters
+    ----------
+    list_files : list of str
+        The input files.
+    logger : logging.Logger
+        Logger object.
+
+    Returns
+    -------
+    list of str
+        The input files. Members of archives are named `archive::member`.
+
+    """
+    expanded = []
+    for file_ in list_files:
+        if ARCHIVE_SEP in file_ or not (is_tar(file_) or is_zip(file_)):
+            expanded.append(file_)
+            continue
+
+        try:
+            members = list_archive_members(file_)
+        except OSError as err:
+            logger.error("109 Impossible to open archive '%s': %r", file_, err)
+            continue
+
+        logger.info("%d files found in archive %s", len(members), file_)
+        expanded += [file_ + ARCHIVE_SEP + member for member in members]
+
+    return expanded
+
+
+def read_member(archive, member):
+    """
+    Read the content of a member of an archive.
+
+    The member is fully read in memory so several threads can read members
+    of the same archive.
+    """
+
+    with _ARCHIVES_LOCK:
+        arch = get_archive(archive)
+        try:
+            if isinstance(arch, zipfile.ZipFile):
+                return arch.read(member)
+
+            f_id = arch.extractfile(member)
+        except KeyError:
+            raise FileNotFoundError(f"no member '{member}' in '{archive}'")
+
+        if f_id is None:
+            raise OSError(f"'{member}' in '{archive}' is not a file")
+
+        return f_id.read()
+
+
+def open_file(filename, mode="r", encoding=None):
+    """
+    Open a raw data file decompressing it if needed.
+
+    Parameters
+    ----------
+    filename : str
+        The file to open. Can be compressed (.gz, .bz2, .xz, .zst) or be a
+        member of an archive (`archive::member`).
+    mode : str
+        "r" or "rt" to read text, "rb" to read bytes.
+    encoding : str, optional
+        Encoding of text files.
+
+    Returns
+    -------
+    file object
+        The opened file.
+
+    Raises
+    ------
+    OSError
+        If the file cannot be opened.
+
+    """
+    archive, member = split_member(filename)
+
+    if member is not None:
+        f_id = io.BytesIO(read_member(archive, member))
+        # members can also be compressed
+        _, ext = os.path.splitext(member.lower())
+        if ext in COMPRESSED_EXT:
+            f_id = COMPRESSED_EXT[ext](f_id, "rb")
+    else:
+        _, ext = os.path.splitext(filename.lower())
+        if ext in COMPRESSED_EXT:
+            f_id = COMPRESSED_EXT[ext](filename, "rb")
+        else:
+            f_id = open(filename, "rb")
+
+    if mode == "rb":
+        return f_id
+
+    return io.TextIOWrapper(f_id, encoding=encoding)
+
+
+def read_bytes(filename):
+    """
+    Return the decompressed content of a file.
+    """
+
+    with open_file(filename, "rb") as f_id:
+        return f_id.read()
+
+
+def get_prefetch_depth(conf, partial=False):
+    """
+    Get the number of files loaded in advance from the reader configuration.
+
+    The files are loaded entirely: readers only reading a part of the files
+    (`partial`, e.g. a time window or some of the variables) do not load them
+    in advance unless the option is set.
+    """
+
+    default = 0 if partial else DEFAULT_PREFETCH_DEPTH
+    return int(conf.get(PREFETCH_KEY, default))
+
+
+def iter_prefetched(list_files, load_fcn, depth=DEFAULT_PREFETCH_DEPTH):
+    """
+    Iterate over files loading the next files in background threads.
+
+    While the content of one file is processed, the next `depth` files are
+    read and decompressed. The files are given in the order of `list_files`.
+
+    Parameters
+    ----------
+    list_files : list of str
+        The files to load.
+    load_fcn : callable
+        Function called as `load_fcn(filename)`. It should handle the errors
+        of the files which cannot be read (e.g. returning None) as an
+        exception stops the iteration.
+    depth : int, optional
+        Number of files loaded in advance. If 0, the files are loaded when
+        they are needed.
+
+    Yields
+    ------
+    tuple
+        The filename and the value returned by `load_fcn`.
+
+    """
+    if depth < 1:
+        for file_ in list_files:
+            yield file_, load_fcn(file_)
+        return
+
+    next_files = iter(list_files)
+    executor = ThreadPoolExecutor(max_workers=depth)
+    try:
+        pending = deque(
+            (file_, executor.submit(load_fcn, file_))
+            for file_ in islice(next_files, depth)
+        )
+        while pending:
+            file_, future = pending.popleft()
+            result = future.result()
+            # keep depth files loading while this one is processed
+            for next_file in islice(next_files, 1):
+                pending.append((next_file, executor.submit(load_fcn, next_file)))
+
+            yield file_, result
+    finally:
+        # files not needed anymore if the iteration is stopped
+        executor.shutdown(cancel_futures=True)
+
+
+def load_content(filename):
+    """
+    Load the content of a file for `open_content` or `open_netcdf`.
+
+    Returns None if the file cannot be read: the error is raised when the
+    file is opened.
+    """
+
+    try:
+        return read_bytes(filename)
+    except READ_ERRORS:
+        return None
+
+
+def open_content(filename, content):
+    """
+    Open a file as a binary stream from its content loaded by `load_content`.
+    """
+
+    if content is None:
+        return open_file(filename, "rb")
+
+    return io.BytesIO(content)
+
+
+def open_netcdf(filename, content=None):
+    """
+    Open a netCDF file, from its content if it has been loaded by
+    `load_content`.
+    """
+
+    if content is None:
+        return nc.Dataset(filename, "r")
+
+    return nc.Dataset(filename, "r", memory=content)
+
+
+def close_archives():
+    """
+    Close all opened archives.
+    """
+
+    with _ARCHIVES_LOCK:
+        for arch in _ARCHIVES.values():
+            arch.close()
+        _ARCHIVES.clear()
+
+
+def register_cache(clear_fcn):
+    """
+    Register the function clearing the data of the files kept by a reader.
+    The caches are cleared by `clear_caches` at the end of a run.
+    """
+
+    if clear_fcn not in _CACHES:
+        _CACHES.append(clear_fcn)
+
+
+def clear_caches():
+    """
+    Clear the data of the files kept by the readers and close the archives.
+    """
+
+    for clear_fcn in _CACHES:
+        clear_fcn()
+    close_archives()
@@ -7,7 +7,15 @@ from importlib import import_module
 
 import numpy as np
 
-from . import common
+from . import (
+    cf_time,
+    common,
+    create_netcdf,
+    file_io,
+    projection,
+    time_normalize,
+    time_window,
+)
 
 READER_CONF = "reader_conf"
 MISSING_FLOAT_KEY = "missing_float"
@@ -15,8 +23,10 @@ MISSING_INT_KEY = "missing_int"
 
 
 class RawDataReader:
-    def __init__(self, conf, logger):
+    def __init__(self, conf, logger, output_confs=()):
         self.conf = conf
+        # configurations of the other output files created from the data read
+        self.output_confs = list(output_confs)
         self.logger = logger
         self.data_reader = conf.get
         self.reader_mod = self.__load_reader__()
@@ -66,6 +76,22 @@ class RawDataReader:
 
         # add date to process
         reader_conf["date"] = self.conf.get("conf", "date")
+        # add time window of data to read (None if all data are needed)
+        filter_day = False
+        if self.conf.has_option("conf", "filter_day"):
+            filter_day = self.conf.get("conf", "filter_day")
+        reader_conf[time_window.TIME_WINDOW_KEY] = time_window.get_time_window(
+            reader_conf["date"], filter_day
+        )
+        # add data keys used in the output files and the types of their output
+        # variables
+        required = set()
+        data_types = {}
+        for output_conf in [self.conf] + self.output_confs:
+            required |= create_netcdf.get_required_data_keys(output_conf, logger)
+            data_types = create_netcdf.get_data_types(output_conf, logger, data_types)
+        reader_conf[projection.REQUIRED_DATA_KEY] = required
+        reader_conf[projection.DATA_TYPES_KEY] = data_types
         # add list of ancillary files
         reader_conf["ancillary"] = self.conf.get("conf", "ancillary")
 
@@ -104,15 +130,17 @@ class RawDataReader:
 
         ERR_MSG = "104 Data timeliness Error"
 
-        now = dt.datetime.now()
+        # readers provide datetime.datetime or datetime64
+        now = np.datetime64(dt.datetime.now(), cf_time.DATE_UNIT)
+        time = np.asarray(self.data["time"], dtype=f"datetime64[{cf_time.DATE_UNIT}]")
 
         # check if data in the future
         logger.debug("Checking if any data in the future")
-        if np.any(self.data["time"] > now):
+        if np.any(time > now):
             logger.warning(ERR_MSG)
             return False
 
-        tmp = now - self.data["time"]
+        tmp = now - time
         if np.any(tmp > max_age):
             logger.warning(ERR_MSG)
             return False
@@ -120,6 +148,34 @@ class RawDataReader:
         return True
 
     def read_data(self):
-        self.data = self.reader_mod(
-            self.conf.get("conf", "input"), self.reader_conf, self.logger
+        # files stored in tar or zip archives are read member by member
+        list_files = file_io.expand_archives(
+            self.conf.get("conf", "input"), self.logger
+        )
+        if len(list_files) == 0:
+            self.logger.critical("102 No Usable data in any file. Quitting raw2l1")
+            sys.exit(1)
+
+        self.data = self.reader_mod(list_files, self.reader_conf, self.logger)
+        self.normalize_time()
+
+    def normalize_time(self):
+        """
+        sort the data read by time, remove duplicated time steps and report
+        gaps. The data depending on time in any output file are reordered
+        """
+
+        time_key, time_axes = create_netcdf.get_time_axes(
+            self.conf, self.data, self.logger
+        )
+        if time_key is None:
+            return
+        for output_conf in self.output_confs:
+            for key, axis in create_netcdf.get_time_axes(
+                output_conf, self.data, self.logger
+            )[1].items():
+                time_axes.setdefault(key, axis)
+
+        self.data = time_normalize.normalize(
+            self.data, time_key, time_axes, self.reader_conf, self.logger
         )
@@ -3,9 +3,12 @@
 # Compatibility with python 3
 
 
+import atexit
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
 import sys
 
 from tools import utils
@@ -14,6 +17,142 @@ LOG_FMT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DATE_FMT = "%Y-%m-%d %H:%M:%S"
 LOG_DIR = "logs"
 LOG_FILENAME = "raw2l1.log"
+LOG_QUEUE_SIZE = 10_000
+LOG_FLUSH_RECORDS = 1_000
+
+
+class BatchFlushMixin:
+    """
+    Handler whose stream is flushed by the queue listener instead of after
+    each record
+    """
+
+    def flush(self):
+        # called by emit after each record
+        pass
+
+    def flush_batch(self):
+        """write the records buffered in the stream"""
+        super().flush()
+
+
+class BatchStreamHandler(BatchFlushMixin, logging.StreamHandler):
+    """stream handler flushed by batch"""
+
+
+class BatchRotatingFileHandler(BatchFlushMixin, logging.handlers.RotatingFileHandler):
+    """
+    rotating file handler flushed by batch
+
+    The size of the file is taken from the position in the stream so the log
+    file is not checked with stat for each record.
+    """
+
+    def shouldRollover(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+
+        if self.maxBytes <= 0:
+            return False
+
+        msg = f"{self.format(record)}\n"
+
+        return self.stream.tell() + len(msg) >= self.maxBytes
+
+
+class BlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    queue handler waiting for space in the queue when it is full so no record
+    is lost
+    """
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """
+    queue listener flushing its handlers when the queue is empty, every
+    `flush_records` records or when an error is logged
+    """
+
+    def __init__(self, log_queue, *handlers, flush_records=LOG_FLUSH_RECORDS):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_records = flush_records
+        self._n_pending = 0
+
+    def handle(self, record):
+        super().handle(record)
+        self._n_pending += 1
+
+        if (
+            record.levelno >= logging.ERROR
+            or self._n_pending >= self.flush_records
+            or self.queue.empty()
+        ):
+            self.flush()
+
+    def flush(self):
+        """flush the handlers of the listener"""
+        for handler in self.handlers:
+            handler.acquire()
+            try:
+                handler.flush_batch()
+            finally:
+                handler.release()
+
+        self._n_pending = 0
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+            self.flush()
+
+
+def init_async(log_dict, queue_size=LOG_QUEUE_SIZE):
+    """
+    Replace the handlers of the root logger by a queue read by a background
+    thread
+
+    Records are written by the handlers defined in `log_dict` in the thread
+    of the listener so the processing is not blocked by writing the logs.
+    The listener is stopped, and the remaining records written, at exit.
+
+    Parameters
+    ----------
+    log_dict : dict
+        logging configuration used by `init`
+    queue_size : int, optional
+        maximum number of records waiting to be written. Logging calls wait
+        when the queue is full.
+
+    Returns
+    -------
+    BatchQueueListener
+        the started listener
+    """
+
+    handler_classes = {
+        "logging.StreamHandler": f"{__name__}.BatchStreamHandler",
+        "logging.handlers.RotatingFileHandler": f"{__name__}.BatchRotatingFileHandler",
+    }
+    for handler_conf in log_dict["handlers"].values():
+        handler_conf["class"] = handler_classes[handler_conf["class"]]
+
+    logging.config.dictConfig(log_dict)
+
+    root = logging.getLogger()
+    log_queue = queue.Queue(maxsize=queue_size)
+    listener = BatchQueueListener(log_queue, *root.handlers)
+
+    queue_handler = BlockingQueueHandler(log_queue)
+    queue_handler.listener = listener
+    root.handlers = [queue_handler]
+
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
 
 
 def init(opt, name):
@@ -35,6 +174,13 @@ def init(opt, name):
     print("console debug level : {}".format(opt["verbose"].upper()))
     print("file debug level : {}".format(opt["log_level"].upper()))
 
+    # records below the level of all handlers are dropped as soon as the
+    # logging call is made without being created
+    root_level = min(
+        logging.getLevelName(opt["verbose"].upper()),
+        logging.getLevelName(opt["log_level"].upper()),
+    )
+
     log_dict = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -56,10 +202,14 @@ def init(opt, name):
                 "encoding": "utf8",
             },
         },
-        "root": {"level": "DEBUG", "handlers": ["console", "file_handler"]},
+        "root": {"level": root_level, "handlers": ["console", "file_handler"]},
     }
 
     logger = logging.getLogger(name)
-    logging.config.dictConfig(log_dict)
+    if opt.get("log_async", False):
+        init_async(log_dict, opt.get("log_queue_size", LOG_QUEUE_SIZE))
+        logger.debug("asynchronous logging")
+    else:
+        logging.config.dictConfig(log_dict)
 
     return logger
@@ -0,0 +1,423 @@
+"""
+Merge of output files of raw2l1 along the time dimension.
+
+The output files created with the same configuration (e.g. files of a few
+minutes created in near real time) are concatenated into one file without
+reading the raw data again. The time steps are sorted and the time steps
+found in several files are only written once (from the first file given).
+
+Only the time variables of the input files are loaded: the other variables
+are copied by blocks of time steps so the memory used does not depend on
+the number of files. The variables of the merged file are created with the
+storage options (compression, chunking) of the configuration and its global
+attributes are the ones of the configuration, the attributes depending on
+the data read being copied from the first file.
+
+Packed variables (pack_type option) are copied as integers if all the files
+use the same scale_factor and add_offset. Otherwise, they are packed again
+with a packing computed from the range of the values of all the files.
+"""
+
+import contextlib
+import datetime as dt
+
+import netCDF4 as nc
+import numpy as np
+
+from . import create_netcdf
+
+# default number of time steps copied at once
+DEFAULT_BLOCK_SIZE = 1440
+
+
+def check_same_structure(ref_id, nc_id, time_dim):
+    """
+    Check that a file has the dimensions and variables of the reference file.
+
+    Parameters
+    ----------
+    ref_id, nc_id : netCDF4.Dataset
+        The reference and the checked files.
+    time_dim : str
+        Name of the time dimension, which size can change.
+
+    Returns
+    -------
+    str or None
+        Description of the first difference found. None if there is none.
+
+    """
+    if set(nc_id.dimensions) != set(ref_id.dimensions):
+        return "dimensions are not the same"
+    for name, dim in ref_id.dimensions.items():
+        if name != time_dim and len(dim) != len(nc_id.dimensions[name]):
+            return f"size of dimension {name} is not {len(dim)}"
+
+    if set(nc_id.variables) != set(ref_id.variables):
+        return "variables are not the same"
+    for name, var in ref_id.variables.items():
+        nc_var = nc_id.variables[name]
+        if nc_var.dimensions != var.dimensions:
+            return f"dimensions of variable {name} are not the same"
+        if nc_var.dtype != var.dtype:
+            return f"type of variable {name} is not the same"
+        is_packed = create_netcdf.get_var_packing(var) is not None
+        if (create_netcdf.get_var_packing(nc_var) is not None) != is_packed:
+            return f"variable {name} is not packed in both files"
+
+    ref_units = getattr(ref_id.variables[time_dim], "units", None)
+    if getattr(nc_id.variables[time_dim], "units", None) != ref_units:
+        return "units of time are not the same"
+
+    return None
+
+
+def get_time_order(list_times):
+    """
+    Order of the time steps of several files in the merged file.
+
+    Parameters
+    ----------
+    list_times : list of numpy.ndarray
+        Time values of each file (same units).
+
+    Returns
+    -------
+    file_index, time_index : numpy.ndarray
+        File and index in the file of each time step of the merged file,
+        sorted by time. Time steps already found in a previous file are
+        skipped.
+
+    """
+    times = np.concatenate(list_times)
+    file_index = np.repeat(np.arange(len(list_times)), [t.size for t in list_times])
+    time_index = np.concatenate([np.arange(t.size) for t in list_times])
+
+    # stable sort: the first file wins for duplicated time steps
+    order = np.argsort(times, kind="stable")
+    sorted_times = times[order]
+    first = np.ones(order.size, dtype=bool)
+    first[1:] = sorted_times[1:] != sorted_times[:-1]
+    order = order[first]
+
+    return file_index[order], time_index[order]
+
+
+def get_value_range(nc_var, time_dim, block_size):
+    """
+    Range of the (unpacked) values of a variable read by blocks of time steps.
+
+    Parameters
+    ----------
+    nc_var : netCDF4.Variable
+        The variable.
+    time_dim : str
+        Name of the time dimension.
+    block_size : int
+        Number of time steps read at once.
+
+    Returns
+    -------
+    v_min, v_max : float
+        Minimum and maximum of the valid values. inf and -inf if there is
+        none.
+
+    """
+    v_min = np.inf
+    v_max = -np.inf
+    if time_dim in nc_var.dimensions:
+        axis = nc_var.dimensions.index(time_dim)
+        n_time = nc_var.shape[axis]
+    else:
+        axis = None
+        n_time = 1
+
+    for start in range(0, n_time, block_size):
+        index = [slice(None)] * nc_var.ndim
+        if axis is not None:
+            index[axis] = slice(start, start + block_size)
+        values = nc_var[tuple(index)]
+        if np.ma.count(values) > 0:
+            v_min = min(v_min, float(values.min()))
+            v_max = max(v_max, float(values.max()))
+
+    return v_min, v_max
+
+
+def get_merged_packing(name, list_ids, time_dim, block_size, logger):
+    """
+    Packing of a variable in the merged file.
+
+    Parameters
+    ----------
+    name : str
+        Name of the variable.
+    list_ids : list of netCDF4.Dataset
+        The files merged.
+    time_dim : str
+        Name of the time dimension.
+    block_size : int
+        Number of time steps read at once to get the range of the values.
+    logger : logging.Logger
+        Logger of raw2l1.
+
+    Returns
+    -------
+    dict or None
+        The packing of the files if it is the same in all the files.
+        Otherwise, a packing of the range of the values of all the files with
+        the best precision of the files. None if the variable is not packed.
+
+    """
+    list_packing = [
+        create_netcdf.get_var_packing(nc_id.variables[name]) for nc_id in list_ids
+    ]
+    packing = list_packing[0]
+    if packing is None or all(p == packing for p in list_packing):
+        return packing
+
+    v_min = np.inf
+    v_max = -np.inf
+    for nc_id in list_ids:
+        file_min, file_max = get_value_range(
+            nc_id.variables[name], time_dim, block_size
+        )
+        v_min = min(v_min, file_min)
+        v_max = max(v_max, file_max)
+
+    packing = dict(packing)
+    if v_min <= v_max:
+        precision = min(p["scale_factor"] for p in list_packing)
+        packing["scale_factor"], packing["add_offset"] = create_netcdf.fit_packing(
+            v_min, v_max, precision, packing["type"]
+        )
+    logger.info(
+        "packing of %s not the same in all files: packed again with "
+        "scale_factor %g and add_offset %g",
+        name,
+        packing["scale_factor"],
+        packing["add_offset"],
+    )
+
+    return packing
+
+
+def create_variables(conf, ref_id, out_id, time_dim, packings, logger):
+    """
+    Create the dimensions and variables of the merged file from the reference
+    file with the storage options of the configuration. `packings` is the
+    packing of the packed variables (see `get_merged_packing`)
+    """
+
+    for name, dim in ref_id.dimensions.items():
+        out_id.createDimension(name, None if name == time_dim else len(dim))
+
+    netcdf4 = conf.get("conf", "netcdf_format") == "NETCDF4"
+    for name, var in ref_id.variables.items():
+        storage = {}
+        is_string = var.dtype is str
+        if netcdf4 and not is_string and conf.has_section(name):
+            storage = create_netcdf.get_storage_options(
+                conf, name, var.dtype.type, out_id, logger
+            )
+        fill_value = var.__dict__.get("_FillValue")
+        out_var = out_id.createVariable(
+            name, var.dtype, var.dimensions, fill_value=fill_value, **storage
+        )
+        attrs = {
+            attr: var.getncattr(attr) for attr in var.ncattrs() if attr != "_FillValue"
+        }
+        if name in packings:
+            # attributes keep the type of the unpacked data
+            for attr in ["scale_factor", "add_offset"]:
+                if attr in attrs:
+                    attr_type = np.asarray(attrs[attr]).dtype.type
+                    attrs[attr] = attr_type(packings[name][attr])
+        out_var.setncatts(attrs)
+
+    return None
+
+
+def set_global_attributes(conf, ref_id, out_id):
+    """
+    Global attributes of the merged file: those of the configuration, or of
+    the reference file if they depend on the data read
+    """
+
+    attrs = {attr: ref_id.getncattr(attr) for attr in ref_id.ncattrs()}
+    if conf.has_section("global"):
+        for attr, value in conf.items("global"):
+            if create_netcdf.KEY_READERDATA in value or attr == "add_date":
+                continue
+            if attr == "history":
+                value = dt.datetime.today().strftime("%Y%m%d")
+                value += " raw2l1 merge " + conf.get("conf", "version")
+            attrs[attr] = value
+
+    out_id.setncatts(attrs)
+
+    return None
+
+
+def copy_time_variable(
+    name, list_ids, out_id, time_dim, time_order, block_size, logger
+):
+    """
+    Copy a variable depending on time in the merged file by blocks of time
+    steps. `time_order` is the file and the index in the file of each time
+    step of the merged file (see `get_time_order`). Packed values are
+    copied with the packing of the merged file
+    """
+
+    file_index, time_index = time_order
+    out_var = out_id.variables[name]
+    axis = out_var.dimensions.index(time_dim)
+
+    for start in range(0, file_index.size, block_size):
+        block_files = file_index[start : start + block_size]
+        block_index = time_index[start : start + block_size]
+
+        positions = []
+        list_values = []
+        for i_file in np.unique(block_files):
+            in_block = np.flatnonzero(block_files == i_file)
+            index = block_index[in_block]
+            # the time steps of a file are usually contiguous: read their range
+            in_slice = [slice(None)] * out_var.ndim
+            in_slice[axis] = slice(index.min(), index.max() + 1)
+            values = create_netcdf.get_values_to_write(
+                list_ids[i_file].variables[name], out_var, logger, tuple(in_slice)
+            )
+            positions.append(in_block)
+            list_values.append(np.ma.take(values, index - index.min(), axis=axis))
+
+        block = np.ma.concatenate(list_values, axis=axis)
+        block = np.ma.take(block, np.argsort(np.concatenate(positions)), axis=axis)
+
+        out_slice = [slice(None)] * out_var.ndim
+        out_slice[axis] = slice(start, start + block_files.size)
+        out_var[tuple(out_slice)] = block
+
+    return None
+
+
+def merge_files(conf, list_files, output_file, logger, block_size=None):
+    """
+    Merge output files of raw2l1 along their time dimension.
+
+    Parameters
+    ----------
+    conf : configparser.RawConfigParser
+        Configuration used to create the files.
+    list_files : list of str
+        Files to merge. For time steps found in several files, the data of the
+        first file are kept.
+    output_file : str
+        Merged file.
+    logger : logging.Logger
+        Logger of raw2l1.
+    block_size : int, optional
+        Number of time steps copied at once. Default is the chunk size of the
+        time dimension in the configuration or DEFAULT_BLOCK_SIZE.
+
+    Returns
+    -------
+    int
+        Number of time steps of the merged file. 0 if no file can be merged.
+
+    """
+    time_dim = create_netcdf.get_time_section(conf, logger)
+    if time_dim is None:
+        logger.critical("107 no time dimension defined in configuration")
+        return 0
+
+    if block_size is None:
+        chunks = create_netcdf.get_nc4_option(conf, time_dim, "netcdf4_chunks")
+        try:
+            block_size = create_netcdf.get_chunks(chunks)[time_dim]
+        except (AttributeError, KeyError, ValueError):
+            block_size = DEFAULT_BLOCK_SIZE
+
+    with contextlib.ExitStack() as stack:
+        # files which cannot be merged are skipped
+        list_ids = []
+        for filename in list_files:
+            try:
+                nc_id = stack.enter_context(nc.Dataset(filename))
+            except OSError as err:
+                logger.error("102 unable to read file %s: %s", filename, err)
+                continue
+            if time_dim not in nc_id.variables:
+                logger.error("102 no %s variable in %s", time_dim, filename)
+                continue
+            error = None
+            if list_ids:
+                error = check_same_structure(list_ids[0], nc_id, time_dim)
+            if error is not None:
+                logger.error(
+                    "107 %s not merged: %s as in %s",
+                    filename,
+                    error,
+                    list_ids[0].filepath(),
+                )
+                continue
+            list_ids.append(nc_id)
+
+        if not list_ids:
+            return 0
+
+        ref_id = list_ids[0]
+        list_times = []
+        for nc_id in list_ids:
+            time_var = nc_id.variables[time_dim]
+            time_var.set_auto_maskandscale(False)
+            list_times.append(time_var[:])
+        file_index, time_index = get_time_order(list_times)
+        n_time = file_index.size
+        n_read = sum(t.size for t in list_times)
+        logger.info(
+            "%d time steps from %d files (%d duplicated)",
+            n_time,
+            len(list_ids),
+            n_read - n_time,
+        )
+
+        logger.info("create netCDF file %s", output_file)
+        try:
+            out_id = stack.enter_context(
+                nc.Dataset(output_file, "w", format=conf.get("conf", "netcdf_format"))
+            )
+        except OSError as err:
+            logger.critical(
+                "107 Error trying to create the netCDF file '%s'", output_file
+            )
+            logger.critical(err)
+            return 0
+
+        packings = {}
+        for name in ref_id.variables:
+            packing = get_merged_packing(name, list_ids, time_dim, block_size, logger)
+            if packing is not None:
+                packings[name] = packing
+
+        set_global_attributes(conf, ref_id, out_id)
+        create_variables(conf, ref_id, out_id, time_dim, packings, logger)
+
+        for name, out_var in out_id.variables.items():
+            logger.debug("copying %s", name)
+            if time_dim in out_var.dimensions:
+                copy_time_variable(
+                    name,
+                    list_ids,
+                    out_id,
+                    time_dim,
+                    (file_index, time_index),
+                    block_size,
+                    logger,
+                )
+            else:
+                out_var[:] = create_netcdf.get_values_to_write(
+                    ref_id.variables[name], out_var, logger
+                )
+
+    return n_time
@@ -0,0 +1,110 @@
+"""
+Delivery of the output files created in memory.
+
+Instead of a filename, the output can be:
+
+- ``-``: the netCDF file is written on the standard output,
+- ``unix:PATH``: the netCDF file is sent to the Unix socket ``PATH``. The
+  connection is closed once the file is sent so the consumer reads until the
+  end of the stream,
+- a callable (library functions only): it is called with the content of the
+  netCDF file (bytes).
+
+The file is created in memory (see `create_netcdf.create_netcdf_memory`) and
+is never written on disk.
+"""
+
+import socket
+import sys
+
+STDOUT = "-"
+UNIX_SOCKET_PREFIX = "unix:"
+
+# maximum time (s) to connect and send the file to a socket
+SOCKET_TIMEOUT = 60
+
+
+def is_stream(output):
+    """
+    Check if an output is delivered as a stream instead of being a file.
+
+    Parameters
+    ----------
+    output : str or callable
+        Output of raw2l1.
+
+    Returns
+    -------
+    bool
+
+    """
+    if callable(output):
+        return True
+
+    return output == STDOUT or output.startswith(UNIX_SOCKET_PREFIX)
+
+
+def send_socket(content, path, timeout=SOCKET_TIMEOUT):
+    """
+    Send the content of a file to a Unix socket.
+
+    Parameters
+    ----------
+    content : bytes
+        Content of the file.
+    path : str
+        Path of the socket.
+    timeout : float, optional
+        Maximum time (s) of each operation on the socket.
+
+    Raises
+    ------
+    OSError
+        If the file cannot be sent.
+
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(content)
+        # end of the file for the consumer
+        sock.shutdown(socket.SHUT_WR)
+
+
+def send(content, output, logger):
+    """
+    Deliver the content of an output file created in memory.
+
+    Parameters
+    ----------
+    content : bytes
+        Content of the netCDF file.
+    output : str or callable
+        ``-``, ``unix:PATH`` or a function called with the content.
+    logger : logging.Logger
+        Logger of raw2l1.
+
+    """
+    if callable(output):
+        logger.info("giving netCDF file (%d bytes) to %r", len(content), output)
+        output(content)
+        return None
+
+    try:
+        if output == STDOUT:
+            logger.info("writing netCDF file (%d bytes) on stdout", len(content))
+            # sys.stdout may have been redirected to keep it for the data
+            stream = sys.__stdout__.buffer
+            stream.write(content)
+            stream.flush()
+        else:
+            path = output[len(UNIX_SOCKET_PREFIX) :]
+            logger.info("sending netCDF file (%d bytes) to %s", len(content), path)
+            send_socket(content, path)
+    except OSError as err:
+        logger.critical("107 unable to send the netCDF file to %s", output)
+        logger.critical(err)
+        logger.critical("quitting raw2l1")
+        sys.exit(1)
+
+    return None
@@ -0,0 +1,90 @@
+"""
+Projection of the data read by the readers.
+
+The keys of the data dictionary used by the output configuration are given to
+the readers in the reader configuration (`required_data` key). Readers can use
+them to skip the allocation and the reading of variables which are not written
+in the output file. The types of the output variables are also given
+(`data_types` key) so that readers can compute data directly in their output
+type.
+"""
+
+import numpy as np
+
+# key of the reader configuration containing the required data keys
+REQUIRED_DATA_KEY = "required_data"
+# key of the reader configuration containing the output types of the data keys
+DATA_TYPES_KEY = "data_types"
+
+
+def get_required(conf, dependencies=None):
+    """
+    Get the data keys the reader has to provide.
+
+    Parameters
+    ----------
+    conf : dict
+        The reader configuration.
+    dependencies : dict, optional
+        Keys computed by the reader from other keys. If a computed key is
+        required, the keys used to compute it are also required.
+
+    Returns
+    -------
+    set of str or None
+        The required keys. None if all the data have to be read.
+
+    """
+    required = conf.get(REQUIRED_DATA_KEY)
+    if required is None:
+        return None
+
+    required = set(required)
+    if dependencies is not None:
+        for key, needed_keys in dependencies.items():
+            if key in required:
+                required.update(needed_keys)
+
+    return required
+
+
+def is_required(required, key):
+    """
+    Check if a data key has to be read.
+
+    Parameters
+    ----------
+    required : set of str or None
+        The required keys as returned by `get_required`.
+    key : str
+        The data key.
+
+    Returns
+    -------
+    bool
+
+    """
+    return required is None or key in required
+
+
+def get_dtype(conf, key, default):
+    """
+    Get the type of the output variable written from a data key.
+
+    Parameters
+    ----------
+    conf : dict
+        The reader configuration.
+    key : str
+        The data key.
+    default : data-type
+        Type used if the output type of the key is not known.
+
+    Returns
+    -------
+    numpy.dtype
+
+    """
+    data_types = conf.get(DATA_TYPES_KEY) or {}
+
+    return np.dtype(data_types.get(key, default))
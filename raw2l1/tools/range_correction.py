@@ -0,0 +1,64 @@
+"""
+Range correction of the lidar profiles.
+
+The range corrected signal (Pr²) is the signal multiplied by a scaling factor
+and by the square of the range. The (time, range) arrays are multiplied by
+the square of the range, computed once in double precision, directly into an
+array of the type of the output variable (float32 by default): the products
+are computed in double precision by numpy buffers, so no float64 copy of the
+largest arrays is created. The operations are done in the same order and
+precision as the former computation `signal * factor * range**2` so the
+values are the same. The result can be written in place or in a preallocated
+array.
+"""
+
+import numpy as np
+
+# type of the range corrected signal if the output type is not known
+DEFAULT_DTYPE = np.float32
+
+
+def range_correct(signal, range_, factor=1.0, dtype=DEFAULT_DTYPE, out=None):
+    """
+    Compute the range corrected signal.
+
+    Parameters
+    ----------
+    signal : array_like
+        Profiles. The last dimension is the range.
+    range_ : array_like
+        Range of the profiles.
+    factor : float, optional
+        Scaling factor applied to the signal, in the type of the signal.
+    dtype : data-type, optional
+        Type of the range corrected signal. The multiplication by the square
+        of the range is done in double precision.
+    out : numpy.ndarray, optional
+        Array in which the result is stored. It can be `signal` itself to
+        correct the profiles in place.
+
+    Returns
+    -------
+    numpy.ndarray
+        The range corrected signal.
+
+    Raises
+    ------
+    ValueError
+        If the type of `out` is not `dtype`.
+
+    """
+    dtype = np.dtype(dtype)
+    if out is not None and out.dtype != dtype:
+        raise ValueError(f"output array is {out.dtype} instead of {dtype}")
+
+    square = np.square(np.asarray(range_, dtype=np.float64))
+    if out is None:
+        out = np.empty(np.broadcast_shapes(np.shape(signal), square.shape), dtype)
+
+    if factor != 1.0:
+        # the scaled signal is stored in the output array if it has its type
+        scaled_type = np.result_type(signal, factor)
+        signal = np.multiply(signal, factor, out=out if scaled_type == dtype else None)
+
+    return np.multiply(signal, square, out=out, dtype=np.float64, casting="same_kind")
@@ -3,25 +3,36 @@
 
 import numpy as np
 
+from tools import ancillary_cache
+
 OVER_DTYPE = [("range", "f4"), ("overlap", "f4")]
 COMMENTS = "#"
 FILLING = np.nan
 
 
+def parse_overlap(fname, logger):
+    """
+    parse overlap file with two columns (range, overlap) and return overlap
+    """
+
+    logger.debug("reading overlap file: " + fname)
+    data = np.genfromtxt(
+        fname, dtype=OVER_DTYPE, comments=COMMENTS, filling_values=FILLING
+    )
+
+    return data["overlap"]
+
+
 def read_overlap(fname, logger):
     """
     function to read overlap function contains in a file with two columns:
+    parsed overlap are cached between runs
     """
 
-    logger.debug("reading overlap file: " + fname)
     try:
-        data = np.genfromtxt(
-            fname, dtype=OVER_DTYPE, comments=COMMENTS, filling_values=FILLING
-        )
-
-    except OSError as err:
-        logger.errot("107 Error Reading overlap file : " + fname)
-        logger.error(err)
-        data = None
+        overlap = ancillary_cache.load(fname, parse_overlap, logger)
+    except OSError:
+        logger.error("107 Error Reading overlap file : " + fname)
+        raise
 
-    return data["overlap"]
+    return overlap
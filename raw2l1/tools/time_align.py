@@ -0,0 +1,159 @@
+"""
+Alignment of an auxiliary data stream on the time steps of the main data.
+
+The time steps are compared as int64 numbers of microseconds. The auxiliary
+time is sorted once and the time steps of the main data are searched in it
+(`numpy.searchsorted`), so the alignment is O(n log n).
+
+Two modes are available:
+
+- exact: the auxiliary time step must be equal to the main time step
+- nearest: the nearest auxiliary time step is used if the difference is lower
+  or equal to the tolerance
+"""
+
+import numpy as np
+
+from tools import cf_time
+
+MODE_EXACT = "exact"
+MODE_NEAREST = "nearest"
+MODES = [MODE_EXACT, MODE_NEAREST]
+
+# index of main time steps without auxiliary data
+NO_MATCH = -1
+
+
+def to_microseconds(time):
+    """
+    Convert dates to a number of microseconds since 1970-01-01.
+
+    Parameters
+    ----------
+    time : array_like of datetime.datetime or numpy.datetime64
+        The dates. Missing dates (None or NaT) are allowed.
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        The number of microseconds.
+    numpy.ndarray of bool
+        True for valid dates.
+
+    """
+    time_64 = cf_time.to_datetime64(time)
+    if time_64 is None:
+        # slower conversion handling missing dates
+        time_64 = np.asarray(time, dtype=f"datetime64[{cf_time.DATE_UNIT}]")
+
+    return time_64.astype(np.int64), ~np.isnat(time_64)
+
+
+def align_time(time, aux_time, mode=MODE_EXACT, tolerance=None):
+    """
+    Find the auxiliary time step corresponding to each main time step.
+
+    Parameters
+    ----------
+    time : array_like of datetime.datetime or numpy.datetime64
+        The time of the main data.
+    aux_time : array_like of datetime.datetime or numpy.datetime64
+        The time of the auxiliary data. It does not need to be sorted.
+    mode : {'exact', 'nearest'}, optional
+        The matching mode.
+    tolerance : datetime.timedelta or numpy.timedelta64, optional
+        Maximum difference between matched time steps in the nearest mode.
+        No limit if None.
+
+    Returns
+    -------
+    numpy.ndarray of int
+        For each main time step, the index of the auxiliary data to use or
+        NO_MATCH (-1).
+    dict
+        Statistics of the alignment: size of the main (`n_time`) and of
+        the auxiliary (`n_aux`) data, number of main time steps matched
+        (`n_matched`) and not matched (`n_unmatched`), maximum absolute
+        difference between matched time steps in seconds (`max_diff`).
+
+    """
+    if mode not in MODES:
+        raise ValueError(f"time alignment mode must be one of {MODES}, not {mode}")
+
+    time_us, time_ok = to_microseconds(time)
+    aux_us, aux_ok = to_microseconds(aux_time)
+
+    # auxiliary time sorted once. Stable sort keeps the first of duplicates
+    aux_ind = np.flatnonzero(aux_ok)
+    aux_ind = aux_ind[np.argsort(aux_us[aux_ind], kind="stable")]
+    aux_sorted = aux_us[aux_ind]
+
+    index = np.full(time_us.shape, NO_MATCH, dtype=np.intp)
+    diff = np.zeros(time_us.shape, dtype=np.int64)
+
+    if aux_sorted.size > 0:
+        pos = np.searchsorted(aux_sorted, time_us, side="left")
+
+        if mode == MODE_EXACT:
+            candidate = np.minimum(pos, aux_sorted.size - 1)
+            matched = aux_sorted[candidate] == time_us
+        else:
+            # nearest of the time steps before and after
+            after = np.minimum(pos, aux_sorted.size - 1)
+            before = np.maximum(pos - 1, 0)
+            diff_after = np.abs(aux_sorted[after] - time_us)
+            diff_before = np.abs(time_us - aux_sorted[before])
+            use_before = diff_before <= diff_after
+            candidate = np.where(use_before, before, after)
+            diff = np.where(use_before, diff_before, diff_after)
+
+            matched = np.ones(time_us.shape, dtype=bool)
+            if tolerance is not None:
+                tol_us = np.timedelta64(tolerance).astype(
+                    f"timedelta64[{cf_time.DATE_UNIT}]"
+                )
+                matched = diff <= tol_us.astype(np.int64)
+
+        matched &= time_ok
+        index[matched] = aux_ind[candidate[matched]]
+
+    n_matched = int(np.count_nonzero(index != NO_MATCH))
+    stats = {
+        "n_time": index.size,
+        "n_aux": int(np.count_nonzero(aux_ok)),
+        "n_matched": n_matched,
+        "n_unmatched": index.size - n_matched,
+        "max_diff": (
+            float(diff[index != NO_MATCH].max()) / 1e6 if n_matched > 0 else 0.0
+        ),
+    }
+
+    return index, stats
+
+
+def log_stats(stats, aux_name, logger):
+    """
+    Log the statistics of a time alignment.
+
+    Parameters
+    ----------
+    stats : dict
+        The statistics returned by `align_time`.
+    aux_name : str
+        Name of the auxiliary data.
+    logger : logging.Logger
+        The logger.
+
+    """
+    logger.info(
+        "%s data found for %d of %d time steps (%d %s time steps, max time "
+        "difference %.3f s)",
+        aux_name,
+        stats["n_matched"],
+        stats["n_time"],
+        stats["n_aux"],
+        aux_name,
+        stats["max_diff"],
+    )
+    if stats["n_unmatched"] > 0:
+        logger.warning("%d time steps without %s data", stats["n_unmatched"], aux_name)
@@ -0,0 +1,236 @@
+"""
+Normalization of the time steps of the data read.
+
+When input files overlap (e.g. overlapping patterns or instruments repeating
+messages across files boundaries), the data read can contain time steps out
+of order or duplicated. After the reading, the time steps are sorted, the
+duplicates are removed and the gaps in the time series are reported.
+
+The order of the time steps to keep is computed once from the time (stable
+sort, the first time step read is kept for duplicates) and applied with one
+`numpy.take` to each data depending on the time dimension. Nothing is copied
+if the time steps are already sorted and unique.
+
+The following options of the reader_conf section are used:
+
+- `normalize_time`: sort and remove the duplicated time steps (default true)
+- `duplicate_time_tolerance`: time steps closer than this number of seconds
+  to the last time step kept are duplicates (default 0, equal time steps)
+- `max_time_gap`: gaps longer than this number of seconds are reported
+  (default GAP_FACTOR times the median time step)
+"""
+
+import numpy as np
+
+from tools import time_align, utils
+
+NORMALIZE_KEY = "normalize_time"
+TOLERANCE_KEY = "duplicate_time_tolerance"
+MAX_GAP_KEY = "max_time_gap"
+
+# default threshold of the gaps reported in number of median time steps
+GAP_FACTOR = 3
+# number of microseconds in a second
+US_PER_S = 1e6
+
+
+def get_time_order(time, tolerance=0.0):
+    """
+    Order of the time steps to keep.
+
+    Parameters
+    ----------
+    time : array_like of datetime.datetime or numpy.datetime64
+        The time read. Missing dates (None or NaT) are allowed.
+    tolerance : float, optional
+        Time steps closer than this number of seconds to the last time step
+        kept are removed. If 0, only equal time steps are removed.
+
+    Returns
+    -------
+    numpy.ndarray of int
+        Index of the time steps to keep, sorted by time. Missing dates are
+        kept at the end in the order of reading.
+    dict
+        Statistics of the normalization: number of time steps read
+        (`n_time`), kept (`n_kept`), duplicated (`n_duplicated`), out of
+        order (`n_unsorted`) and with a missing date (`n_missing`).
+
+    """
+    time_us, time_ok = time_align.to_microseconds(time)
+    valid = np.flatnonzero(time_ok)
+    missing = np.flatnonzero(~time_ok)
+
+    # stable sort: the first time step read is kept for duplicates
+    order = valid[np.argsort(time_us[valid], kind="stable")]
+    sorted_us = time_us[order]
+    tol_us = tolerance * US_PER_S
+    keep = np.ones(order.size, dtype=bool)
+    keep[1:] = np.diff(sorted_us) > tol_us
+    if tolerance > 0:
+        # time steps are compared to the last time step kept, not to the
+        # previous one, so close time steps are not removed in chain. Only the
+        # (rare) time steps close to the previous one are checked
+        ref = None
+        for i in np.flatnonzero(~keep):
+            if keep[i - 1]:
+                ref = sorted_us[i - 1]
+            keep[i] = sorted_us[i] - ref > tol_us
+    index = np.concatenate([order[keep], missing])
+
+    valid_us = time_us[valid]
+    stats = {
+        "n_time": time_us.size,
+        "n_kept": index.size,
+        "n_duplicated": int(order.size - np.count_nonzero(keep)),
+        "n_unsorted": int(np.count_nonzero(valid_us[1:] < valid_us[:-1])),
+        "n_missing": missing.size,
+    }
+
+    return index, stats
+
+
+def find_gaps(time, max_gap=None):
+    """
+    Find the gaps in sorted time steps.
+
+    Parameters
+    ----------
+    time : array_like of datetime.datetime or numpy.datetime64
+        The sorted time steps, without missing dates.
+    max_gap : float, optional
+        Gaps longer than this number of seconds are returned. If None,
+        GAP_FACTOR times the median time step is used.
+
+    Returns
+    -------
+    numpy.ndarray of int
+        Index of the time steps before the gaps.
+    numpy.ndarray of float
+        Length of the gaps in seconds.
+
+    """
+    time_us, _ = time_align.to_microseconds(time)
+    step = np.diff(time_us) / US_PER_S
+    if step.size == 0:
+        return np.array([], dtype=np.intp), step
+
+    if max_gap is None:
+        max_gap = GAP_FACTOR * np.median(step)
+    index = np.flatnonzero(step > max_gap)
+
+    return index, step[index]
+
+
+def normalize(data, time_key, time_axes, reader_conf, logger):
+    """
+    Sort the data by time, remove the duplicated time steps and report gaps.
+
+    Parameters
+    ----------
+    data : dict
+        The data read.
+    time_key : str
+        Key of the time in `data`.
+    time_axes : dict
+        Axis of the time dimension of the data depending on time. Data which
+        are not defined along this axis (e.g. scalars broadcasted along time)
+        are not changed.
+    reader_conf : dict
+        The reader configuration.
+    logger : logging.Logger
+        The logger.
+
+    Returns
+    -------
+    dict
+        The normalized data. `data` is returned if it is not changed.
+
+    """
+    if not utils.to_bool(str(reader_conf.get(NORMALIZE_KEY, "true")).lower()):
+        logger.debug("time normalization disabled")
+        return data
+    if time_key not in data:
+        # error reported when the file is created
+        return data
+
+    tolerance = float(reader_conf.get(TOLERANCE_KEY, 0.0))
+    index, stats = get_time_order(data[time_key], tolerance)
+    log_stats(stats, logger)
+
+    time = data[time_key]
+    n_time = stats["n_time"]
+    if not np.array_equal(index, np.arange(n_time)):
+        data = dict(data)
+        for key, axis in time_axes.items():
+            if key not in data:
+                continue
+            shape = np.shape(data[key])
+            if len(shape) <= axis or shape[axis] != n_time:
+                logger.debug("%s not normalized: shape %r", key, shape)
+                continue
+            data[key] = np.take(data[key], index, axis=axis)
+
+    # gaps between the valid dates
+    time = np.take(time, index[: stats["n_kept"] - stats["n_missing"]])
+    max_gap = reader_conf.get(MAX_GAP_KEY)
+    if max_gap is not None:
+        max_gap = float(max_gap)
+    gap_index, gap_length = find_gaps(time, max_gap)
+    log_gaps(time, gap_index, gap_length, logger)
+
+    return data
+
+
+def log_stats(stats, logger):
+    """
+    Log the statistics of a time normalization.
+
+    Parameters
+    ----------
+    stats : dict
+        The statistics returned by `get_time_order`.
+    logger : logging.Logger
+        The logger.
+
+    """
+    logger.info(
+        "%d of %d time steps kept (%d duplicated, %d out of order)",
+        stats["n_kept"],
+        stats["n_time"],
+        stats["n_duplicated"],
+        stats["n_unsorted"],
+    )
+    if stats["n_duplicated"] > 0:
+        logger.warning("%d duplicated time steps removed", stats["n_duplicated"])
+    if stats["n_missing"] > 0:
+        logger.warning("%d time steps without valid date", stats["n_missing"])
+
+
+def log_gaps(time, gap_index, gap_length, logger):
+    """
+    Log the gaps found in the time steps.
+
+    Parameters
+    ----------
+    time : array_like of datetime.datetime or numpy.datetime64
+        The sorted time steps.
+    gap_index, gap_length : numpy.ndarray
+        The gaps returned by `find_gaps`.
+    logger : logging.Logger
+        The logger.
+
+    """
+    if gap_index.size == 0:
+        logger.debug("no gap in time steps")
+        return
+
+    largest = np.argmax(gap_length)
+    logger.info(
+        "%d gaps in time steps, largest of %.1f s after %s",
+        gap_index.size,
+        gap_length[largest],
+        time[gap_index[largest]],
+    )
+    for i, length in zip(gap_index, gap_length, strict=True):
+        logger.debug("gap of %.1f s after %s", length, time[i])
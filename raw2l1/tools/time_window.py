@@ -0,0 +1,143 @@
+"""
+Time window of the data to process.
+
+When only the data of the processed day are kept in the output file
+(`--filter-day` option), readers can use the time window defined in the
+reader configuration (`time_window` key) to skip early the data outside of
+the day.
+"""
+
+import datetime as dt
+
+import numpy as np
+
+from tools import cf_time
+
+# key of the reader configuration containing the time window
+TIME_WINDOW_KEY = "time_window"
+
+# same definition of the day as the one used when filtering the output file
+ALMOST_ONE_DAY = dt.timedelta(hours=23, minutes=59, seconds=59)
+
+
+def get_time_window(date, filter_day):
+    """
+    Define the time window of the data to read.
+
+    Parameters
+    ----------
+    date : datetime.datetime
+        The date to process.
+    filter_day : bool
+        True if only the processed day is kept in the output file.
+
+    Returns
+    -------
+    tuple of datetime.datetime or None
+        Start and end (included) of the window. None if all data are needed.
+
+    """
+    if not filter_day:
+        return None
+
+    return date, date + ALMOST_ONE_DAY
+
+
+def is_in_window(time, window):
+    """
+    Check if a timestamp is inside the time window.
+
+    Parameters
+    ----------
+    time : datetime.datetime
+        The timestamp to check.
+    window : tuple of datetime.datetime or None
+        The time window. If None, all timestamps are inside the window.
+
+    Returns
+    -------
+    bool
+
+    """
+    if window is None:
+        return True
+
+    return window[0] <= time <= window[1]
+
+
+def mask_to_selection(mask):
+    """
+    Convert a boolean mask into an index usable to read netCDF variables.
+
+    Parameters
+    ----------
+    mask : numpy.ndarray of bool
+        The values to select.
+
+    Returns
+    -------
+    slice or numpy.ndarray
+        A slice if the selected values are contiguous (faster to read),
+        an array of indices otherwise.
+
+    """
+    indices = np.flatnonzero(mask)
+    if indices.size == 0:
+        return slice(0, 0)
+
+    if indices[-1] - indices[0] + 1 == indices.size:
+        return slice(int(indices[0]), int(indices[-1]) + 1)
+
+    return indices
+
+
+def get_selection_size(selection, size):
+    """
+    Return the number of elements selected by `mask_to_selection`.
+
+    Parameters
+    ----------
+    selection : slice or numpy.ndarray
+        The selection.
+    size : int
+        The size of the selected dimension.
+
+    Returns
+    -------
+    int
+
+    """
+    if isinstance(selection, slice):
+        return len(range(*selection.indices(size)))
+
+    return selection.size
+
+
+def get_nc_time_selection(time_var, window):
+    """
+    Determine the indexes of a netCDF time variable inside the time window.
+
+    The comparison is done on the raw values of the variable so no date
+    conversion is needed.
+
+    Parameters
+    ----------
+    time_var : netCDF4.Variable
+        The time variable. Requires a `units` attribute.
+    window : tuple of datetime.datetime or None
+        The time window.
+
+    Returns
+    -------
+    slice or numpy.ndarray
+        Index of the data inside the window.
+
+    """
+    if window is None:
+        return slice(None)
+
+    calendar = getattr(time_var, "calendar", "standard")
+    start, end = cf_time.date2num(list(window), time_var.units, calendar)
+    values = time_var[:]
+
+    return mask_to_selection((values >= start) & (values <= end))
@@ -0,0 +1,155 @@
+"""
+Detection of the input files arriving in near real time.
+
+A `FileWatcher` finds the files matching the input patterns (see
+`file_discovery`) and reports each file once, when it is complete: its size
+is larger than the minimum size and it has not changed for `settle_time`
+seconds. Between two scans, the watcher waits for changes in the input
+directories with inotify (if the `inotify_simple` module is installed) or
+sleeps for the polling interval.
+"""
+
+import glob
+import os
+import time
+
+from . import file_discovery
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+# default time (s) between two scans of the input directories
+DEFAULT_INTERVAL = 10
+# default time (s) without modification of a file before it is processed
+DEFAULT_SETTLE_TIME = 10
+
+
+class FileWatcher:
+    """
+    Report the input files once they are completely written.
+
+    Parameters
+    ----------
+    patterns : list of str
+        Names or patterns of the input files.
+    min_size : int, optional
+        Files with a size lower or equal are not processed.
+    settle_time : float, optional
+        Time (s) without modification of a file before it is reported.
+    interval : float, optional
+        Maximum time (s) between two scans of the input directories.
+    date_filter : callable, optional
+        Selection of the files by their name (see `file_discovery.DateFilter`).
+    use_inotify : bool, optional
+        Wait for changes with inotify if available.
+
+    """
+
+    def __init__(
+        self,
+        patterns,
+        min_size=0,
+        settle_time=DEFAULT_SETTLE_TIME,
+        interval=DEFAULT_INTERVAL,
+        date_filter=None,
+        use_inotify=True,
+    ):
+        self.patterns = list(patterns)
+        self.min_size = min_size
+        self.settle_time = settle_time
+        self.interval = interval
+        self.date_filter = date_filter
+        # size of the files not reported yet at the previous scan
+        self.pending = {}
+        self.done = set()
+        self.inotify = None
+        if use_inotify and inotify_simple is not None:
+            self.inotify = self._init_inotify()
+
+    def _init_inotify(self):
+        directories = {
+            os.path.dirname(pattern) or os.curdir for pattern in self.patterns
+        }
+        if any(glob.has_magic(directory) for directory in directories):
+            # directories can not be watched: use polling
+            return None
+
+        flags = inotify_simple.flags
+        mask = flags.CREATE | flags.MODIFY | flags.CLOSE_WRITE | flags.MOVED_TO
+        inotify = inotify_simple.INotify()
+        for directory in directories:
+            inotify.add_watch(directory, mask)
+
+        return inotify
+
+    def scan(self, now=None):
+        """
+        Find the files completed since the previous scan.
+
+        Parameters
+        ----------
+        now : float, optional
+            Time of the scan (seconds since the epoch).
+
+        Returns
+        -------
+        list of str
+            The new complete files, sorted.
+
+        """
+        if now is None:
+            now = time.time()
+
+        complete = []
+        for pattern in self.patterns:
+            for filename, size in file_discovery.find_files(pattern, self.date_filter):
+                if filename in self.done:
+                    continue
+
+                previous_size = self.pending.get(filename)
+                self.pending[filename] = size
+                if size <= self.min_size:
+                    continue
+                # still growing since the previous scan
+                if previous_size is not None and size != previous_size:
+                    continue
+
+                try:
+                    mtime = os.stat(filename).st_mtime
+                except OSError:
+                    # removed since the listing
+                    del self.pending[filename]
+                    continue
+                if now - mtime < self.settle_time:
+                    continue
+
+                del self.pending[filename]
+                self.done.add(filename)
+                complete.append(filename)
+
+        return sorted(complete)
+
+    def wait(self):
+        """
+        Wait for changes in the input directories before the next scan.
+        """
+        # files being written are checked again after the settle time
+        timeout = self.interval
+        if self.pending:
+            timeout = min(timeout, self.settle_time)
+
+        if self.inotify is None:
+            time.sleep(timeout)
+        else:
+            # events are only used to wake up: the directories are scanned
+            self.inotify.read(timeout=int(timeout * 1000), read_delay=100)
+
+    def close(self):
+        """
+        Stop watching the input directories.
+        """
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
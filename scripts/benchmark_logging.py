@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of logging in the per-message loops of the readers.
+
+Debug calls are timed when DEBUG is disabled in the handlers, with the root
+logger at DEBUG (previous configuration: each record is created then dropped
+by the handlers) and at the lowest level of the handlers (current
+configuration). The CT25K reader is also timed on the test files to give the
+overhead per data message.
+
+Usage:
+
+    $ python scripts/benchmark_logging.py
+"""
+
+import datetime as dt
+import glob
+import logging
+import os
+import pathlib
+import sys
+import timeit
+
+RAW2L1_DIR = pathlib.Path(__file__).resolve().parent.parent / "raw2l1"
+sys.path.append(str(RAW2L1_DIR))
+
+import reader.vaisala_ct25k as ct25k  # noqa: E402
+
+N_CALLS = 100_000
+CT25K_FILES = str(RAW2L1_DIR / "test" / "input" / "vaisala_ct25k" / "*.DAT")
+
+
+def configure(root_level, handler_level=logging.INFO):
+    """configure root logger with a handler writing in /dev/null"""
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setLevel(handler_level)
+    root.addHandler(handler)
+    root.setLevel(root_level)
+
+    return logging.getLogger("benchmark")
+
+
+def time_calls(logger):
+    """time per call (ns) of eager and lazy debug messages"""
+
+    time_ind = 1234
+    timestamp = dt.datetime(2022, 1, 1)
+
+    def eager():
+        logger.debug(f"timestamp: {timestamp:%Y%m%d %H:%M:%S}")
+        logger.debug("processing data message %d" % (time_ind + 1))
+
+    def lazy():
+        logger.debug("timestamp: %s", timestamp)
+        logger.debug("processing data message %d", time_ind + 1)
+
+    return {
+        name: timeit.timeit(fcn, number=N_CALLS) / N_CALLS * 1e9
+        for name, fcn in [("eager", eager), ("lazy", lazy)]
+    }
+
+
+def time_ct25k(logger):
+    """time per data message (us) to read the CT25K test files"""
+
+    list_files = sorted(glob.glob(CT25K_FILES))
+    conf = {
+        "time_resolution": "15",
+        "missing_int": -9,
+        "missing_float": -999.0,
+    }
+
+    n_repeat = 5
+    start = timeit.default_timer()
+    for _ in range(n_repeat):
+        data = ct25k.read_data(list_files, dict(conf), logger)
+    elapsed = timeit.default_timer() - start
+
+    return elapsed / (n_repeat * data["time"].size) * 1e6
+
+
+def main():
+    print(
+        f"{'root level':<12}{'eager (ns)':>12}{'lazy (ns)':>12}{'CT25K (us/msg)':>16}"
+    )
+    for root_level in [logging.DEBUG, logging.INFO]:
+        logger = configure(root_level)
+        calls = time_calls(logger)
+        per_msg = time_ct25k(logger)
+        print(
+            f"{logging.getLevelName(root_level):<12}{calls['eager']:>12.0f}"
+            f"{calls['lazy']:>12.0f}{per_msg:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
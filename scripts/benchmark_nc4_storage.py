@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark the netCDF4 storage options of raw2l1.
+
+For each setting a (time, range) variable is written using the storage
+options computed by raw2l1 (`create_netcdf.get_storage_options`). The write
+time, the size of the file and the time needed to read the time series of
+one range gate are reported.
+
+Usage:
+
+    Use synthetic lidar like data
+    $ python scripts/benchmark_nc4_storage.py
+
+    Use a variable of an existing file
+    $ python scripts/benchmark_nc4_storage.py --input l1_file.nc --var rcs_0
+"""
+
+import argparse
+import configparser
+import logging
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+import netCDF4 as nc
+import numpy as np
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent / "raw2l1"))
+
+from tools import create_netcdf  # noqa: E402
+
+VAR_NAME = "rcs_0"
+
+# name of the setting and [conf] options used
+SETTINGS = [
+    ("no compression", {"netcdf4_compression": "false"}),
+    ("zlib 1", {}),
+    ("zlib 4", {"netcdf4_compression_level": "4"}),
+    ("zlib 1 no shuffle", {"netcdf4_shuffle": "false"}),
+    ("zlib 1 chunks 60x512", {"netcdf4_chunks": "time: 60, range: 512"}),
+    ("zlib 1 chunks 1440x64", {"netcdf4_chunks": "time: 1440, range: 64"}),
+    ("zlib 1 4 digits", {"netcdf4_significant_digits": "4"}),
+    ("zstd 3", {"netcdf4_codec": "zstd", "netcdf4_compression_level": "3"}),
+    ("blosc_lz4 5", {"netcdf4_codec": "blosc_lz4", "netcdf4_compression_level": "5"}),
+]
+
+
+def get_synthetic_data(n_time, n_range):
+    """lidar like signal: decreasing with range plus noise"""
+
+    rng = np.random.default_rng(0)
+    profile = np.exp(-np.arange(n_range) / (n_range / 5.0))
+    noise = rng.normal(0, 0.01, (n_time, n_range))
+
+    return (profile + noise).astype("f4")
+
+
+def get_conf(options):
+    """configuration with the storage options of one setting"""
+
+    conf = configparser.RawConfigParser()
+    conf.read_dict(
+        {
+            "conf": {
+                "conf": "benchmark",
+                "netcdf4_compression": "true",
+                "netcdf4_compression_level": "1",
+                **options,
+            },
+            VAR_NAME: {"dim": "time, range", "type": "$float$"},
+        }
+    )
+
+    return conf
+
+
+def run_setting(values, options, logger):
+    """write and read values with a setting. None if codec is not available"""
+
+    conf = get_conf(options)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "bench.nc")
+
+        start = time.perf_counter()
+        with nc.Dataset(filename, "w", format="NETCDF4") as nc_id:
+            codec = options.get("netcdf4_codec")
+            if codec is not None and not create_netcdf.codec_available(codec, nc_id):
+                return None
+
+            nc_id.createDimension("time", None)
+            nc_id.createDimension("range", values.shape[1])
+            storage = create_netcdf.get_storage_options(
+                conf, VAR_NAME, np.float32, nc_id, logger
+            )
+            nc_var = nc_id.createVariable(
+                VAR_NAME, np.float32, ("time", "range"), **storage
+            )
+            nc_var[:] = values
+        write_time = time.perf_counter() - start
+        size = os.path.getsize(filename)
+
+        start = time.perf_counter()
+        with nc.Dataset(filename, "r") as nc_id:
+            nc_id.variables[VAR_NAME][:, values.shape[1] // 2]
+        read_time = time.perf_counter() - start
+
+    return write_time, size, read_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--input", help="netCDF file containing the data to use")
+    parser.add_argument("--var", default=VAR_NAME, help="variable of input file")
+    parser.add_argument("--time", type=int, default=5760, help="synthetic time size")
+    parser.add_argument("--range", type=int, default=1024, help="synthetic range size")
+    args = parser.parse_args()
+
+    if args.input is not None:
+        with nc.Dataset(args.input) as nc_id:
+            values = np.ma.filled(nc_id.variables[args.var][:], np.nan).astype("f4")
+    else:
+        values = get_synthetic_data(args.time, args.range)
+
+    logger = logging.getLogger("benchmark")
+    print(f"data shape: {values.shape}, raw size: {values.nbytes / 1e6:.1f} MB")
+    columns = [("write (s)", 10), ("size (MB)", 11), ("ratio", 7), ("read (s)", 10)]
+    print(f"{'setting':<24}" + "".join(f"{col:>{width}}" for col, width in columns))
+    for name, options in SETTINGS:
+        result = run_setting(values, options, logger)
+        if result is None:
+            print(f"{name:<24}{'codec not available in netCDF library':>38}")
+            continue
+
+        write_time, size, read_time = result
+        print(
+            f"{name:<24}{write_time:>10.3f}{size / 1e6:>11.2f}"
+            f"{values.nbytes / size:>7.1f}{read_time:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()